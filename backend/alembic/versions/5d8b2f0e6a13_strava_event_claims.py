@@ -0,0 +1,29 @@
+"""Strava webhook: strava_events.claimed_at for concurrent drains
+
+Revision ID: 5d8b2f0e6a13
+Revises: 9a1e7c3d5b42
+Create Date: 2026-10-20 10:14:27.530981
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d8b2f0e6a13'
+down_revision: Union[str, Sequence[str], None] = '9a1e7c3d5b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NULL for everything queued so far: the next drain claims it
+    op.add_column("strava_events", sa.Column("claimed_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("strava_events", "claimed_at")
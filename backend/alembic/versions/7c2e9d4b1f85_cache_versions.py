@@ -0,0 +1,34 @@
+"""Derived-data caches: cache_versions invalidation counters
+
+Revision ID: 7c2e9d4b1f85
+Revises: 5d8b2f0e6a13
+Create Date: 2026-10-19 11:02:39.264117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e9d4b1f85'
+down_revision: Union[str, Sequence[str], None] = '5d8b2f0e6a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    versions = op.create_table(
+        "cache_versions",
+        sa.Column("name", sa.String(length=40), primary_key=True),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    # Seeded, so the first fill already has a row to lock
+    op.bulk_insert(versions, [{"name": "training_load", "version": 0}, {"name": "year_stats", "version": 0}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("cache_versions")
@@ -0,0 +1,180 @@
+"""Create the model tables the earlier migrations assume exist
+
+Revision ID: 9a1e7c3d5b42
+Revises: c4e9a2d7f813
+Create Date: 2026-10-19 09:12:44.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a1e7c3d5b42'
+down_revision: Union[str, Sequence[str], None] = 'c4e9a2d7f813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+JSONB = sa.JSON().with_variant(postgresql.JSONB(), "postgresql")
+
+# Same expressions as app.models.run.pace_expression / search_document
+runs = sa.table(
+    "runs",
+    sa.column("duration_seconds", sa.Integer()),
+    sa.column("distance_mi", sa.Numeric(5, 2)),
+)
+PACE_EXPR = runs.c.duration_seconds / sa.func.nullif(runs.c.distance_mi, sa.literal_column("0"))
+PG_SEARCH_DOCUMENT = (
+    "to_tsvector('english', (coalesce(title, '') || ' ') || coalesce(notes, ''))"
+)
+
+SQLITE_FTS_DDL = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS runs_fts USING fts5(
+        title, notes, content='runs', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS runs_fts_ai AFTER INSERT ON runs BEGIN
+        INSERT INTO runs_fts(rowid, title, notes) VALUES (new.id, new.title, new.notes);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS runs_fts_ad AFTER DELETE ON runs BEGIN
+        INSERT INTO runs_fts(runs_fts, rowid, title, notes) VALUES ('delete', old.id, old.title, old.notes);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS runs_fts_au AFTER UPDATE OF title, notes ON runs BEGIN
+        INSERT INTO runs_fts(runs_fts, rowid, title, notes) VALUES ('delete', old.id, old.title, old.notes);
+        INSERT INTO runs_fts(rowid, title, notes) VALUES (new.id, new.title, new.notes);
+    END""",
+)
+
+
+def _create_runs(dialect: str) -> None:
+    op.create_table(
+        "runs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("notes", sa.String(), nullable=True),
+        sa.Column("distance_mi", sa.Numeric(5, 2), nullable=False),
+        sa.Column("duration_seconds", sa.Integer(), nullable=False),
+        sa.Column("start_time", sa.Time(), nullable=True),
+        sa.Column("run_type", sa.String(length=20), nullable=False, server_default="easy"),
+        sa.Column("source", sa.String(length=20), nullable=False, server_default="manual"),
+        sa.Column("external_source", sa.String(length=20), nullable=True),
+        sa.Column("external_id", sa.String(length=64), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    for name, column in [
+        ("ix_runs_id", "id"),
+        ("ix_runs_date", "date"),
+        ("ix_runs_distance_mi", "distance_mi"),
+        ("ix_runs_duration_seconds", "duration_seconds"),
+        ("ix_runs_updated_at", "updated_at"),
+    ]:
+        op.create_index(name, "runs", [column])
+    op.create_index("ix_runs_pace_s_per_mi", "runs", [PACE_EXPR])
+    op.create_index("ux_runs_external", "runs", ["external_source", "external_id"], unique=True)
+
+    if dialect == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(f"CREATE INDEX ix_runs_search_document ON runs USING gin ({PG_SEARCH_DOCUMENT})")
+        op.execute("CREATE INDEX ix_runs_title_trgm ON runs USING gin (title gin_trgm_ops)")
+        op.execute("CREATE INDEX ix_runs_notes_trgm ON runs USING gin (notes gin_trgm_ops)")
+    elif dialect == "sqlite":
+        for stmt in SQLITE_FTS_DDL:
+            op.execute(stmt)
+
+
+def _run_fk() -> sa.ForeignKey:
+    return sa.ForeignKey("runs.id", ondelete="CASCADE")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # runs, run_files, run_metrics, run_splits, run_track and weekly_goals
+    # were only ever created by create_all on app startup, which is gone:
+    # the schema is now managed by Alembic alone. Existing databases have
+    # them already; on a fresh one the earlier migrations skipped them, so
+    # create them here as they are at this revision, with what those
+    # migrations would have added (external ids, list and search indexes).
+    bind = op.get_bind()
+    tables = set(sa.inspect(bind).get_table_names())
+
+    if "runs" not in tables:
+        _create_runs(bind.dialect.name)
+
+    if "run_files" not in tables:
+        op.create_table(
+            "run_files",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("run_id", sa.Integer(), _run_fk(), nullable=False),
+            sa.Column("filename", sa.String(), nullable=False),
+            sa.Column("content_type", sa.String(), nullable=False),
+            sa.Column("size_bytes", sa.Integer(), nullable=False),
+            sa.Column("storage_path", sa.String(), nullable=False),
+            sa.Column("source", sa.String(), nullable=False),
+            sa.Column("processed", sa.Boolean(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        )
+        op.create_index("ix_run_files_id", "run_files", ["id"])
+        op.create_index("ix_run_files_run_id", "run_files", ["run_id"])
+
+    if "run_metrics" not in tables:
+        op.create_table(
+            "run_metrics",
+            sa.Column("run_id", sa.Integer(), _run_fk(), primary_key=True),
+            sa.Column("avg_hr", sa.Integer(), nullable=True),
+            sa.Column("max_hr", sa.Integer(), nullable=True),
+            sa.Column("elev_gain_ft", sa.Numeric(7, 1), nullable=True),
+            sa.Column("elev_loss_ft", sa.Numeric(7, 1), nullable=True),
+            sa.Column("moving_time_sec", sa.Integer(), nullable=True),
+            sa.Column("device", sa.String(), nullable=True),
+            sa.Column("hr_zones", JSONB, nullable=True),
+            sa.Column("hr_series", JSONB, nullable=True),
+            sa.Column("pace_series", JSONB, nullable=True),
+            sa.Column("hr_dist_series", JSONB, nullable=True),
+            sa.Column("pace_dist_series", JSONB, nullable=True),
+            sa.Column("elev_dist_series", JSONB, nullable=True),
+        )
+
+    if "run_splits" not in tables:
+        op.create_table(
+            "run_splits",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("run_id", sa.Integer(), _run_fk(), nullable=False),
+            sa.Column("idx", sa.Integer(), nullable=False),
+            sa.Column("distance_mi", sa.Numeric(6, 3), nullable=False),
+            sa.Column("duration_sec", sa.Integer(), nullable=False),
+            sa.Column("avg_hr", sa.Integer(), nullable=True),
+            sa.Column("max_hr", sa.Integer(), nullable=True),
+            sa.Column("elev_gain_ft", sa.Numeric(7, 1), nullable=True),
+        )
+        op.create_index("ix_run_splits_id", "run_splits", ["id"])
+        op.create_index("ix_run_splits_run_id", "run_splits", ["run_id"])
+
+    if "run_track" not in tables:
+        op.create_table(
+            "run_track",
+            sa.Column("run_id", sa.Integer(), _run_fk(), primary_key=True),
+            sa.Column("geojson", JSONB, nullable=True),
+            sa.Column("bounds", JSONB, nullable=True),
+            sa.Column("points_count", sa.Integer(), nullable=True),
+        )
+
+    if "weekly_goals" not in tables:
+        op.create_table(
+            "weekly_goals",
+            sa.Column("week_start", sa.Date(), primary_key=True),
+            sa.Column("goal_miles", sa.Numeric(5, 2), nullable=False),
+            sa.Column("notes", sa.String(), nullable=True),
+        )
+        op.create_index("ix_weekly_goals_week_start", "weekly_goals", ["week_start"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Nothing to undo: the tables predate this revision on every database
+    # that was running before it.
+    pass
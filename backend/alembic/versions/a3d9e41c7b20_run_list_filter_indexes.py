@@ -0,0 +1,56 @@
+"""Indexes for run list range filters and sorting (date, distance, duration, pace)
+
+Revision ID: a3d9e41c7b20
+Revises: f5c001ef60de
+Create Date: 2026-10-19 11:40:03.527781
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d9e41c7b20'
+down_revision: Union[str, Sequence[str], None] = 'f5c001ef60de'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Must render exactly like app.models.run.pace_expression or the planner
+# will not match the index against list_runs' WHERE / ORDER BY.
+runs = sa.table(
+    "runs",
+    sa.column("duration_seconds", sa.Integer()),
+    sa.column("distance_mi", sa.Numeric(5, 2)),
+)
+PACE_EXPR = runs.c.duration_seconds / sa.func.nullif(runs.c.distance_mi, sa.literal_column("0"))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # On a fresh database runs does not exist yet (9a1e7c3d5b42 creates it
+    # with this change included); only touch what is already there.
+    insp = sa.inspect(op.get_bind())
+    if "runs" not in insp.get_table_names():
+        return
+
+    existing = {ix["name"] for ix in insp.get_indexes("runs")}
+    for name, column in [
+        ("ix_runs_date", "date"),
+        ("ix_runs_distance_mi", "distance_mi"),
+        ("ix_runs_duration_seconds", "duration_seconds"),
+    ]:
+        if name not in existing:
+            op.create_index(name, "runs", [column])
+    if "ix_runs_pace_s_per_mi" not in existing:
+        op.create_index("ix_runs_pace_s_per_mi", "runs", [PACE_EXPR])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_runs_pace_s_per_mi", table_name="runs")
+    op.drop_index("ix_runs_duration_seconds", table_name="runs")
+    op.drop_index("ix_runs_distance_mi", table_name="runs")
+    op.drop_index("ix_runs_date", table_name="runs")
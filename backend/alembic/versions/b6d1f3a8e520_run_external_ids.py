@@ -0,0 +1,48 @@
+"""Runs: external_source/external_id with a unique index (import dedupe)
+
+Revision ID: b6d1f3a8e520
+Revises: f2a7c4e91b36
+Create Date: 2026-10-19 17:48:26.904117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d1f3a8e520'
+down_revision: Union[str, Sequence[str], None] = 'f2a7c4e91b36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # On a fresh database runs does not exist yet (9a1e7c3d5b42 creates it
+    # with this change included); only touch what is already there.
+    insp = sa.inspect(op.get_bind())
+    if "runs" not in insp.get_table_names():
+        return
+
+    # Existing Strava runs keep NULL ids; the next sync matches them on
+    # date/duration/distance once and records their activity id.
+    columns = {c["name"] for c in insp.get_columns("runs")}
+    if "external_source" not in columns:
+        op.add_column("runs", sa.Column("external_source", sa.String(length=20), nullable=True))
+    if "external_id" not in columns:
+        op.add_column("runs", sa.Column("external_id", sa.String(length=64), nullable=True))
+
+    existing = {ix["name"] for ix in insp.get_indexes("runs")}
+    if "ux_runs_external" not in existing:
+        op.create_index("ux_runs_external", "runs", ["external_source", "external_id"], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ux_runs_external", table_name="runs")
+    # Plain DROP COLUMN (SQLite >= 3.35): a batch table rebuild would lose
+    # the runs_fts triggers
+    op.drop_column("runs", "external_id")
+    op.drop_column("runs", "external_source")
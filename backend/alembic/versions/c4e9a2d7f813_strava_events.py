@@ -0,0 +1,55 @@
+"""Strava webhook: strava_events queue table
+
+Revision ID: c4e9a2d7f813
+Revises: b6d1f3a8e520
+Create Date: 2026-10-19 18:36:52.071492
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e9a2d7f813'
+down_revision: Union[str, Sequence[str], None] = 'b6d1f3a8e520'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    insp = sa.inspect(op.get_bind())
+    if "strava_events" not in insp.get_table_names():
+        op.create_table(
+            "strava_events",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("object_type", sa.String(length=20), nullable=False),
+            sa.Column("object_id", sa.BigInteger(), nullable=False),
+            sa.Column("aspect_type", sa.String(length=20), nullable=False),
+            sa.Column(
+                "updates",
+                sa.JSON().with_variant(postgresql.JSONB(), "postgresql"),
+                nullable=True,
+            ),
+            sa.Column("owner_id", sa.BigInteger(), nullable=True),
+            sa.Column("event_time", sa.BigInteger(), nullable=True),
+            sa.Column(
+                "received_at",
+                sa.DateTime(timezone=True),
+                nullable=False,
+                server_default=sa.func.now(),
+            ),
+            sa.Column("processed_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("outcome", sa.String(length=20), nullable=True),
+        )
+        op.create_index("ix_strava_events_id", "strava_events", ["id"])
+        op.create_index("ix_strava_events_object_id", "strava_events", ["object_id"])
+        op.create_index("ix_strava_events_processed_at", "strava_events", ["processed_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("strava_events")
@@ -0,0 +1,76 @@
+"""Run search: tsvector/trigram GIN indexes (Postgres), FTS5 table (SQLite)
+
+Revision ID: c71f0b2d94ae
+Revises: a3d9e41c7b20
+Create Date: 2026-10-19 13:05:51.904417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c71f0b2d94ae'
+down_revision: Union[str, Sequence[str], None] = 'a3d9e41c7b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Same expression as app.models.run.search_document
+PG_SEARCH_DOCUMENT = (
+    "to_tsvector('english', (coalesce(title, '') || ' ') || coalesce(notes, ''))"
+)
+
+SQLITE_FTS_DDL = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS runs_fts USING fts5(
+        title, notes, content='runs', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS runs_fts_ai AFTER INSERT ON runs BEGIN
+        INSERT INTO runs_fts(rowid, title, notes) VALUES (new.id, new.title, new.notes);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS runs_fts_ad AFTER DELETE ON runs BEGIN
+        INSERT INTO runs_fts(runs_fts, rowid, title, notes) VALUES ('delete', old.id, old.title, old.notes);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS runs_fts_au AFTER UPDATE OF title, notes ON runs BEGIN
+        INSERT INTO runs_fts(runs_fts, rowid, title, notes) VALUES ('delete', old.id, old.title, old.notes);
+        INSERT INTO runs_fts(rowid, title, notes) VALUES (new.id, new.title, new.notes);
+    END""",
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # On a fresh database runs does not exist yet (9a1e7c3d5b42 creates it
+    # with these objects), so only touch a runs table that already exists.
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if "runs" not in insp.get_table_names():
+        return
+
+    if bind.dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS ix_runs_search_document ON runs USING gin ({PG_SEARCH_DOCUMENT})"
+        )
+        op.execute("CREATE INDEX IF NOT EXISTS ix_runs_title_trgm ON runs USING gin (title gin_trgm_ops)")
+        op.execute("CREATE INDEX IF NOT EXISTS ix_runs_notes_trgm ON runs USING gin (notes gin_trgm_ops)")
+    elif bind.dialect.name == "sqlite":
+        for stmt in SQLITE_FTS_DDL:
+            op.execute(stmt)
+        # Index the runs that already exist
+        op.execute("INSERT INTO runs_fts(runs_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_runs_notes_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_runs_title_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_runs_search_document")
+    elif bind.dialect.name == "sqlite":
+        for trigger in ("runs_fts_au", "runs_fts_ad", "runs_fts_ai"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS runs_fts")
@@ -0,0 +1,39 @@
+"""Training load: training_load_days table
+
+Revision ID: d4e2a8f61c39
+Revises: c71f0b2d94ae
+Create Date: 2026-10-19 14:22:10.663025
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e2a8f61c39'
+down_revision: Union[str, Sequence[str], None] = 'c71f0b2d94ae'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Derived data only: starts empty and is filled on the first
+    # GET /stats/training_load.
+    insp = sa.inspect(op.get_bind())
+    if "training_load_days" not in insp.get_table_names():
+        op.create_table(
+            "training_load_days",
+            sa.Column("day", sa.Date(), primary_key=True),
+            sa.Column("load", sa.Float(), nullable=False),
+            sa.Column("atl", sa.Float(), nullable=False),
+            sa.Column("ctl", sa.Float(), nullable=False),
+            sa.Column("tsb", sa.Float(), nullable=False),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("training_load_days")
@@ -0,0 +1,46 @@
+"""Year stats: year_stats_cache table
+
+Revision ID: e8b3c5d07a14
+Revises: d4e2a8f61c39
+Create Date: 2026-10-19 15:31:47.209554
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b3c5d07a14'
+down_revision: Union[str, Sequence[str], None] = 'd4e2a8f61c39'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Cache only: starts empty and fills on the first read of each year.
+    insp = sa.inspect(op.get_bind())
+    if "year_stats_cache" not in insp.get_table_names():
+        op.create_table(
+            "year_stats_cache",
+            sa.Column("year", sa.Integer(), primary_key=True, autoincrement=False),
+            sa.Column(
+                "payload",
+                sa.JSON().with_variant(postgresql.JSONB(), "postgresql"),
+                nullable=False,
+            ),
+            sa.Column(
+                "computed_at",
+                sa.DateTime(timezone=True),
+                nullable=False,
+                server_default=sa.func.now(),
+            ),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("year_stats_cache")
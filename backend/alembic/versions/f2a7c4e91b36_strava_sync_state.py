@@ -0,0 +1,49 @@
+"""Strava sync: strava_sync_state table
+
+Revision ID: f2a7c4e91b36
+Revises: e8b3c5d07a14
+Create Date: 2026-10-19 17:02:13.518344
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a7c4e91b36'
+down_revision: Union[str, Sequence[str], None] = 'e8b3c5d07a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # No backfill: the first sync after upgrading seeds the cursor from its
+    # weeks/start_date window, as before.
+    insp = sa.inspect(op.get_bind())
+    if "strava_sync_state" not in insp.get_table_names():
+        op.create_table(
+            "strava_sync_state",
+            sa.Column("key", sa.String(length=64), primary_key=True),
+            sa.Column("after_cursor", sa.BigInteger(), nullable=True),
+            sa.Column("last_page", sa.Integer(), nullable=True),
+            sa.Column(
+                "pending",
+                sa.JSON().with_variant(postgresql.JSONB(), "postgresql"),
+                nullable=False,
+            ),
+            sa.Column(
+                "updated_at",
+                sa.DateTime(timezone=True),
+                nullable=False,
+                server_default=sa.func.now(),
+            ),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("strava_sync_state")
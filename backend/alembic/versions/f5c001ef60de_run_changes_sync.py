@@ -0,0 +1,53 @@
+"""Delta sync: runs.updated_at index and run_deletions log
+
+Revision ID: f5c001ef60de
+Revises: eb4fd8b5c9be
+Create Date: 2026-10-19 09:12:44.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5c001ef60de'
+down_revision: Union[str, Sequence[str], None] = 'eb4fd8b5c9be'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # On a fresh database runs does not exist yet (9a1e7c3d5b42 creates it
+    # with this change included); only touch what is already there.
+    insp = sa.inspect(op.get_bind())
+    tables = set(insp.get_table_names())
+
+    if "runs" in tables:
+        existing = {ix["name"] for ix in insp.get_indexes("runs")}
+        if "ix_runs_updated_at" not in existing:
+            op.create_index("ix_runs_updated_at", "runs", ["updated_at"])
+
+    if "run_deletions" not in tables:
+        op.create_table(
+            "run_deletions",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("run_id", sa.Integer(), nullable=False),
+            sa.Column(
+                "deleted_at",
+                sa.DateTime(timezone=True),
+                nullable=False,
+                server_default=sa.func.now(),
+            ),
+        )
+        op.create_index("ix_run_deletions_id", "run_deletions", ["id"])
+        op.create_index("ix_run_deletions_run_id", "run_deletions", ["run_id"])
+        op.create_index("ix_run_deletions_deleted_at", "run_deletions", ["deleted_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("run_deletions")
+    op.drop_index("ix_runs_updated_at", table_name="runs")
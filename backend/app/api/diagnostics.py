@@ -0,0 +1,35 @@
+from fastapi import APIRouter
+
+from app.core.config import settings
+from app.core.pool_stats import pool_status
+from app.core.request_timing import TimedRoute
+from app.db import engine, read_engine, started_async_engines
+
+router = APIRouter(prefix="/diagnostics", tags=["diagnostics"], route_class=TimedRoute)
+
+
+@router.get("/pool")
+def get_pool_diagnostics():
+    """Connection pool occupancy and checkout timings for this process.
+
+    `checked_out`/`overflow` show current pressure; `wait_ms` is time spent
+    getting a connection from the pool and `checkout_ms` adds pre-ping.
+    Percentiles cover the last 1000 checkouts. Multiply the configured
+    size + max_overflow by replicas x workers to size against Postgres
+    max_connections.
+    """
+    out = {
+        "configured": {
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_timeout_s": settings.db_pool_timeout,
+            "pool_recycle_s": settings.db_pool_recycle,
+            "pre_ping": settings.db_pool_pre_ping,
+        },
+        "sync": pool_status(engine.pool),
+    }
+    if read_engine is not engine:
+        out["sync_replica"] = pool_status(read_engine.pool)
+    for role, async_engine in started_async_engines().items():
+        out["async" if role == "primary" else "async_replica"] = pool_status(async_engine.pool)
+    return out
@@ -1,15 +1,23 @@
 from datetime import date, timedelta
-from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import Date, and_, column, func, select, values
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
-from app.db import get_db
+from app.core.request_timing import TimedRoute
+from app.db import get_db, get_read_db
+from app.models.run import Run
 from app.models.weekly_goal import WeeklyGoal
-from app.schemas.goal import WeeklyGoalRead, WeeklyGoalUpsert
+from app.schemas.goal import (
+    WeeklyGoalBulkItem,
+    WeeklyGoalProgress,
+    WeeklyGoalRead,
+    WeeklyGoalUpsert,
+)
 
 
-router = APIRouter(prefix="/goals", tags=["goals"])
+router = APIRouter(prefix="/goals", tags=["goals"], route_class=TimedRoute)
 
 
 def monday_of(d: date) -> date:
@@ -21,7 +29,7 @@ def monday_of(d: date) -> date:
 def list_weekly_goals(
     start_date: date = Query(...),
     end_date: date = Query(...),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     # normalize to Mondays covering the range
     start = monday_of(start_date)
@@ -36,8 +44,117 @@ def list_weekly_goals(
     return rows
 
 
+PROGRESS_MAX_WEEKS = 520
+BULK_MAX_GOALS = 520
+
+
+def _progress_stmt(start_date: date, end_date: date):
+    """One query: every week in range LEFT JOIN its goal and its runs.
+
+    The week list is a VALUES CTE built here rather than generate_series(),
+    so the same statement runs on SQLite.
+    """
+    start = monday_of(start_date)
+    end = monday_of(end_date)
+    n_weeks = (end - start).days // 7 + 1
+    if n_weeks < 1:
+        raise HTTPException(status_code=422, detail="start_date must be on or before end_date")
+    if n_weeks > PROGRESS_MAX_WEEKS:
+        raise HTTPException(status_code=422, detail=f"At most {PROGRESS_MAX_WEEKS} weeks per request")
+
+    weeks = values(
+        column("week_start", Date),
+        column("week_end", Date),
+        name="weeks",
+    ).data([
+        (start + timedelta(weeks=i), start + timedelta(weeks=i + 1))
+        for i in range(n_weeks)
+    ]).cte("weeks")
+    return (
+        select(
+            weeks.c.week_start,
+            WeeklyGoal.goal_miles,
+            WeeklyGoal.notes,
+            func.coalesce(func.sum(Run.distance_mi), 0),
+            func.count(Run.id),
+        )
+        .select_from(weeks)
+        .outerjoin(WeeklyGoal, WeeklyGoal.week_start == weeks.c.week_start)
+        .outerjoin(Run, and_(Run.date >= weeks.c.week_start, Run.date < weeks.c.week_end))
+        .group_by(weeks.c.week_start, WeeklyGoal.goal_miles, WeeklyGoal.notes)
+        .order_by(weeks.c.week_start)
+    )
+
+
+def _progress_rows(rows) -> list[WeeklyGoalProgress]:
+    out = []
+    for week_start, goal_miles, notes, actual, run_count in rows:
+        actual = round(float(actual), 2)
+        goal = float(goal_miles) if goal_miles is not None else None
+        out.append(WeeklyGoalProgress(
+            week_start=week_start,
+            goal_miles=goal,
+            notes=notes,
+            actual_miles=actual,
+            run_count=run_count,
+            completion_pct=round(actual / goal * 100, 1) if goal else None,
+        ))
+    return out
+
+
+@router.get("/progress", response_model=list[WeeklyGoalProgress])
+def get_goal_progress(
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    db: Session = Depends(get_read_db),
+):
+    """Goal vs. actual mileage for every week (Mon-Sun) overlapping the range."""
+    rows = db.execute(_progress_stmt(start_date, end_date)).all()
+    return _progress_rows(rows)
+
+
+@router.put("/weekly", response_model=list[WeeklyGoalRead])
+def upsert_weekly_goals(
+    payload: list[WeeklyGoalBulkItem],
+    db: Session = Depends(get_db),
+):
+    """Set many weekly goals in one call (e.g. a 16-week plan).
+
+    Each item's week_start is normalized to its Monday; if two items land
+    on the same week the later one wins. All-or-nothing: any invalid item
+    rejects the request.
+    """
+    if len(payload) > BULK_MAX_GOALS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_GOALS} goals per request")
+    by_week: dict[date, dict] = {}
+    for item in payload:
+        if item.goal_miles <= 0:
+            raise HTTPException(status_code=422, detail=f"goal_miles must be > 0 (week of {item.week_start})")
+        wk = monday_of(item.week_start)
+        by_week[wk] = {"week_start": wk, "goal_miles": item.goal_miles, "notes": item.notes}
+    if not by_week:
+        return []
+
+    dialect = db.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    stmt = insert(WeeklyGoal).values(list(by_week.values()))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[WeeklyGoal.week_start],
+        set_={"goal_miles": stmt.excluded.goal_miles, "notes": stmt.excluded.notes},
+    )
+    db.execute(stmt)
+    db.commit()
+
+    return (
+        db.query(WeeklyGoal)
+        .filter(WeeklyGoal.week_start.in_(list(by_week)))
+        .order_by(WeeklyGoal.week_start)
+        .all()
+    )
+
+
 @router.get("/{week_start}", response_model=WeeklyGoalRead)
-def get_week_goal(week_start: date, db: Session = Depends(get_db)):
+def get_week_goal(week_start: date, db: Session = Depends(get_read_db)):
     wk = monday_of(week_start)
     row = db.query(WeeklyGoal).filter(WeeklyGoal.week_start == wk).first()
     if not row:
@@ -0,0 +1,47 @@
+"""Async versions of the read-only /goals routes (see app/api/runs_async.py)."""
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.goals import _progress_rows, _progress_stmt, monday_of
+from app.core.request_timing import TimedRoute
+from app.db import get_async_db
+from app.models.weekly_goal import WeeklyGoal
+from app.schemas.goal import WeeklyGoalProgress, WeeklyGoalRead
+
+router = APIRouter(prefix="/goals", tags=["goals"], route_class=TimedRoute)
+
+
+@router.get("/weekly", response_model=list[WeeklyGoalRead])
+async def list_weekly_goals(
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    db: AsyncSession = Depends(get_async_db),
+):
+    stmt = (
+        select(WeeklyGoal)
+        .where(WeeklyGoal.week_start >= monday_of(start_date))
+        .where(WeeklyGoal.week_start <= monday_of(end_date))
+        .order_by(WeeklyGoal.week_start)
+    )
+    return (await db.scalars(stmt)).all()
+
+
+@router.get("/progress", response_model=list[WeeklyGoalProgress])
+async def get_goal_progress(
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    db: AsyncSession = Depends(get_async_db),
+):
+    rows = (await db.execute(_progress_stmt(start_date, end_date))).all()
+    return _progress_rows(rows)
+
+
+@router.get("/{week_start}", response_model=WeeklyGoalRead)
+async def get_week_goal(week_start: date, db: AsyncSession = Depends(get_async_db)):
+    row = await db.get(WeeklyGoal, monday_of(week_start))
+    if not row:
+        raise HTTPException(status_code=404, detail="Goal not set")
+    return row
@@ -0,0 +1,31 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import func
+
+from app.core import metrics
+from app.db import SessionLocal
+from app.models.strava_event import StravaEvent
+from app.models.strava_sync_state import StravaSyncState
+
+router = APIRouter(tags=["metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@metrics.scrape_collector
+def _strava_backlog() -> None:
+    """Webhook events not applied yet and runs still missing streams."""
+    db = SessionLocal()
+    try:
+        queued = db.query(func.count(StravaEvent.id)).filter(StravaEvent.processed_at.is_(None)).scalar()
+        pending = sum(len(p or []) for (p,) in db.query(StravaSyncState.pending))
+    finally:
+        db.close()
+    metrics.strava_webhook_queue_depth.set(queued or 0)
+    metrics.strava_pending_streams.set(pending)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus scrape endpoint (this process's values; see app/core/metrics.py)."""
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
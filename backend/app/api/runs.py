@@ -1,17 +1,31 @@
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta, timezone
 from typing import Optional
 from fastapi import APIRouter, Depends, Query, HTTPException, UploadFile, File, BackgroundTasks
-from sqlalchemy.orm import Session
-from sqlalchemy import func, Date
-from app.schemas.run import RunCreate, RunRead, WeeklyMileagePoint, RunUpdate, RunType
-from app.models.run import Run
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session, joinedload, selectinload, defer
+from sqlalchemy import func, Date, insert, select, case, literal_column, or_, table, column
+from app.schemas.run import (
+    RunCreate,
+    RunRead,
+    WeeklyMileagePoint,
+    RunUpdate,
+    RunType,
+    RunBulkError,
+    RunBulkResult,
+    RunChanges,
+    RunTombstone,
+    RunSearchResult,
+)
+from app.models.run import Run, search_document
 from app.models.run_file import RunFile
 from app.models.run_metrics import RunMetrics
 from app.models.run_split import RunSplit
 from app.models.run_track import RunTrack
-from app.db import get_db
+from app.models.run_deletion import RunDeletion
+from app.db import get_db, get_read_db
 from app.core.time_utils import (
     hhmmss_to_seconds,
+    pace_to_seconds,
     compute_pace,
     seconds_to_hhmmss,
     hhmm_to_time,
@@ -19,115 +33,426 @@ from app.core.time_utils import (
     to_local_datetime,
 )
 from app.core.constants import MILE_M, SAMPLE_STEP_M, MOVING_SPEED_MPS as CONST_MOVING_SPEED_MPS, HR_ZONE_BOUNDS
+from app.core.blob_store import BLOB_DIR
 from app.core.config import settings
+from app.core.run_changes import notify_runs_changed
+from app.core.geo import haversine as _haversine
+from app.core.metrics import ImportStages, import_stage, track_job
+from app.core.strava_streams import STREAMS_FILE_SOURCE, reprocess_raw_streams
+from app.core.request_timing import TimedRoute
 import os
+import re
 import math
-import gpxpy
-import gpxpy.gpx
-from fitparse import FitFile
-import xml.etree.ElementTree as ET
 
-router = APIRouter(prefix="/runs", tags=["runs"])
+router = APIRouter(prefix="/runs", tags=["runs"], route_class=TimedRoute)
 
-@router.post("/", response_model=RunRead)
-def create_run(payload: RunCreate, db: Session = Depends(get_db)):
+
+def _run_read(run: Run) -> RunRead:
+    """Build the API representation of a Run row (pace + HH:MM:SS duration)."""
+    return RunRead(
+        id=run.id,
+        date=run.date,
+        start_time=time_to_hhmm(run.start_time),
+        title=run.title,
+        notes=run.notes,
+        distance_mi=float(run.distance_mi),
+        duration=seconds_to_hhmmss(run.duration_seconds),
+        run_type=run.run_type,
+        source=run.source if hasattr(run, 'source') else None,
+        pace=compute_pace(run.duration_seconds, float(run.distance_mi)),
+    )
+
+
+# Columns the list endpoints select, in the order _run_rows_payload unpacks
+RUN_LIST_COLUMNS = (
+    Run.id,
+    Run.date,
+    Run.start_time,
+    Run.title,
+    Run.notes,
+    Run.distance_mi,
+    Run.duration_seconds,
+    Run.run_type,
+    Run.source,
+)
+
+
+def _run_rows_payload(rows) -> list[dict]:
+    """Serialize RUN_LIST_COLUMNS tuples in one pass.
+
+    Produces the same JSON as RunRead, but for thousands of rows avoids
+    building ORM objects and validating every row through pydantic twice.
+    """
+    to_hhmmss = seconds_to_hhmmss
+    to_hhmm = time_to_hhmm
+    pace_of = compute_pace
+    out = []
+    append = out.append
+    for run_id, run_date, start, title, notes, dist, secs, run_type, source in rows:
+        dist = float(dist)
+        append({
+            "date": run_date,
+            "start_time": to_hhmm(start),
+            "title": title,
+            "notes": notes,
+            "distance_mi": dist,
+            "duration": to_hhmmss(secs),
+            "run_type": run_type,
+            "id": run_id,
+            "pace": pace_of(secs, dist),
+            "source": source,
+        })
+    return out
+
+
+def _run_values(payload: RunCreate) -> dict:
+    """Validate a RunCreate and return the column values for a new Run.
+
+    Raises ValueError with a user-facing message on bad input.
+    """
     # Convert duration string -> seconds
     duration_seconds = hhmmss_to_seconds(payload.duration)
 
-    # Validate inputs
     if payload.distance_mi <= 0:
-        raise HTTPException(status_code=422, detail="distance_mi must be > 0")
+        raise ValueError("distance_mi must be > 0")
+
+    parsed_start = (
+        hhmm_to_time(payload.start_time)
+        if getattr(payload, "start_time", None)
+        else None
+    )
+
+    return {
+        "date": payload.date,
+        "title": payload.title,
+        "notes": payload.notes,
+        "distance_mi": payload.distance_mi,
+        "duration_seconds": duration_seconds,
+        "run_type": payload.run_type.value,
+        "start_time": parsed_start,
+    }
 
-    # Parse optional start_time safely
+
+@router.post("/", response_model=RunRead)
+def create_run(payload: RunCreate, db: Session = Depends(get_db)):
     try:
-        parsed_start = (
-            hhmm_to_time(payload.start_time)
-            if getattr(payload, "start_time", None)
-            else None
-        )
+        values = _run_values(payload)
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
 
-    run = Run(
-        date=payload.date,
-        title=payload.title,
-        notes=payload.notes,
-        distance_mi=payload.distance_mi,
-        duration_seconds=duration_seconds,
-        run_type=payload.run_type,
-        start_time=parsed_start,
-    )
+    run = Run(**values)
 
     db.add(run)
     db.commit()
     db.refresh(run)
 
-    # Compute pace for response
-    pace = compute_pace(run.duration_seconds, run.distance_mi)
+    return _run_read(run)
 
-    # Convert seconds -> HH:MM:SS for the API response
-    duration_hhmmss = seconds_to_hhmmss(run.duration_seconds)
 
-    # Return using the schema format
-    return RunRead(
-        id=run.id,
-        date=run.date,
-        start_time=time_to_hhmm(run.start_time),
-        title=run.title,
-        notes=run.notes,
-        distance_mi=run.distance_mi,
-        duration=duration_hhmmss,
-        run_type=run.run_type,
-        source=run.source if hasattr(run, 'source') else None,
-        pace=pace,
-    )
+BULK_MAX_RUNS = 5000
+BULK_CHUNK_SIZE = 500
+
+
+@router.post("/bulk", response_model=RunBulkResult)
+def create_runs_bulk(
+    payload: list[RunCreate],
+    partial: bool = Query(False, description="Insert the valid items even if some fail validation"),
+    db: Session = Depends(get_db),
+):
+    """Create many runs in one transaction (training plans, migrations).
+
+    Every item is validated before anything is written. By default any
+    invalid item rejects the whole batch with 422 and the per-item errors;
+    with partial=true the valid items are inserted and the errors returned
+    alongside the new ids. Rows go in as multi-row INSERT ... RETURNING
+    statements, so a few thousand runs cost a handful of round trips.
+    """
+    if len(payload) > BULK_MAX_RUNS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_RUNS} runs per request")
+
+    rows: list[dict] = []
+    errors: list[RunBulkError] = []
+    for i, item in enumerate(payload):
+        try:
+            rows.append(_run_values(item))
+        except ValueError as e:
+            errors.append(RunBulkError(index=i, detail=str(e)))
+
+    if errors and not partial:
+        raise HTTPException(
+            status_code=422,
+            detail=[e.model_dump() for e in errors],
+        )
+
+    ids: list[int] = []
+    stmt = insert(Run).returning(Run.id, sort_by_parameter_order=True)
+    for start in range(0, len(rows), BULK_CHUNK_SIZE):
+        chunk = rows[start:start + BULK_CHUNK_SIZE]
+        ids.extend(db.execute(stmt, chunk).scalars().all())
+    if rows:
+        # Core INSERT skips the ORM flush hook that normally does this
+        notify_runs_changed(db, sorted({r["date"] for r in rows}))
+    db.commit()
+
+    return RunBulkResult(created=len(ids), ids=ids, errors=errors)
+
+# list_runs ?sort= keys; a leading "-" sorts descending
+RUN_SORT_COLUMNS = {
+    "date": Run.date,
+    "distance": Run.distance_mi,
+    "duration": Run.duration_seconds,
+    "pace": Run.pace_s_per_mi,
+}
+RUN_SORT_PATTERN = r"^-?(" + "|".join(RUN_SORT_COLUMNS) + r")$"
+
+
+def _parse_query_value(name: str, value: Optional[str], parse):
+    if value is None:
+        return None
+    try:
+        return parse(value)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"{name}: {e}")
+
+
+def _run_list_conditions(
+    start_date, end_date, run_type,
+    min_distance=None, max_distance=None,
+    min_duration=None, max_duration=None,
+    min_pace=None, max_pace=None,
+) -> list:
+    """WHERE clauses for the run list filters (shared by the async route)."""
+    conditions = []
+    if start_date is not None:
+        conditions.append(Run.date >= start_date)
+    if end_date is not None:
+        conditions.append(Run.date <= end_date)
+    if run_type is not None:
+        conditions.append(Run.run_type == run_type.value)
+
+    if min_distance is not None:
+        conditions.append(Run.distance_mi >= min_distance)
+    if max_distance is not None:
+        conditions.append(Run.distance_mi <= max_distance)
+
+    min_duration_s = _parse_query_value("min_duration", min_duration, hhmmss_to_seconds)
+    max_duration_s = _parse_query_value("max_duration", max_duration, hhmmss_to_seconds)
+    if min_duration_s is not None:
+        conditions.append(Run.duration_seconds >= min_duration_s)
+    if max_duration_s is not None:
+        conditions.append(Run.duration_seconds <= max_duration_s)
+
+    # Displayed pace truncates to whole seconds, so "max_pace=8:00" keeps a
+    # run at 480.4 s/mi that the response shows as 8:00/mi
+    min_pace_s = _parse_query_value("min_pace", min_pace, pace_to_seconds)
+    max_pace_s = _parse_query_value("max_pace", max_pace, pace_to_seconds)
+    if min_pace_s is not None:
+        conditions.append(Run.pace_s_per_mi >= min_pace_s)
+    if max_pace_s is not None:
+        conditions.append(Run.pace_s_per_mi < max_pace_s + 1)
+    return conditions
+
+
+def _run_list_order(sort: str) -> tuple:
+    column = RUN_SORT_COLUMNS[sort.lstrip("-")]
+    if sort == "-date":
+        # Default order, unchanged from before sorting was configurable
+        return (Run.date.desc(),)
+    direction = column.desc() if sort.startswith("-") else column.asc()
+    # Zero-distance runs have no pace; keep them at the end either way
+    return (direction.nulls_last(), Run.id.desc())
+
 
 @router.get("/", response_model=list[RunRead])
 def list_runs(
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
     run_type: Optional[RunType] = Query(None),
-    db: Session = Depends(get_db),
+    min_distance: Optional[float] = Query(None, ge=0, description="Miles"),
+    max_distance: Optional[float] = Query(None, ge=0, description="Miles"),
+    min_duration: Optional[str] = Query(None, description="HH:MM:SS"),
+    max_duration: Optional[str] = Query(None, description="HH:MM:SS"),
+    min_pace: Optional[str] = Query(None, description="M:SS per mile (faster bound)"),
+    max_pace: Optional[str] = Query(None, description="M:SS per mile (slower bound)"),
+    sort: str = Query("-date", pattern=RUN_SORT_PATTERN),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    db: Session = Depends(get_read_db),
 ):
     """
     List runs, optionally filtered by [start_date, end_date].
 
     This is what the weekly log will call:
       GET /runs?start_date=2025-01-06&end_date=2025-01-12
+
+    Distance/duration/pace ranges and the sort are applied in SQL, e.g.
+    the ten fastest runs of 6+ miles:
+      GET /runs?min_distance=6&sort=pace&limit=10
+    """
+    conditions = _run_list_conditions(
+        start_date, end_date, run_type,
+        min_distance, max_distance, min_duration, max_duration, min_pace, max_pace,
+    )
+    query = db.query(*RUN_LIST_COLUMNS).filter(*conditions).order_by(*_run_list_order(sort))
+    if limit is not None:
+        query = query.limit(limit)
+
+    # Plain column tuples, no ORM objects
+    rows = query.all()
+
+    # Already-serialized rows: skip RunRead construction and FastAPI's
+    # response_model re-validation (the schema above is kept for the docs)
+    return ORJSONResponse(_run_rows_payload(rows))
+
+
+def _as_utc(dt: datetime) -> datetime:
+    # SQLite hands back naive UTC timestamps; Postgres returns aware ones
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+@router.get("/changes", response_model=RunChanges)
+def list_run_changes(
+    since: Optional[datetime] = Query(None, description="Cursor from the previous call (ISO-8601). Omit for a full sync."),
+    db: Session = Depends(get_db),
+):
+    """Incremental sync for clients that keep a local copy of their runs.
+
+    Returns runs created/updated at or after `since` plus tombstones for
+    runs deleted since then, and a new cursor. updated_at/deleted_at are
+    the writing transaction's start time, not its commit time, so the
+    newest stamp seen is not a safe cursor: a slower transaction can
+    commit an earlier stamp after this call. The cursor is therefore the
+    database clock minus `changes_safety_lag_s` (never behind `since`),
+    and the last moments of changes come again on the next call; clients
+    upsert by id, which makes re-sent rows harmless. Read from the primary:
+    a lagging replica would have the same effect. Without `since`, every
+    run is returned.
     """
+    now = _as_utc(db.query(func.now()).scalar())
+    cursor = now - timedelta(seconds=settings.changes_safety_lag_s)
     query = db.query(Run)
+    deleted: list[RunDeletion] = []
+    if since is not None:
+        since = _as_utc(since)
+        cursor = max(cursor, since)
+        query = query.filter(Run.updated_at >= since)
+        deleted = (
+            db.query(RunDeletion)
+            .filter(RunDeletion.deleted_at >= since)
+            .order_by(RunDeletion.deleted_at, RunDeletion.id)
+            .all()
+        )
 
-    if start_date is not None:
-        query = query.filter(Run.date >= start_date)
-    if end_date is not None:
-        query = query.filter(Run.date <= end_date)
-    if run_type is not None:
-        query = query.filter(Run.run_type == run_type.value)
+    runs = query.order_by(Run.updated_at, Run.id).all()
+    return RunChanges(
+        cursor=cursor,
+        runs=[_run_read(r) for r in runs],
+        deleted=[RunTombstone(id=d.run_id, deleted_at=_as_utc(d.deleted_at)) for d in deleted],
+    )
 
-    # Most recent first
-    runs = query.order_by(Run.date.desc()).all()
 
-    results: list[RunRead] = []
-    for run in runs:
-        pace = compute_pace(run.duration_seconds, float(run.distance_mi))
-        duration_hhmmss = seconds_to_hhmmss(run.duration_seconds)
+SEARCH_MAX_RESULTS = 100
+_runs_fts = table("runs_fts", column("rowid"))
+_PG_TS_CONFIG = literal_column("'english'")
 
-        results.append(
-            RunRead(
-                id=run.id,
-                date=run.date,
-                start_time=time_to_hhmm(run.start_time),
-                title=run.title,
-                notes=run.notes,
-                distance_mi=float(run.distance_mi),
-                duration=duration_hhmmss,
-                run_type=run.run_type,
-                source=run.source if hasattr(run, 'source') else None,
-                pace=pace,
-            )
+
+def _like_pattern(q: str) -> str:
+    # "!" rather than backslash: no quoting differences between backends
+    escaped = q.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+    return f"%{escaped}%"
+
+
+def _fts5_query(q: str) -> Optional[str]:
+    # Quote every word (FTS5 operators in user input become plain text) and
+    # prefix-match it, so "maratho work" still finds "Marathon workout"
+    words = re.findall(r"\w+", q)
+    if not words:
+        return None
+    return " ".join(f'"{w}"*' for w in words)
+
+
+def _search_fulltext(db: Session, q: str, conditions: list, limit: int) -> list:
+    if db.get_bind().dialect.name == "postgresql":
+        tsquery = func.websearch_to_tsquery(_PG_TS_CONFIG, q)
+        document = search_document(Run.title, Run.notes)
+        rank = func.ts_rank_cd(document, tsquery)
+        query = db.query(*RUN_LIST_COLUMNS, rank).filter(document.op("@@")(tsquery))
+    else:
+        match = _fts5_query(q)
+        if match is None:
+            return []
+        # bm25() is lower-is-better; negate so rank sorts like ts_rank_cd
+        rank = -func.bm25(literal_column("runs_fts"))
+        query = (
+            db.query(*RUN_LIST_COLUMNS, rank)
+            .join(_runs_fts, _runs_fts.c.rowid == Run.id)
+            .filter(literal_column("runs_fts").op("MATCH")(match))
         )
+    return query.filter(*conditions).order_by(rank.desc(), Run.date.desc()).limit(limit).all()
 
-    return results
+
+def _search_fuzzy(db: Session, q: str, conditions: list, limit: int) -> list:
+    pattern = _like_pattern(q)
+    if db.get_bind().dialect.name == "postgresql":
+        # pg_trgm: similarity catches typos, ILIKE catches word fragments;
+        # both are served by the gin_trgm_ops indexes
+        rank = func.greatest(
+            func.similarity(Run.title, q),
+            func.coalesce(func.similarity(Run.notes, q), 0),
+        )
+        matches = or_(
+            Run.title.op("%")(q),
+            Run.notes.op("%")(q),
+            Run.title.ilike(pattern, escape="!"),
+            Run.notes.ilike(pattern, escape="!"),
+        )
+    else:
+        # LIKE is case-insensitive for ASCII in SQLite; title hits rank first
+        title_hit = Run.title.like(pattern, escape="!")
+        rank = case((title_hit, 1.0), else_=0.5)
+        matches = or_(title_hit, Run.notes.like(pattern, escape="!"))
+    return (
+        db.query(*RUN_LIST_COLUMNS, rank)
+        .filter(matches, *conditions)
+        .order_by(rank.desc(), Run.date.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+@router.get("/search", response_model=list[RunSearchResult])
+def search_runs(
+    q: str = Query(..., min_length=1, max_length=200),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    run_type: Optional[RunType] = Query(None),
+    limit: int = Query(20, ge=1, le=SEARCH_MAX_RESULTS),
+    db: Session = Depends(get_read_db),
+):
+    """Search run titles and notes, best matches first.
+
+    Full-text first (Postgres tsvector / SQLite FTS5, stemmed: "workouts"
+    finds "workout"); when that finds nothing, falls back to fuzzy matching
+    (pg_trgm similarity or substring) for typos and word fragments. Each
+    result carries its `rank` and which `match` produced it.
+    """
+    q = q.strip()
+    if not q:
+        raise HTTPException(status_code=422, detail="q must not be blank")
+    conditions = _run_list_conditions(start_date, end_date, run_type)
+
+    match = "fulltext"
+    rows = _search_fulltext(db, q, conditions, limit)
+    if not rows:
+        match = "fuzzy"
+        rows = _search_fuzzy(db, q, conditions, limit)
+
+    payload = _run_rows_payload([row[:-1] for row in rows])
+    for item, row in zip(payload, rows):
+        item["rank"] = round(float(row[-1]), 4)
+        item["match"] = match
+    return ORJSONResponse(payload)
 
 
 @router.put("/{run_id}", response_model=RunRead)
@@ -195,7 +520,7 @@ def update_run(run_id: int, payload: RunUpdate, db: Session = Depends(get_db)):
 def get_run_stats(
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     query = db.query(Run)
     if start_date is not None:
@@ -225,21 +550,6 @@ def get_run_stats(
 
 # --------- File Upload + Processing (GPX) --------- #
 
-def _haversine(lat1, lon1, lat2, lon2):
-    """Return great‑circle distance in meters between two WGS84 points.
-
-    Uses the standard haversine formula; sufficient for per‑point distances
-    over a typical GPS activity track.
-    """
-    R = 6371000.0
-    phi1, phi2 = math.radians(lat1), math.radians(lat2)
-    dphi = math.radians(lat2 - lat1)
-    dlambda = math.radians(lon2 - lon1)
-    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    return R * c
-
-
 def _process_gpx_file(db: Session, run_id: int, path: str):
     """Parse a GPX file and persist derived data for a run.
 
@@ -247,8 +557,12 @@ def _process_gpx_file(db: Session, run_id: int, path: str):
     - Splits: per‑mile using moving time only (speed >= MOVING_SPEED_MPS)
     - Metrics: elevation gain/loss (ft) and moving time
     """
+    import gpxpy
+
+    stages = ImportStages("gpx")
     with open(path, "r", encoding="utf-8") as f:
         gpx = gpxpy.parse(f)
+    stages.done("parse")
 
     points = []
     total_dist_m = 0.0
@@ -390,8 +704,11 @@ def _process_gpx_file(db: Session, run_id: int, path: str):
     metrics.hr_dist_series = hr_dist_series
     metrics.pace_dist_series = pace_dist_series
     metrics.elev_dist_series = elev_dist_series
+    stages.done("analyze")
 
     db.commit()
+    stages.done("persist")
+    stages.finish(len(points))
 
 
 def _gpx_basic_stats(path: str):
@@ -399,6 +716,7 @@ def _gpx_basic_stats(path: str):
     Falls back gracefully if timestamps are missing.
     """
     from datetime import datetime
+    import gpxpy
 
     with open(path, "r", encoding="utf-8") as f:
         gpx = gpxpy.parse(f)
@@ -439,6 +757,7 @@ def _semicircles_to_degrees(val):
 def _fit_basic_stats(path: str):
     """Extract (date, local_start_hhmm, duration_seconds, distance_miles) from FIT."""
     from datetime import timezone
+    from fitparse import FitFile
     ff = FitFile(path)
     start_ts = None
     end_ts = None
@@ -496,6 +815,8 @@ def _tcx_basic_stats(path: str):
     """Extract (date, local_start_hhmm, duration_seconds, distance_miles) from TCX.
     Strava exports TCX with Trackpoint Time; distance may be present in Lap.
     """
+    import xml.etree.ElementTree as ET
+
     tree = ET.parse(path)
     root = tree.getroot()
     ns = {
@@ -539,9 +860,13 @@ def _process_tcx_file(db: Session, run_id: int, path: str):
     """Parse TCX and persist track, splits, metrics, and distance-indexed series.
     This is a middle-ground between FIT and GPX: HR often present, timestamps + elevation available.
     """
+    import xml.etree.ElementTree as ET
+
+    stages = ImportStages("tcx")
     tree = ET.parse(path)
     root = tree.getroot()
     ns = { 'tcx': 'http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2' }
+    stages.done("parse")
 
     from datetime import datetime
     def parse_time(s):
@@ -679,7 +1004,10 @@ def _process_tcx_file(db: Session, run_id: int, path: str):
     metrics.hr_dist_series = hr_dist_series
     metrics.pace_dist_series = pace_dist_series
     metrics.elev_dist_series = elev_dist_series
+    stages.done("analyze")
     db.commit()
+    stages.done("persist")
+    stages.finish(len(points))
 
 
 def _process_fit_file(db: Session, run_id: int, path: str):
@@ -689,7 +1017,12 @@ def _process_fit_file(db: Session, run_id: int, path: str):
     - Fall back to moving‑time per‑mile splits when no laps are available
     - Store HR/pace downsampled series and HR zones summary
     """
+    from fitparse import FitFile
+
+    stages = ImportStages("fit")
     ff = FitFile(path)
+    ff.parse()  # decode everything up front; get_messages() below reads the cache
+    stages.done("parse")
     points = []
     total_m = 0.0
     elev_gain = 0.0
@@ -1022,7 +1355,10 @@ def _process_fit_file(db: Session, run_id: int, path: str):
     metrics.hr_dist_series = hr_dist_series
     metrics.pace_dist_series = pace_dist_series
     metrics.elev_dist_series = elev_dist_series
+    stages.done("analyze")
     db.commit()
+    stages.done("persist")
+    stages.finish(len(points))
 
 
 @router.post("/{run_id}/files")
@@ -1046,9 +1382,10 @@ def upload_run_file(
     os.makedirs(dir_path, exist_ok=True)
     save_path = os.path.join(dir_path, filename)
 
-    data = file.file.read()
-    with open(save_path, "wb") as out:
-        out.write(data)
+    with import_stage("upload_write", ext.lstrip(".")):
+        data = file.file.read()
+        with open(save_path, "wb") as out:
+            out.write(data)
 
     rf = RunFile(
         run_id=run_id,
@@ -1065,7 +1402,7 @@ def upload_run_file(
 
     # Background processing
     if background is not None:
-        background.add_task(_process_gpx_file, db, run_id, save_path)
+        background.add_task(track_job("file_processing", _process_gpx_file), db, run_id, save_path)
         rf.processed = True  # mark optimistic; processor commits the outputs
         db.commit()
     else:
@@ -1076,11 +1413,21 @@ def upload_run_file(
     return {"message": "File uploaded", "file_id": rf.id}
 
 
-@router.get("/{run_id}/metrics")
-def get_run_metrics(run_id: int, db: Session = Depends(get_db)):
-    m = db.query(RunMetrics).filter(RunMetrics.run_id == run_id).first()
-    if not m:
-        raise HTTPException(status_code=404, detail="No metrics")
+def _downsample(seq, max_points: Optional[int]):
+    """Thin a point list to at most `max_points` by fixed stride.
+
+    The last point is always kept so tracks still end where the run ended.
+    """
+    if not seq or not max_points or len(seq) <= max_points:
+        return seq
+    step = math.ceil((len(seq) - 1) / (max_points - 1))
+    out = seq[::step]
+    if (len(seq) - 1) % step:
+        out.append(seq[-1])
+    return out
+
+
+def _metrics_payload(m: RunMetrics) -> dict:
     return {
         "avg_hr": m.avg_hr,
         "max_hr": m.max_hr,
@@ -1092,51 +1439,145 @@ def get_run_metrics(run_id: int, db: Session = Depends(get_db)):
     }
 
 
+def _series_payload(m: RunMetrics, max_points: Optional[int] = None) -> dict:
+    return {
+        "hr_series": _downsample(m.hr_series or [], max_points),
+        "pace_series": _downsample(m.pace_series or [], max_points),
+        "hr_dist_series": _downsample(m.hr_dist_series or [], max_points),
+        "pace_dist_series": _downsample(m.pace_dist_series or [], max_points),
+        "elev_dist_series": _downsample(m.elev_dist_series or [], max_points),
+    }
+
+
+def _split_payload(r: RunSplit) -> dict:
+    return {
+        "idx": r.idx,
+        "distance_mi": float(r.distance_mi),
+        "duration_sec": r.duration_sec,
+        "avg_hr": r.avg_hr,
+        "max_hr": r.max_hr,
+        "elev_gain_ft": float(r.elev_gain_ft) if r.elev_gain_ft is not None else None,
+    }
+
+
+def _track_payload(t: RunTrack, max_points: Optional[int] = None) -> dict:
+    geojson = t.geojson
+    if max_points and geojson and geojson.get("coordinates"):
+        geojson = {**geojson, "coordinates": _downsample(geojson["coordinates"], max_points)}
+    return {
+        "geojson": geojson,
+        "bounds": t.bounds,
+        "points_count": t.points_count,
+    }
+
+
+@router.get("/{run_id}/metrics")
+def get_run_metrics(run_id: int, db: Session = Depends(get_read_db)):
+    m = db.query(RunMetrics).filter(RunMetrics.run_id == run_id).first()
+    if not m:
+        raise HTTPException(status_code=404, detail="No metrics")
+    return _metrics_payload(m)
+
+
 @router.get("/{run_id}/series")
-def get_run_series(run_id: int, db: Session = Depends(get_db)):
+def get_run_series(run_id: int, db: Session = Depends(get_read_db)):
     m = db.query(RunMetrics).filter(RunMetrics.run_id == run_id).first()
     if not m:
         raise HTTPException(status_code=404, detail="No series")
-    return {
-        "hr_series": m.hr_series or [],
-        "pace_series": m.pace_series or [],
-        "hr_dist_series": m.hr_dist_series or [],
-        "pace_dist_series": m.pace_dist_series or [],
-        "elev_dist_series": m.elev_dist_series or [],
-    }
+    return _series_payload(m)
 
 
 @router.get("/{run_id}/splits")
-def get_run_splits(run_id: int, db: Session = Depends(get_db)):
+def get_run_splits(run_id: int, db: Session = Depends(get_read_db)):
     rows = (
         db.query(RunSplit)
         .filter(RunSplit.run_id == run_id)
         .order_by(RunSplit.idx)
         .all()
     )
-    return [
-        {
-            "idx": r.idx,
-            "distance_mi": float(r.distance_mi),
-            "duration_sec": r.duration_sec,
-            "avg_hr": r.avg_hr,
-            "max_hr": r.max_hr,
-            "elev_gain_ft": float(r.elev_gain_ft) if r.elev_gain_ft is not None else None,
-        }
-        for r in rows
-    ]
+    return [_split_payload(r) for r in rows]
 
 
 @router.get("/{run_id}/track")
-def get_run_track(run_id: int, db: Session = Depends(get_db)):
+def get_run_track(run_id: int, db: Session = Depends(get_read_db)):
     t = db.query(RunTrack).filter(RunTrack.run_id == run_id).first()
     if not t:
         raise HTTPException(status_code=404, detail="No track")
-    return {
-        "geojson": t.geojson,
-        "bounds": t.bounds,
-        "points_count": t.points_count,
-    }
+    return _track_payload(t)
+
+
+DETAIL_SECTIONS = ("metrics", "splits", "track", "series")
+_SERIES_COLUMNS = (
+    RunMetrics.hr_series,
+    RunMetrics.pace_series,
+    RunMetrics.hr_dist_series,
+    RunMetrics.pace_dist_series,
+    RunMetrics.elev_dist_series,
+)
+
+
+def _detail_sections(include: str) -> set[str]:
+    sections = {s.strip() for s in include.split(",") if s.strip()}
+    unknown = sections - set(DETAIL_SECTIONS)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown include: {', '.join(sorted(unknown))}")
+    return sections
+
+
+def _detail_load_options(sections: set[str]) -> list:
+    """Eager-load options for a Run query covering the requested sections."""
+    options = []
+    if "metrics" in sections or "series" in sections:
+        metrics_opt = joinedload(Run.metrics)
+        if "series" not in sections:
+            # Series JSON is the bulk of the row; skip it when not asked for
+            metrics_opt = metrics_opt.options(*(defer(c) for c in _SERIES_COLUMNS))
+        options.append(metrics_opt)
+    if "track" in sections:
+        options.append(joinedload(Run.track))
+    if "splits" in sections:
+        options.append(selectinload(Run.splits))
+    return options
+
+
+def _detail_payload(run: Run, sections: set[str], track_points=None, series_points=None) -> dict:
+    out: dict = {"run": _run_read(run)}
+    if "metrics" in sections:
+        out["metrics"] = _metrics_payload(run.metrics) if run.metrics else None
+    if "series" in sections:
+        out["series"] = _series_payload(run.metrics, series_points) if run.metrics else None
+    if "splits" in sections:
+        out["splits"] = [_split_payload(r) for r in run.splits]
+    if "track" in sections:
+        out["track"] = _track_payload(run.track, track_points) if run.track else None
+    return out
+
+
+@router.get("/{run_id}/detail")
+def get_run_detail(
+    run_id: int,
+    include: str = Query(",".join(DETAIL_SECTIONS), description="Comma-separated: metrics,splits,track,series"),
+    track_points: Optional[int] = Query(None, ge=2, description="Max track coordinates to return"),
+    series_points: Optional[int] = Query(None, ge=2, description="Max points per series to return"),
+    db: Session = Depends(get_read_db),
+):
+    """Everything the Details panel needs in a single request.
+
+    Replaces separate calls to /metrics, /series, /splits and /track.
+    Metrics and track are joined onto the run row; splits load with one
+    extra IN query. Sections that are requested but missing come back as
+    null (or [] for splits) instead of a 404.
+    """
+    sections = _detail_sections(include)
+    run = (
+        db.query(Run)
+        .options(*_detail_load_options(sections))
+        .filter(Run.id == run_id)
+        .first()
+    )
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return _detail_payload(run, sections, track_points, series_points)
 
 
 @router.post("/{run_id}/reprocess")
@@ -1147,7 +1588,8 @@ def reprocess_run(
 ):
     """Rebuild splits/metrics/series/track for a run from its stored file.
 
-    Preference order: FIT > GPX. If no file found, return 404.
+    Preference order: FIT > GPX > cached Strava streams (no API calls).
+    If no file found, return 404.
     """
     run = db.query(Run).filter(Run.id == run_id).first()
     if not run:
@@ -1188,19 +1630,19 @@ def reprocess_run(
         raise HTTPException(status_code=404, detail="Stored file missing on disk")
 
     src = (chosen.source or "").lower()
+    if src == STREAMS_FILE_SOURCE:
+        processor = reprocess_raw_streams
+    elif src == "gpx" or path.lower().endswith(".gpx"):
+        processor = _process_gpx_file
+    else:
+        processor = _process_fit_file
     if background is not None:
-        if src == "gpx" or path.lower().endswith(".gpx"):
-            background.add_task(_process_gpx_file, db, run_id, path)
-        else:
-            background.add_task(_process_fit_file, db, run_id, path)
+        background.add_task(track_job("file_processing", processor), db, run_id, path)
         # Mark processed optimistically; processors will commit outputs
         chosen.processed = True
         db.commit()
     else:
-        if src == "gpx" or path.lower().endswith(".gpx"):
-            _process_gpx_file(db, run_id, path)
-        else:
-            _process_fit_file(db, run_id, path)
+        processor(db, run_id, path)
         chosen.processed = True
         db.commit()
 
@@ -1226,9 +1668,10 @@ def import_activity(
     dir_path = os.path.join(settings.uploads_dir, "imports")
     os.makedirs(dir_path, exist_ok=True)
     save_path = os.path.join(dir_path, filename)
-    data = file.file.read()
-    with open(save_path, "wb") as out:
-        out.write(data)
+    with import_stage("upload_write", ext.lstrip(".")):
+        data = file.file.read()
+        with open(save_path, "wb") as out:
+            out.write(data)
 
     # Basic stats to create the run
     try:
@@ -1283,11 +1726,11 @@ def import_activity(
 
     if background is not None:
         if ext == ".gpx":
-            background.add_task(_process_gpx_file, db, run.id, final_path)
+            background.add_task(track_job("file_processing", _process_gpx_file), db, run.id, final_path)
         elif ext == ".tcx":
-            background.add_task(_process_tcx_file, db, run.id, final_path)
+            background.add_task(track_job("file_processing", _process_tcx_file), db, run.id, final_path)
         else:
-            background.add_task(_process_fit_file, db, run.id, final_path)
+            background.add_task(track_job("file_processing", _process_fit_file), db, run.id, final_path)
         rf.processed = True
         db.commit()
     else:
@@ -1324,13 +1767,14 @@ def delete_run(run_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Run not found")
 
     db.delete(db_run)
+    db.add(RunDeletion(run_id=run_id))
     db.commit()
     return {"message": "Run deleted"}
 
 @router.get("/weekly_mileage", response_model=list[WeeklyMileagePoint])
 def get_weekly_mileage(
     weeks: int = 12,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     Return weekly mileage totals for the last `weeks` weeks (including the current week).
@@ -1338,13 +1782,7 @@ def get_weekly_mileage(
     - Weeks are Monday–Sunday.
     - Even if there are no runs in a given week, it appears with 0.0 mileage.
     """
-    today = date.today()
-
-    # Monday of the current week
-    start_of_this_week = today - timedelta(days=today.weekday())
-
-    # Oldest Monday we care about
-    start_date = start_of_this_week - timedelta(weeks=weeks - 1)
+    start_date = _weekly_window_start(weeks)
 
     # Aggregate distance per week using Postgres date_trunc('week', ...)
     week_start_col = func.date_trunc("week", Run.date).cast(Date).label("week_start")
@@ -1357,7 +1795,22 @@ def get_weekly_mileage(
         .order_by(week_start_col)
         .all()
     )
+    return _fill_weeks(rows, start_date, weeks)
+
+
+def _weekly_window_start(weeks: int) -> date:
+    """Oldest Monday of a `weeks`-long window ending with the current week."""
+    today = date.today()
+
+    # Monday of the current week
+    start_of_this_week = today - timedelta(days=today.weekday())
+
+    # Oldest Monday we care about
+    return start_of_this_week - timedelta(weeks=weeks - 1)
+
 
+def _fill_weeks(rows, start_date: date, weeks: int) -> list[WeeklyMileagePoint]:
+    """Turn (week_start, total) rows into a continuous weekly series."""
     # Map from week_start (date) -> total mileage
     mileage_by_week: dict[date, float] = {}
     for week_start, total in rows:
@@ -1393,19 +1846,23 @@ def purge_all_runs(confirm: str = Query("no"), db: Session = Depends(get_db)):
     if confirm.lower() != "yes":
         raise HTTPException(status_code=400, detail="Add ?confirm=yes to proceed")
 
+    # Leave tombstones so synced clients drop their local copies too
+    db.execute(insert(RunDeletion).from_select(["run_id"], select(Run.id)))
+
     # Delete dependent tables first, then runs
     db.query(RunSplit).delete()
     db.query(RunTrack).delete()
     db.query(RunMetrics).delete()
     db.query(RunFile).delete()
     db.query(Run).delete()
+    notify_runs_changed(db)
     db.commit()
 
     # Best effort: clean uploads dir
     try:
         base = settings.uploads_dir
         if base and os.path.isdir(base):
-            for sub in ("runs", "imports"):
+            for sub in ("runs", "imports", BLOB_DIR):
                 path = os.path.join(base, sub)
                 if os.path.isdir(path):
                     for root, dirs, files in os.walk(path, topdown=False):
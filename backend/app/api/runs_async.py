@@ -0,0 +1,158 @@
+"""Async versions of the read-heavy /runs routes.
+
+Registered ahead of the sync router when settings.db_async is on, so these
+handlers shadow their sync twins on the same paths and await the database
+on the event loop instead of holding a threadpool thread per request.
+Queries and response shapes mirror app/api/runs.py; serialization helpers
+are shared with it.
+"""
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import Date, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.runs import (
+    DETAIL_SECTIONS,
+    RUN_LIST_COLUMNS,
+    RUN_SORT_PATTERN,
+    _detail_load_options,
+    _detail_payload,
+    _detail_sections,
+    _fill_weeks,
+    _metrics_payload,
+    _run_list_conditions,
+    _run_list_order,
+    _run_rows_payload,
+    _series_payload,
+    _split_payload,
+    _track_payload,
+    _weekly_window_start,
+)
+from app.core.request_timing import TimedRoute
+from app.db import get_async_db
+from app.models.run import Run
+from app.models.run_metrics import RunMetrics
+from app.models.run_split import RunSplit
+from app.models.run_track import RunTrack
+from app.schemas.run import RunRead, RunType, WeeklyMileagePoint
+
+router = APIRouter(prefix="/runs", tags=["runs"], route_class=TimedRoute)
+
+
+@router.get("/", response_model=list[RunRead])
+async def list_runs(
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    run_type: Optional[RunType] = Query(None),
+    min_distance: Optional[float] = Query(None, ge=0, description="Miles"),
+    max_distance: Optional[float] = Query(None, ge=0, description="Miles"),
+    min_duration: Optional[str] = Query(None, description="HH:MM:SS"),
+    max_duration: Optional[str] = Query(None, description="HH:MM:SS"),
+    min_pace: Optional[str] = Query(None, description="M:SS per mile (faster bound)"),
+    max_pace: Optional[str] = Query(None, description="M:SS per mile (slower bound)"),
+    sort: str = Query("-date", pattern=RUN_SORT_PATTERN),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db),
+):
+    conditions = _run_list_conditions(
+        start_date, end_date, run_type,
+        min_distance, max_distance, min_duration, max_duration, min_pace, max_pace,
+    )
+    stmt = select(*RUN_LIST_COLUMNS).where(*conditions).order_by(*_run_list_order(sort))
+    if limit is not None:
+        stmt = stmt.limit(limit)
+
+    rows = (await db.execute(stmt)).all()
+    return ORJSONResponse(_run_rows_payload(rows))
+
+
+@router.get("/stats")
+async def get_run_stats(
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    stmt = select(Run.run_type, func.sum(Run.distance_mi)).group_by(Run.run_type)
+    if start_date is not None:
+        stmt = stmt.where(Run.date >= start_date)
+    if end_date is not None:
+        stmt = stmt.where(Run.date <= end_date)
+
+    by_type: dict[str, float] = {t: 0.0 for t in [e.value for e in RunType]}
+    total = 0.0
+    for t, s in (await db.execute(stmt)).all():
+        by_type[str(t)] = float(s or 0.0)
+        total += float(s or 0.0)
+
+    return {
+        "total_miles": total,
+        "by_type": by_type,
+    }
+
+
+@router.get("/weekly_mileage", response_model=list[WeeklyMileagePoint])
+async def get_weekly_mileage(
+    weeks: int = 12,
+    db: AsyncSession = Depends(get_async_db),
+):
+    start_date = _weekly_window_start(weeks)
+    week_start_col = func.date_trunc("week", Run.date).cast(Date).label("week_start")
+    stmt = (
+        select(week_start_col, func.sum(Run.distance_mi).label("total_mileage"))
+        .where(Run.date >= start_date)
+        .group_by(week_start_col)
+        .order_by(week_start_col)
+    )
+    rows = (await db.execute(stmt)).all()
+    return _fill_weeks(rows, start_date, weeks)
+
+
+@router.get("/{run_id}/metrics")
+async def get_run_metrics(run_id: int, db: AsyncSession = Depends(get_async_db)):
+    m = await db.get(RunMetrics, run_id)
+    if not m:
+        raise HTTPException(status_code=404, detail="No metrics")
+    return _metrics_payload(m)
+
+
+@router.get("/{run_id}/series")
+async def get_run_series(run_id: int, db: AsyncSession = Depends(get_async_db)):
+    m = await db.get(RunMetrics, run_id)
+    if not m:
+        raise HTTPException(status_code=404, detail="No series")
+    return _series_payload(m)
+
+
+@router.get("/{run_id}/splits")
+async def get_run_splits(run_id: int, db: AsyncSession = Depends(get_async_db)):
+    rows = await db.scalars(
+        select(RunSplit).where(RunSplit.run_id == run_id).order_by(RunSplit.idx)
+    )
+    return [_split_payload(r) for r in rows]
+
+
+@router.get("/{run_id}/track")
+async def get_run_track(run_id: int, db: AsyncSession = Depends(get_async_db)):
+    t = await db.get(RunTrack, run_id)
+    if not t:
+        raise HTTPException(status_code=404, detail="No track")
+    return _track_payload(t)
+
+
+@router.get("/{run_id}/detail")
+async def get_run_detail(
+    run_id: int,
+    include: str = Query(",".join(DETAIL_SECTIONS), description="Comma-separated: metrics,splits,track,series"),
+    track_points: Optional[int] = Query(None, ge=2, description="Max track coordinates to return"),
+    series_points: Optional[int] = Query(None, ge=2, description="Max points per series to return"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    sections = _detail_sections(include)
+    stmt = select(Run).options(*_detail_load_options(sections)).where(Run.id == run_id)
+    run = (await db.scalars(stmt)).unique().first()
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return _detail_payload(run, sections, track_points, series_points)
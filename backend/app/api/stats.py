@@ -0,0 +1,130 @@
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import extract, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.request_timing import TimedRoute
+from app.core.training_load import training_load_series
+from app.core.year_stats import get_year_stats
+from app.db import get_db, get_read_db
+from app.models.run import Run
+from app.schemas.stats import CalendarYear, CumulativeMileage, TrainingLoadPoint, YearSummary
+
+
+router = APIRouter(prefix="/stats", tags=["stats"], route_class=TimedRoute)
+
+TRAINING_LOAD_MAX_DAYS = 3660
+CUMULATIVE_MAX_YEARS = 10
+
+
+@router.get("/training_load", response_model=list[TrainingLoadPoint])
+def get_training_load(
+    start: Optional[date] = Query(None, description="Default: 90 days before end"),
+    end: Optional[date] = Query(None, description="Default: today"),
+    db: Session = Depends(get_db),  # may materialize missing days, so primary
+):
+    """Daily TRIMP load with ATL (7-day), CTL (42-day) and TSB (form).
+
+    Days before the first run are omitted; later days without runs are
+    included with load 0 so the curves decay. The series stops a month
+    past today, or past the last run if that is later.
+    """
+    end = end or date.today()
+    start = start or end - timedelta(days=89)
+    if start > end:
+        raise HTTPException(status_code=422, detail="start must be on or before end")
+    if (end - start).days >= TRAINING_LOAD_MAX_DAYS:
+        raise HTTPException(status_code=422, detail=f"At most {TRAINING_LOAD_MAX_DAYS} days per request")
+
+    return [
+        TrainingLoadPoint(
+            date=p["day"],
+            load=round(p["load"], 1),
+            atl=round(p["atl"], 1),
+            ctl=round(p["ctl"], 1),
+            tsb=round(p["tsb"], 1),
+        )
+        for p in training_load_series(db, start, end)
+    ]
+
+
+def _year_or_current(year: Optional[int]) -> int:
+    return year if year is not None else date.today().year
+
+
+@router.get("/calendar", response_model=CalendarYear)
+def get_calendar(
+    year: Optional[int] = Query(None, ge=1900, le=2999, description="Default: current year"),
+    db: Session = Depends(get_db),  # may fill the cache, so primary
+):
+    """Daily totals for every day of the year (heatmap)."""
+    stats = get_year_stats(db, _year_or_current(year))
+    # Cached JSON is already in the response shape
+    return ORJSONResponse({"year": stats["year"], "days": stats["calendar"]})
+
+
+@router.get("/year_summary", response_model=YearSummary)
+def get_year_summary(
+    year: Optional[int] = Query(None, ge=1900, le=2999, description="Default: current year"),
+    db: Session = Depends(get_db),
+):
+    """Year totals, longest run and per-month rollups."""
+    return ORJSONResponse(get_year_stats(db, _year_or_current(year))["summary"])
+
+
+def _parse_years(years: Optional[str]) -> list[int]:
+    if not years:
+        this_year = date.today().year
+        return [this_year - 1, this_year]
+    try:
+        parsed = sorted({int(y) for y in years.split(",") if y.strip()})
+    except ValueError:
+        raise HTTPException(status_code=422, detail="years must be comma-separated, e.g. 2024,2025")
+    if not parsed or len(parsed) > CUMULATIVE_MAX_YEARS:
+        raise HTTPException(status_code=422, detail=f"Give 1-{CUMULATIVE_MAX_YEARS} years")
+    if parsed[0] < 1900 or parsed[-1] > 2999:
+        raise HTTPException(status_code=422, detail="years out of range")
+    return parsed
+
+
+@router.get("/cumulative", response_model=CumulativeMileage)
+def get_cumulative_mileage(
+    years: Optional[str] = Query(None, description="Comma-separated, e.g. 2024,2025,2026. Default: last year and this year."),
+    db: Session = Depends(get_read_db),
+):
+    """Running mileage total by day of year, one gap-filled column per year."""
+    year_list = _parse_years(years)
+
+    # Daily totals, then the running sum per year in SQL; only days with
+    # runs come back, the gaps are filled below
+    year_col = extract("year", Run.date)
+    daily = (
+        select(Run.date.label("day"), year_col.label("year"), func.sum(Run.distance_mi).label("miles"))
+        .where(or_(*(Run.date.between(date(y, 1, 1), date(y, 12, 31)) for y in year_list)))
+        .group_by(Run.date, year_col)
+        .subquery()
+    )
+    running = func.sum(daily.c.miles).over(partition_by=daily.c.year, order_by=daily.c.day)
+    rows = db.execute(select(daily.c.day, running).order_by(daily.c.day)).all()
+
+    totals_by_day = {day: float(total) for day, total in rows}
+    today = date.today()
+    series = []
+    for year in year_list:
+        start = date(year, 1, 1)
+        n_days = (date(year + 1, 1, 1) - start).days
+        column: list[Optional[float]] = []
+        total = 0.0
+        for i in range(366):
+            day = start + timedelta(days=i)
+            if i >= n_days or day > today:
+                column.append(None)
+                continue
+            total = totals_by_day.get(day, total)
+            column.append(round(total, 2))
+        series.append({"year": year, "total_mi": round(total, 2), "cumulative_mi": column})
+
+    return ORJSONResponse({"day_of_year": list(range(1, 367)), "series": series})
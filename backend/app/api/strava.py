@@ -1,24 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import RedirectResponse
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from app.db import get_db
+from app.db import SessionLocal, get_db
 from app.core.config import settings
 from app.models.run import Run
-from app.models.run_track import RunTrack
-from app.models.run_metrics import RunMetrics
-from app.models.run_split import RunSplit
-from app.core.time_utils import compute_pace, seconds_to_hhmmss, hhmm_to_time
-from app.core.constants import HR_ZONE_BOUNDS, MILE_M, SAMPLE_STEP_M, MOVING_SPEED_MPS
-from app.api.runs import _haversine
-import os, json, time, math
+from app.models.strava_sync_state import StravaSyncState
+from app.core.time_utils import hhmm_to_time
+from app.core.strava_tokens import get_token_manager
+from app.core.metrics import import_stage, track_job
+from app.core.request_timing import TimedRoute
+from app.core.strava_webhook import event_from_payload, process_events
+from app.core.strava_streams import STREAM_KEYS, link_raw_streams, process_streams, store_stream_outputs
+from app.core.strava_sync import (
+    DEFAULT_CONCURRENCY,
+    EXTERNAL_SOURCE,
+    StravaError,
+    get_sync_state,
+    observe_rate_limits,
+    strava_client,
+    sync_activities,
+)
+import asyncio
+import time
 import httpx
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 
-router = APIRouter(prefix="/strava", tags=["strava"])
-
-
-def _ensure_dir(path: str):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
+router = APIRouter(prefix="/strava", tags=["strava"], route_class=TimedRoute)
 
 
 def _infer_run_type_from_strava(activity: dict) -> str:
@@ -59,7 +66,7 @@ def _infer_run_type_from_strava(activity: dict) -> str:
 def get_auth_url():
     if not (settings.strava_client_id and settings.strava_redirect_uri):
         raise HTTPException(status_code=400, detail="Strava client not configured")
-    base = "https://www.strava.com/oauth/authorize"
+    base = f"{settings.strava_base_url}/oauth/authorize"
     params = {
         "client_id": settings.strava_client_id,
         "redirect_uri": settings.strava_redirect_uri,
@@ -82,58 +89,40 @@ def oauth_callback(code: str):
         "grant_type": "authorization_code",
     }
     with httpx.Client(timeout=30) as client:
-        r = client.post("https://www.strava.com/oauth/token", data=data)
+        r = client.post(f"{settings.strava_base_url}/oauth/token", data=data)
         if r.status_code != 200:
             raise HTTPException(status_code=400, detail=f"Strava auth failed: {r.text}")
         tok = r.json()
-    _ensure_dir(settings.strava_tokens_path)
-    with open(settings.strava_tokens_path, "w") as f:
-        json.dump(tok, f)
+    get_token_manager().set(tok)
     return {"message": "Strava linked. You can close this window."}
 
 
-def _load_tokens():
-    try:
-        with open(settings.strava_tokens_path, "r") as f:
-            return json.load(f)
-    except Exception:
-        return None
-
-
-def _save_tokens(tok):
-    _ensure_dir(settings.strava_tokens_path)
-    with open(settings.strava_tokens_path, "w") as f:
-        json.dump(tok, f)
-
-
-def _refresh_if_needed(tok):
-    now = int(time.time())
-    if tok.get("expires_at", 0) - now > 60:
-        return tok
-    data = {
-        "client_id": settings.strava_client_id,
-        "client_secret": settings.strava_client_secret,
-        "grant_type": "refresh_token",
-        "refresh_token": tok.get("refresh_token"),
-    }
-    with httpx.Client(timeout=30) as client:
-        r = client.post("https://www.strava.com/oauth/token", data=data)
-        r.raise_for_status()
-        nt = r.json()
-    _save_tokens(nt)
-    return nt
+RECENT_SYNC_KEY = "recent"
 
 
 @router.get("/status")
-def strava_status():
+def strava_status(db: Session = Depends(get_db)):
     """Return whether Strava is linked and basic athlete info if available.
 
-    Does not contact Strava; it only checks for a stored token file.
+    Does not contact Strava; it only checks for a stored token file and
+    reports where the rolling sync will resume.
     """
-    tok = _load_tokens()
+    tok = get_token_manager().get()
     if not tok:
         return {"linked": False}
     athlete = tok.get("athlete") or {}
+    state = db.get(StravaSyncState, RECENT_SYNC_KEY)
+    sync = None
+    if state is not None:
+        sync = {
+            "cursor": (
+                datetime.fromtimestamp(state.after_cursor, tz=timezone.utc).isoformat()
+                if state.after_cursor is not None else None
+            ),
+            "pending_streams": len(state.pending or []),
+            "last_page": state.last_page,
+            "updated_at": state.updated_at.isoformat() if state.updated_at else None,
+        }
     return {
         "linked": True,
         "athlete": {
@@ -141,25 +130,12 @@ def strava_status():
             "firstname": athlete.get("firstname"),
             "lastname": athlete.get("lastname"),
         },
+        "sync": sync,
     }
 
 
-@router.post("/sync")
-def sync_recent_runs(
-    weeks: int = Query(12, ge=1, le=104, description="Ignored if start_date provided"),
-    types: str = Query("Run", description="Comma-separated Strava activity types to import (default: Run)"),
-    max_activities: int | None = Query(None, ge=1, description="Optional hard cap of activities to import this call"),
-    start_date: str | None = Query(None, description="YYYY-MM-DD (inclusive). Overrides weeks when set."),
-    end_date: str | None = Query(None, description="YYYY-MM-DD (exclusive). Optional with start_date."),
-    start_page: int = Query(1, ge=1, description="Start page when paginating a date window"),
-    db: Session = Depends(get_db),
-):
-    tok = _load_tokens()
-    if not tok:
-        raise HTTPException(status_code=400, detail="Strava not linked. Hit /strava/auth_url first.")
-    tok = _refresh_if_needed(tok)
-    hdrs = {"Authorization": f"Bearer {tok['access_token']}"}
-    # Build time window: prefer explicit dates
+def _sync_window(weeks: int, start_date: str | None, end_date: str | None) -> tuple[int, int | None]:
+    """(after, before) epoch seconds; explicit dates win over `weeks`."""
     if start_date:
         sd = datetime.fromisoformat(start_date).replace(tzinfo=timezone.utc)
         after = int(sd.timestamp())
@@ -171,6 +147,65 @@ def sync_recent_runs(
     else:
         after = int(time.time() - weeks * 7 * 86400)
         before = None
+    return after, before
+
+
+@router.post("/sync")
+async def sync_recent_runs(
+    weeks: int = Query(12, ge=1, le=104, description="Ignored if start_date provided"),
+    types: str = Query("Run", description="Comma-separated Strava activity types to import (default: Run)"),
+    max_activities: int | None = Query(None, ge=1, description="Optional hard cap of activities to import this call"),
+    start_date: str | None = Query(None, description="YYYY-MM-DD (inclusive). Overrides weeks when set."),
+    end_date: str | None = Query(None, description="YYYY-MM-DD (exclusive). Optional with start_date."),
+    start_page: int = Query(1, ge=1, description="Start page when paginating a date window"),
+    concurrency: int = Query(DEFAULT_CONCURRENCY, ge=1, le=32, description="Concurrent stream downloads"),
+    engine: str = Query("async", pattern="^(async|legacy)$", description="legacy = sequential sync, kept for comparison"),
+    reset: bool = Query(False, description="Forget the stored cursor and start again from weeks/start_date"),
+    db: Session = Depends(get_db),
+):
+    """Import Strava activities, resuming where the previous call stopped.
+
+    The rolling sync (no start_date) keeps its cursor under one key, so
+    `weeks` only sets the starting point of the very first call (or of a
+    reset); after that each call lists just the activities since the last
+    one it saw. An explicit date window keeps a cursor of its own.
+    """
+    tokens = get_token_manager()
+    if not tokens.get():
+        raise HTTPException(status_code=400, detail="Strava not linked. Hit /strava/auth_url first.")
+    after, before = _sync_window(weeks, start_date, end_date)
+    allowed_types = {t.strip() for t in types.split(",") if t.strip()}
+
+    if engine == "legacy":
+        return await run_in_threadpool(
+            _sync_recent_runs_sequential, db, after, before, allowed_types, max_activities, start_page
+        )
+
+    key = f"window:{after}:{before or ''}" if start_date else RECENT_SYNC_KEY
+    state = await run_in_threadpool(get_sync_state, db, key, after, reset)
+    tok = await run_in_threadpool(tokens.fresh)
+    async with strava_client(tok["access_token"]) as client:
+        try:
+            result = await sync_activities(
+                db,
+                client,
+                before=before,
+                state=state,
+                allowed_types=allowed_types,
+                max_activities=max_activities,
+                start_page=start_page,
+                concurrency=concurrency,
+                infer_run_type=_infer_run_type_from_strava,
+            )
+        except StravaError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return result.as_response()
+
+
+def _sync_recent_runs_sequential(db: Session, after, before, allowed_types, max_activities, start_page):
+    """The original one-request-at-a-time sync (engine=legacy)."""
+    tok = get_token_manager().fresh()
+    hdrs = {"Authorization": f"Bearer {tok['access_token']}"}
 
     imported = 0
     # Decide per_page optimally for pagination
@@ -179,28 +214,18 @@ def sync_recent_runs(
         per_page = max(1, min(200, max_activities))
 
     pages = start_page
-    allowed_types = {t.strip() for t in types.split(",") if t.strip()}
 
-    def _check_limits(resp):
-        ml = resp.headers.get("X-RateLimit-Limit")
-        mu = resp.headers.get("X-RateLimit-Usage")
-        try:
-            minute_limit, day_limit = [int(x) for x in ml.split(",")] if ml else (100, 1000)
-            minute_used, day_used = [int(x) for x in mu.split(",")] if mu else (0, 0)
-        except Exception:
-            minute_limit, day_limit, minute_used, day_used = 100, 1000, 0, 0
-        return minute_limit, minute_used, day_limit, day_used
     with httpx.Client(timeout=60, headers=hdrs) as client:
         while True:
             params = {"after": after, "per_page": per_page, "page": pages}
             if before:
                 params["before"] = before
-            r = client.get("https://www.strava.com/api/v3/athlete/activities", params=params)
+            r = client.get(f"{settings.strava_base_url}/api/v3/athlete/activities", params=params)
             if r.status_code != 200:
                 raise HTTPException(status_code=400, detail=f"Strava list activities failed: {r.text}")
             acts = r.json()
             # Stop early if approaching minute limit
-            mlim, mused, _, _ = _check_limits(r)
+            mlim, mused, _, _ = observe_rate_limits(r.headers)
             if mused >= max(1, mlim - 5):
                 break
             if not acts:
@@ -217,13 +242,18 @@ def sync_recent_runs(
                 title = a.get("name") or "Strava Run"
                 inferred_type = _infer_run_type_from_strava(a)
 
-                # naive dedupe: same date + duration + distance rounded
+                # activity id first; runs from before external ids on date + duration + distance
                 date_only = start_dt.date() if start_dt else None
                 existing = (
+                    db.query(Run)
+                    .filter(Run.external_source == EXTERNAL_SOURCE, Run.external_id == str(act_id))
+                    .first()
+                ) or (
                     db.query(Run)
                     .filter(Run.date == date_only)
                     .filter(Run.duration_seconds == dur_s)
                     .filter(Run.distance_mi == round(miles, 2))
+                    .filter(Run.external_id.is_(None))
                     .first()
                 )
                 if existing:
@@ -243,154 +273,150 @@ def sync_recent_runs(
                     run_type=inferred_type or "easy",
                     start_time=hhmm_to_time(start_dt.strftime("%H:%M")) if start_dt else None,
                     source="strava",
+                    external_source=EXTERNAL_SOURCE,
+                    external_id=str(act_id),
                 )
                 db.add(run)
                 db.commit(); db.refresh(run)
 
                 # Streams for track + metrics
-                keys = ["time","latlng","altitude","heartrate","velocity_smooth"]
-                sr = client.get(f"https://www.strava.com/api/v3/activities/{act_id}/streams", params={"keys": ",".join(keys), "key_by_type": True})
+                sr = client.get(f"{settings.strava_base_url}/api/v3/activities/{act_id}/streams", params={"keys": ",".join(STREAM_KEYS), "key_by_type": True})
                 if sr.status_code != 200:
                     continue
-                streams = sr.json()
                 # Rate limited? Bail gracefully; user can call sync again.
-                mlim2, mused2, _, _ = _check_limits(sr)
+                mlim2, mused2, _, _ = observe_rate_limits(sr.headers)
                 if mused2 >= max(1, mlim2 - 5):
                     db.commit()
                     return {"imported": imported, "note": "rate limit reached; run sync again to continue"}
-                time_s = streams.get("time", {}).get("data") or []
-                latlng = streams.get("latlng", {}).get("data") or []
-                altitude = streams.get("altitude", {}).get("data") or []
-                heartrate = streams.get("heartrate", {}).get("data") or []
-                vel = streams.get("velocity_smooth", {}).get("data") or []
-
-                # Build points and geojson
-                points = []
-                total_m = 0.0
-                elev_gain = 0.0
-                elev_loss = 0.0
-                prev = None
-                for i, ll in enumerate(latlng):
-                    lat, lon = ll
-                    ele = float(altitude[i]) if i < len(altitude) else None
-                    t = int(time_s[i]) if i < len(time_s) else None
-                    points.append({"lat": lat, "lon": lon, "ele": ele, "t": t, "time": None})
-                    if prev is not None:
-                        total_m += _haversine(prev[0], prev[1], lat, lon)
-                        if ele is not None and prev[2] is not None:
-                            de = ele - prev[2]
-                            if de > 0: elev_gain += de
-                            else: elev_loss += -de
-                    prev = (lat, lon, ele)
-
-                if points:
-                    lats = [p["lat"] for p in points]
-                    lons = [p["lon"] for p in points]
-                    bounds = {"minLat": min(lats), "minLon": min(lons), "maxLat": max(lats), "maxLon": max(lons)}
-                    coords = [[p["lon"], p["lat"]] for p in points]
-                    geojson = {"type": "LineString", "coordinates": coords}
-                else:
-                    bounds = None; geojson = None
-
-                track = db.query(RunTrack).filter(RunTrack.run_id == run.id).first() or RunTrack(run_id=run.id)
-                track.geojson = geojson; track.bounds = bounds; track.points_count = len(points)
-                db.add(track)
-
-                # Splits by distance using moving time
-                target_m = MILE_M
-                acc_m = 0.0
-                seg_elapsed = 0.0
-                splits = []
-                sample_step_m = SAMPLE_STEP_M
-                next_sample_m = sample_step_m
-
-                hr_dist_series = []
-                pace_dist_series = []
-                elev_dist_series = []
-                cumulative_m = 0.0
-
-                for i in range(1, len(points)):
-                    a, b = points[i-1], points[i]
-                    d = _haversine(a["lat"], a["lon"], b["lat"], b["lon"]) if a and b else 0.0
-                    dt = 0.0
-                    if a.get("t") is not None and b.get("t") is not None:
-                        dt = float(b["t"] - a["t"]) if b["t"] >= a["t"] else 0.0
-                    moving_dt = dt
-                    if vel and i < len(vel) and vel[i] is not None and vel[i] < MOVING_SPEED_MPS:
-                        moving_dt = 0.0
-
-                    acc_before = acc_m
-                    acc_m += d
-                    cumulative_m += d
-                    while cumulative_m >= next_sample_m:
-                        d_mi = next_sample_m / 1609.34
-                        if dt > 0 and d > 0:
-                            pace = int(1609.34 * (dt / d))
-                            pace_dist_series.append({"d": round(d_mi,3), "pace_s_per_mi": pace})
-                        if b.get("ele") is not None:
-                            elev_dist_series.append({"d": round(d_mi,3), "elev_ft": int(float(b["ele"]) * 3.28084)})
-                        if heartrate and i < len(heartrate) and heartrate[i] is not None:
-                            hr_dist_series.append({"d": round(d_mi,3), "hr": int(heartrate[i])})
-                        next_sample_m += sample_step_m
-
-                    rem_d = d
-                    rem_moving_dt = moving_dt
-                    while acc_before + rem_d >= target_m:
-                        needed = target_m - acc_before
-                        frac = (needed / rem_d) if rem_d > 0 else 0.0
-                        seg_elapsed += rem_moving_dt * frac
-                        splits.append({"idx": len(splits)+1, "distance_mi": 1.0, "duration_sec": int(seg_elapsed) if seg_elapsed>0 else 0})
-                        rem_d -= needed
-                        rem_moving_dt = rem_moving_dt * (1 - frac)
-                        acc_before = 0.0
-                        acc_m -= target_m
-                        seg_elapsed = 0.0
-                    seg_elapsed += rem_moving_dt
-
-                db.query(RunSplit).filter(RunSplit.run_id == run.id).delete()
-                for s in splits:
-                    db.add(RunSplit(run_id=run.id, idx=s["idx"], distance_mi=s["distance_mi"], duration_sec=s["duration_sec"]))
-
-                m = db.query(RunMetrics).filter(RunMetrics.run_id == run.id).first() or RunMetrics(run_id=run.id)
-                m.elev_gain_ft = float(elev_gain) * 3.28084 if elev_gain else None
-                m.elev_loss_ft = float(elev_loss) * 3.28084 if elev_loss else None
-                m.moving_time_sec = int(sum(s["duration_sec"] for s in splits)) if splits else None
-                m.hr_dist_series = hr_dist_series
-                m.pace_dist_series = pace_dist_series
-                m.elev_dist_series = elev_dist_series
-
-                # HR zones from streams when available
-                if heartrate and time_s and len(heartrate) == len(time_s):
-                    hr_max = settings.hr_max or (220 - settings.age)
-                    zone_bounds = HR_ZONE_BOUNDS
-                    zones = [0, 0, 0, 0, 0]
-                    max_hr = 0
-                    sum_hr = 0
-                    count_hr = 0
-                    for i in range(1, len(time_s)):
-                        dt = max(1, int(time_s[i]) - int(time_s[i-1]))
-                        hr_val = int(heartrate[i-1]) if heartrate[i-1] is not None else None
-                        if hr_val is not None:
-                            sum_hr += hr_val
-                            count_hr += 1
-                            if hr_val > max_hr:
-                                max_hr = hr_val
-                            frac = (hr_val / hr_max) if hr_max else 0
-                            for z in range(5):
-                                if zone_bounds[z] <= frac < zone_bounds[z+1]:
-                                    zones[z] += dt
-                                    break
-                    if count_hr > 0:
-                        m.avg_hr = int(sum_hr / count_hr)
-                        m.max_hr = int(max_hr)
-                        m.hr_zones = {"z1": zones[0], "z2": zones[1], "z3": zones[2], "z4": zones[3], "z5": zones[4], "hr_max": hr_max}
-                db.add(m)
 
+                outputs, blob = process_streams(sr.content)
+                with import_stage("persist", "strava"):
+                    store_stream_outputs(db, run.id, outputs)
+                    link_raw_streams(db, run.id, act_id, blob)
+                    db.commit()
                 imported += 1
-                db.commit()
                 if max_activities and imported >= max_activities:
                     return {"imported": imported}
 
             pages += 1
 
     return {"imported": imported}
+
+
+# --- Webhook push ingestion -------------------------------------------------
+# Strava calls POST /strava/webhook once per activity change, so new runs
+# arrive without polling; the CronJob sync stays useful as a backstop.
+
+WEBHOOK_ACTIVITY_TYPES = {"Run"}
+
+
+@router.post("/webhook/subscribe")
+def create_webhook_subscription(
+    callback_url: str | None = Query(None, description="Public URL of POST /strava/webhook; defaults to STRAVA_WEBHOOK_CALLBACK_URL"),
+):
+    """Register this backend's webhook with Strava (one per application).
+
+    Strava immediately calls GET /strava/webhook to validate the callback,
+    so the backend must be reachable at `callback_url` when this runs.
+    """
+    callback_url = callback_url or settings.strava_webhook_callback_url
+    if not (settings.strava_client_id and settings.strava_client_secret):
+        raise HTTPException(status_code=400, detail="Missing STRAVA_CLIENT_ID/SECRET")
+    if not (callback_url and settings.strava_webhook_verify_token):
+        raise HTTPException(
+            status_code=400,
+            detail="Set STRAVA_WEBHOOK_VERIFY_TOKEN and a callback_url (or STRAVA_WEBHOOK_CALLBACK_URL)",
+        )
+    data = {
+        "client_id": settings.strava_client_id,
+        "client_secret": settings.strava_client_secret,
+        "callback_url": callback_url,
+        "verify_token": settings.strava_webhook_verify_token,
+    }
+    with httpx.Client(timeout=30) as client:
+        r = client.post(f"{settings.strava_base_url}/api/v3/push_subscriptions", data=data)
+    if r.status_code not in (200, 201):
+        raise HTTPException(status_code=400, detail=f"Strava subscription failed: {r.text}")
+    return r.json()
+
+
+@router.get("/webhook")
+def validate_webhook(
+    mode: str = Query(..., alias="hub.mode"),
+    verify_token: str = Query(..., alias="hub.verify_token"),
+    challenge: str = Query(..., alias="hub.challenge"),
+):
+    """Subscription handshake: echo the challenge if the token is ours."""
+    expected = settings.strava_webhook_verify_token
+    if mode != "subscribe" or not expected or verify_token != expected:
+        raise HTTPException(status_code=403, detail="Invalid verify token")
+    return {"hub.challenge": challenge}
+
+
+def _drain_webhook_events() -> dict:
+    """Apply queued events. A plain function, so Starlette runs it in the
+    threadpool: the blocking Session stays off the server's event loop,
+    and the async Strava client gets a loop of its own in this thread."""
+    tokens = get_token_manager()
+    if not tokens.get():
+        return {}
+    tok = tokens.fresh()
+    return asyncio.run(_process_webhook_events(tok["access_token"]))
+
+
+async def _process_webhook_events(access_token: str) -> dict:
+    with SessionLocal() as db:
+        async with strava_client(access_token) as client:
+            return await process_events(
+                db,
+                client,
+                allowed_types=WEBHOOK_ACTIVITY_TYPES,
+                infer_run_type=_infer_run_type_from_strava,
+            )
+
+
+@router.post("/webhook")
+def receive_webhook_event(
+    background: BackgroundTasks,
+    payload: dict = Body(...),
+    db: Session = Depends(get_db),
+):
+    """Queue one Strava event and answer at once; it is applied afterwards.
+
+    Events for another athlete, or arriving while Strava is not linked, are
+    acknowledged and dropped (a non-200 only makes Strava retry).
+    Deauthorization is applied right away by forgetting the stored tokens.
+    """
+    try:
+        event = event_from_payload(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    tokens = get_token_manager()
+    tok = tokens.get()
+    athlete_id = ((tok or {}).get("athlete") or {}).get("id")
+    if not tok or (athlete_id and event.owner_id and int(event.owner_id) != int(athlete_id)):
+        return {"queued": False}
+
+    if event.object_type == "athlete":
+        if (event.updates or {}).get("authorized") == "false":
+            tokens.clear()
+            event.outcome = "deauthorized"
+        else:
+            event.outcome = "ignored"
+        event.processed_at = datetime.now(timezone.utc)
+        db.add(event)
+        db.commit()
+        return {"queued": False}
+
+    db.add(event)
+    db.commit()
+    background.add_task(track_job("strava_webhook", _drain_webhook_events))
+    return {"queued": True}
+
+
+@router.post("/webhook/process")
+def process_webhook_events():
+    """Apply queued webhook events now (normally done after each event)."""
+    if not get_token_manager().get():
+        raise HTTPException(status_code=400, detail="Strava not linked. Hit /strava/auth_url first.")
+    return _drain_webhook_events()
@@ -0,0 +1,55 @@
+"""Content-addressed, gzip-compressed JSON files under uploads/blobs/.
+
+A payload is stored once under the SHA-256 of its canonical JSON
+(sorted keys), as blobs/<2 hex>/<hash>.json.gz, so fetching the same
+data again costs no extra disk and callers can tell whether it changed.
+Writes go to a temp file and are renamed into place, so a reader never
+sees a partial blob. Blobs are shared and never deleted per run; purge
+wipes the directory.
+"""
+import gzip
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+
+import orjson
+
+from app.core.config import settings
+
+BLOB_DIR = "blobs"
+COMPRESS_LEVEL = 6
+
+
+@dataclass(frozen=True)
+class BlobRef:
+    sha256: str
+    path: str
+    size_bytes: int  # compressed, on disk
+
+
+def blob_path(sha256: str) -> str:
+    return os.path.join(settings.uploads_dir, BLOB_DIR, sha256[:2], f"{sha256}.json.gz")
+
+
+def put_json(payload) -> BlobRef:
+    """Store `payload` (if not already stored) and return its reference."""
+    raw = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+    sha256 = hashlib.sha256(raw).hexdigest()
+    path = blob_path(sha256)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(gzip.compress(raw, compresslevel=COMPRESS_LEVEL, mtime=0))
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    return BlobRef(sha256=sha256, path=path, size_bytes=os.path.getsize(path))
+
+
+def get_json(path: str):
+    with open(path, "rb") as f:
+        return orjson.loads(gzip.decompress(f.read()))
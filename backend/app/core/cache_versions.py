@@ -0,0 +1,57 @@
+"""Version counters that let a cache fill notice a concurrent invalidation.
+
+Derived-data caches (training load, year stats) are filled by reads from
+runs read a moment earlier. A write that invalidates the cache in between
+would be undone by the fill inserting its stale rows afterwards, and they
+would stay until the next write. So every cache has a version row:
+
+- invalidation bumps it, before deleting, in the writer's transaction
+  (bump_version, from the run_changes callbacks);
+- a fill notes the version before reading anything (current_version) and
+  right before inserting locks the row and checks it is unchanged
+  (unchanged_since); if not, it skips the insert and a later read
+  recomputes.
+
+The row lock orders the two on Postgres: a fill that meets an uncommitted
+bump waits and then sees the new version, and a writer that meets a
+fill's lock bumps, and deletes the filled rows, once the fill committed.
+SQLite runs one write transaction at a time anyway.
+"""
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.cache_version import CacheVersion
+
+
+def current_version(db: Session, name: str) -> int:
+    return db.query(CacheVersion.version).filter(CacheVersion.name == name).scalar() or 0
+
+
+def unchanged_since(db: Session, name: str, version: int) -> bool:
+    """Lock the cache's version row and check nobody invalidated since `version`."""
+    locked = (
+        db.query(CacheVersion.version)
+        .filter(CacheVersion.name == name)
+        .with_for_update()
+        .scalar()
+    )
+    return (locked or 0) == version
+
+
+def bump_version(db: Session, name: str) -> None:
+    """Mark the cache invalidated; safe from inside a flush event."""
+    conn = db.connection()
+    if conn.execute(
+        update(CacheVersion.__table__)
+        .where(CacheVersion.name == name)
+        .values(version=CacheVersion.version + 1)
+    ).rowcount:
+        return
+    # Databases made by create_tables() start without the seeded rows
+    insert = postgresql.insert if conn.dialect.name == "postgresql" else sqlite.insert
+    conn.execute(
+        insert(CacheVersion.__table__)
+        .values(name=name, version=1)
+        .on_conflict_do_update(index_elements=["name"], set_={"version": CacheVersion.version + 1})
+    )
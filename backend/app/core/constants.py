@@ -17,3 +17,16 @@ MOVING_SPEED_MPS = 0.5
 # Z1: [0.50, 0.60), Z2: [0.60, 0.70), ..., Z5: [0.90, 1.01)
 HR_ZONE_BOUNDS = [0.5, 0.6, 0.7, 0.8, 0.9, 1.01]
 
+
+# Training load (ATL/CTL/TSB): time constants in days for the exponentially
+# weighted acute (fatigue) and chronic (fitness) loads.
+ATL_DAYS = 7
+CTL_DAYS = 42
+
+# How far past today (or the last run, if later) /stats/training_load goes;
+# those days carry no load, only the decay, so they are never stored.
+TRAINING_LOAD_FUTURE_DAYS = 31
+
+# Zone weight used for Edwards TRIMP when a run has no heart rate data,
+# i.e. "as if the whole run was spent in this zone".
+RUN_TYPE_TRIMP_ZONE = {"easy": 2, "long": 2, "workout": 3, "race": 4, "other": 2}
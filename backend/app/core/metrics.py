@@ -0,0 +1,262 @@
+"""Prometheus metrics, served as text by GET /metrics.
+
+A small in-process registry (counters, gauges, histograms with labels)
+rendered in the Prometheus text exposition format, so scraping needs no
+client library. Values are per process, like the pool stats; the backend
+runs one uvicorn worker per pod, so scrape every pod.
+
+What is recorded where:
+
+- runner_http_request_duration_seconds / runner_http_requests_in_flight:
+  request_timing_middleware, labelled by route template (not raw path)
+- runner_import_stage_duration_seconds{stage,format}: the file importers
+  and the Strava stream processing (import_stage(), ImportStages). parse
+  is file/JSON to memory, analyze the track/split/series loops (and the
+  few lookups among them), persist the flush + commit of derived rows
+- runner_import_points_total / runner_import_points_per_second:
+  record_import_points() at the end of each import
+- runner_background_jobs{kind}: file processing and webhook drains
+  queued as background tasks and not finished yet (track_job())
+- runner_strava_ratelimit_*: the last X-RateLimit headers Strava sent
+- runner_strava_webhook_queue_depth / runner_strava_pending_streams:
+  read from the database at scrape time (scrape_collectors)
+"""
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Iterable
+
+# Seconds; requests and import stages both span ms to tens of seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+IMPORT_STAGES = ("upload_write", "parse", "analyze", "persist")
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._values: dict[tuple, object] = {}
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(n, "")) for n in self.label_names)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_one(key, value))
+        return lines
+
+    def _render_one(self, key, value) -> list[str]:
+        return [f"{self.name}{_labels(self.label_names, key)} {_num(value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # per-bucket counts (not cumulative), sum, count
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, upper in enumerate(self.buckets):
+                if value <= upper:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def _render_one(self, key, state) -> list[str]:
+        counts, total, count = state
+        lines = []
+        cumulative = 0
+        for upper, n in zip(self.buckets, counts):
+            cumulative += n
+            le = 'le="%s"' % _num(upper)
+            lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+        inf = 'le="+Inf"'
+        lines.append(f"{self.name}_bucket{_labels(self.label_names, key, inf)} {count}")
+        lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_num(total)}")
+        lines.append(f"{self.name}_count{_labels(self.label_names, key)} {count}")
+        return lines
+
+
+_registry: list[_Metric] = []
+# Callables run at scrape time to refresh gauges from elsewhere (e.g. the DB)
+_collectors: list[Callable[[], None]] = []
+
+
+def _register(metric):
+    _registry.append(metric)
+    return metric
+
+
+def scrape_collector(fn: Callable[[], None]) -> Callable[[], None]:
+    """Decorator: run `fn` before every scrape (it should set gauges)."""
+    _collectors.append(fn)
+    return fn
+
+
+def render() -> str:
+    for collect in _collectors:
+        collect()
+    lines: list[str] = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+http_request_duration = _register(Histogram(
+    "runner_http_request_duration_seconds", "HTTP request latency by route template",
+    ("method", "route", "status"),
+))
+http_requests_in_flight = _register(Gauge(
+    "runner_http_requests_in_flight", "HTTP requests being handled right now",
+))
+import_stage_duration = _register(Histogram(
+    "runner_import_stage_duration_seconds",
+    "Activity import time per stage (upload_write, parse, analyze, persist)",
+    ("stage", "format"),
+))
+import_points = _register(Counter(
+    "runner_import_points_total", "Track points processed by imports", ("format",),
+))
+import_points_per_second = _register(Gauge(
+    "runner_import_points_per_second", "Points per second of the last import (parse to persist)", ("format",),
+))
+background_jobs = _register(Gauge(
+    "runner_background_jobs", "Background tasks queued or running in this process", ("kind",),
+))
+strava_ratelimit_usage = _register(Gauge(
+    "runner_strava_ratelimit_usage", "Strava requests used in the window (last response seen)", ("window",),
+))
+strava_ratelimit_limit = _register(Gauge(
+    "runner_strava_ratelimit_limit", "Strava request limit for the window", ("window",),
+))
+strava_webhook_queue_depth = _register(Gauge(
+    "runner_strava_webhook_queue_depth", "Strava webhook events received but not applied yet",
+))
+strava_pending_streams = _register(Gauge(
+    "runner_strava_pending_streams", "Imported Strava runs still waiting for their streams",
+))
+
+
+def observe_request(method: str, route: str | None, status: int, seconds: float) -> None:
+    http_request_duration.observe(seconds, method=method, route=route or "unmatched", status=status)
+
+
+@contextmanager
+def import_stage(stage: str, fmt: str):
+    """Time a block as one stage of an import."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        import_stage_duration.observe(time.perf_counter() - start, stage=stage, format=fmt)
+
+
+def record_import_points(fmt: str, points: int, seconds: float) -> None:
+    import_points.inc(points, format=fmt)
+    if seconds > 0:
+        import_points_per_second.set(round(points / seconds, 1), format=fmt)
+
+
+class ImportStages:
+    """Consecutive stages of one import, for code that is one long
+    function: done("parse") records the time since the previous mark."""
+
+    def __init__(self, fmt: str):
+        self.fmt = fmt
+        self.started = self._last = time.perf_counter()
+
+    def done(self, stage: str) -> None:
+        now = time.perf_counter()
+        import_stage_duration.observe(now - self._last, stage=stage, format=self.fmt)
+        self._last = now
+
+    def finish(self, points: int) -> None:
+        record_import_points(self.fmt, points, time.perf_counter() - self.started)
+
+
+def track_job(kind: str, fn: Callable) -> Callable:
+    """Count `fn` as a queued background job until it finishes; call at
+    queueing time (background.add_task(track_job("file_processing", fn), ...))."""
+    background_jobs.inc(kind=kind)
+
+    if inspect.iscoroutinefunction(fn):
+        @wraps(fn)
+        async def job(*args, **kwargs):
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                background_jobs.dec(kind=kind)
+    else:
+        @wraps(fn)
+        def job(*args, **kwargs):
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                background_jobs.dec(kind=kind)
+    return job
+
+
+def record_rate_limits(short_limit: int, short_used: int, day_limit: int, day_used: int) -> None:
+    strava_ratelimit_usage.set(short_used, window="15m")
+    strava_ratelimit_usage.set(day_used, window="day")
+    strava_ratelimit_limit.set(short_limit, window="15m")
+    strava_ratelimit_limit.set(day_limit, window="day")
@@ -0,0 +1,138 @@
+"""Connection pool instrumentation.
+
+`InstrumentedQueuePool` (and its asyncio twin) is a drop-in QueuePool that
+records how long each checkout spent getting a connection out of the pool
+(queue wait, or opening a new one while the pool grows) and how long the
+whole checkout took including pre-ping. `PoolStats.snapshot()` is what
+GET /diagnostics/pool reports, next to the pool's own counters.
+"""
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Recent samples kept for percentiles
+_WINDOW = 1000
+
+
+def _percentile(sorted_vals: list[float], pct: float) -> float | None:
+    if not sorted_vals:
+        return None
+    k = min(len(sorted_vals) - 1, int(round(pct / 100.0 * (len(sorted_vals) - 1))))
+    return sorted_vals[k]
+
+
+class PoolStats:
+    """Thread-safe counters for one pool (times in milliseconds)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self.checkout_ms_total = 0.0
+        self.checkout_ms_max = 0.0
+        self._wait_recent: deque[float] = deque(maxlen=_WINDOW)
+        self._checkout_recent: deque[float] = deque(maxlen=_WINDOW)
+
+    def record_wait(self, ms: float) -> None:
+        with self._lock:
+            self.wait_ms_total += ms
+            self.wait_ms_max = max(self.wait_ms_max, ms)
+            self._wait_recent.append(ms)
+
+    def record_checkout(self, ms: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_ms_total += ms
+            self.checkout_ms_max = max(self.checkout_ms_max, ms)
+            self._checkout_recent.append(ms)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            waits = sorted(self._wait_recent)
+            checkouts = sorted(self._checkout_recent)
+            n = self.checkouts
+            return {
+                "checkouts": n,
+                "timeouts": self.timeouts,
+                "wait_ms": {
+                    "avg": self.wait_ms_total / n if n else None,
+                    "max": self.wait_ms_max,
+                    "p50": _percentile(waits, 50),
+                    "p99": _percentile(waits, 99),
+                },
+                "checkout_ms": {
+                    "avg": self.checkout_ms_total / n if n else None,
+                    "max": self.checkout_ms_max,
+                    "p50": _percentile(checkouts, 50),
+                    "p99": _percentile(checkouts, 99),
+                },
+            }
+
+
+class _InstrumentedPoolMixin:
+    """Times waits and checkouts into `self.stats`."""
+
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        self.stats = PoolStats()
+
+    def recreate(self):
+        # Pool.recreate() (engine.dispose, fork handling) builds a fresh pool;
+        # keep accumulating into the same stats object.
+        new = super().recreate()
+        new.stats = self.stats
+        return new
+
+    def connect(self):
+        t0 = time.perf_counter()
+        conn = super().connect()
+        self.stats.record_checkout((time.perf_counter() - t0) * 1000.0)
+        return conn
+
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            # pool_timeout elapsed; connect errors etc. are not timeouts
+            self.stats.record_timeout()
+            raise
+        finally:
+            self.stats.record_wait((time.perf_counter() - t0) * 1000.0)
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_status(pool) -> dict:
+    """Current occupancy plus recorded timings for an engine's pool."""
+    out: dict = {"class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        out.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(0, pool.overflow()),
+            "max_overflow": pool._max_overflow,
+            "timeout_s": pool.timeout(),
+            "recycle_s": pool._recycle,
+            "pre_ping": pool._pre_ping,
+        })
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        out.update(stats.snapshot())
+    return out
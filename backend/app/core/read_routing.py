@@ -0,0 +1,54 @@
+"""Read-your-writes routing between the primary and a read replica.
+
+Read-only routes take their session from `get_read_db`, which picks the
+replica unless the caller needs to see its own recent writes:
+
+- the request carries `X-Read-Primary: 1`, or
+- the client made a write within `read_your_writes_s` (a short-lived
+  cookie set on successful mutations).
+
+Only the client that wrote is pinned; everyone else keeps reading the
+replica however much is being written (imports, Strava syncs, webhooks).
+Clients that don't send cookies, e.g. the frontend's cross-origin fetches,
+get the same deadline in the `X-Read-Primary-Until` response header and
+send `X-Read-Primary: 1` until it passes.
+"""
+import time
+
+from app.core.config import settings
+
+PRIMARY_HEADER = "X-Read-Primary"
+PRIMARY_UNTIL_HEADER = "X-Read-Primary-Until"
+PRIMARY_COOKIE = "runner_primary_until"
+_SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def wants_primary(request) -> bool:
+    if not settings.database_read_url:
+        return True
+    if request.headers.get(PRIMARY_HEADER, "").lower() in ("1", "true", "yes"):
+        return True
+    try:
+        return float(request.cookies.get(PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def read_your_writes_middleware(request, call_next):
+    """Pin the caller's reads to the primary for a moment after a write."""
+    response = await call_next(request)
+    if (
+        settings.database_read_url
+        and request.method not in _SAFE_METHODS
+        and response.status_code < 400
+    ):
+        until = str(int(time.time() + settings.read_your_writes_s))
+        response.headers[PRIMARY_UNTIL_HEADER] = until
+        response.set_cookie(
+            PRIMARY_COOKIE,
+            until,
+            max_age=settings.read_your_writes_s,
+            httponly=True,
+            samesite="lax",
+        )
+    return response
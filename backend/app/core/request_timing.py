@@ -0,0 +1,266 @@
+"""Per-request timing: where did a slow request spend its time?
+
+Every request gets a RequestTimings (held in a ContextVar, so it follows
+the request into the threadpool) that collects:
+
+- db: number of SQL statements and time inside cursor.execute, from
+  before/after_cursor_execute events on every engine (instrument_engine)
+- handler: the endpoint function itself (DB work it does included)
+- serialize: the rest of the route: response-model validation, JSON
+  encoding and rendering (plus request parsing and dependency setup).
+  Routes that build an ORJSONResponse themselves encode inside the handler.
+
+The middleware adds them as a Server-Timing header (visible in the
+browser's network panel), logs one JSON line per request on the
+"runner.requests" logger and feeds the request latency histogram and
+in-flight gauge of GET /metrics. handler/serialize need the route to be a
+TimedRoute (APIRouter(route_class=TimedRoute)).
+
+With `?profile=1` and an X-Profile-Token header matching
+settings.profile_token, the request also runs under cProfile and the
+response is replaced by the timings and the top functions by cumulative
+time. Unset profile_token (the default) turns this off.
+"""
+import cProfile
+import io
+import logging
+import pstats
+import secrets
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Optional
+
+import orjson
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from starlette.responses import PlainTextResponse
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger("runner.requests")
+
+PROFILE_HEADER = "X-Profile-Token"
+# Functions listed in a ?profile=1 report
+PROFILE_LIMIT = 40
+# Probes and scrapes would drown everything else in the log
+_QUIET_PATHS = {"/health", "/health/ready", "/metrics"}
+
+
+@dataclass
+class RequestTimings:
+    db_queries: int = 0
+    db_ms: float = 0.0
+    handler_ms: Optional[float] = None
+    route_ms: Optional[float] = None
+    profiler: Optional[cProfile.Profile] = None
+    profiler_thread: Optional[int] = None
+    thread_profiles: list = field(default_factory=list)
+
+    @property
+    def serialize_ms(self) -> Optional[float]:
+        if self.route_ms is None or self.handler_ms is None:
+            return None
+        return max(0.0, self.route_ms - self.handler_ms)
+
+    def as_dict(self, total_ms: float) -> dict:
+        out = {"total_ms": round(total_ms, 2), "db_ms": round(self.db_ms, 2), "db_queries": self.db_queries}
+        if self.handler_ms is not None:
+            out["handler_ms"] = round(self.handler_ms, 2)
+            out["serialize_ms"] = round(self.serialize_ms, 2)
+        return out
+
+    def server_timing(self, total_ms: float) -> str:
+        parts = [f"total;dur={total_ms:.1f}", f'db;dur={self.db_ms:.1f};desc="{self.db_queries} queries"']
+        if self.handler_ms is not None:
+            parts.append(f"handler;dur={self.handler_ms:.1f}")
+            parts.append(f"serialize;dur={self.serialize_ms:.1f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+# --- DB ---------------------------------------------------------------------
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._timing_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timings = _current.get()
+    start = getattr(context, "_timing_start", None)
+    if timings is None or start is None:
+        return
+    timings.db_queries += 1
+    timings.db_ms += (time.perf_counter() - start) * 1000.0
+
+
+def instrument_engine(engine) -> None:
+    """Count queries and their time for the current request (sync engine,
+    or an AsyncEngine's .sync_engine)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# --- Routes -----------------------------------------------------------------
+
+def _profiled(call, *args, **kwargs):
+    """Run `call` under a profiler of its own when it is off the request's
+    thread (sync endpoints run in the threadpool)."""
+    timings = _current.get()
+    if timings is None or timings.profiler is None or threading.get_ident() == timings.profiler_thread:
+        return call(*args, **kwargs)
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Python 3.12+: the request's profiler already sees every thread
+        return call(*args, **kwargs)
+    try:
+        return call(*args, **kwargs)
+    finally:
+        profiler.disable()
+        timings.thread_profiles.append(profiler)
+
+
+def _timed_call(call, is_coroutine: bool):
+    if is_coroutine:
+        @wraps(call)
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                _record_handler(start)
+    else:
+        @wraps(call)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return _profiled(call, *args, **kwargs)
+            finally:
+                _record_handler(start)
+    return timed
+
+
+def _record_handler(start: float) -> None:
+    timings = _current.get()
+    if timings is not None:
+        timings.handler_ms = (time.perf_counter() - start) * 1000.0
+
+
+class TimedRoute(APIRoute):
+    """APIRoute that also times the endpoint and the route as a whole, so
+    the middleware can split handler from serialization time."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Swapped after FastAPI has read the endpoint's signature; the
+        # request handler looks dependant.call up on every call
+        self.dependant.call = _timed_call(self.dependant.call, self.dependant.is_coroutine_callable)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            start = time.perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                timings = _current.get()
+                if timings is not None:
+                    timings.route_ms = (time.perf_counter() - start) * 1000.0
+
+        return timed_handler
+
+
+# --- Middleware -------------------------------------------------------------
+
+def _wants_profile(request) -> bool:
+    if not settings.profile_token or request.query_params.get("profile") not in ("1", "true"):
+        return False
+    return secrets.compare_digest(request.headers.get(PROFILE_HEADER, ""), settings.profile_token)
+
+
+def _profile_report(request, response, timings: RequestTimings, total_ms: float) -> PlainTextResponse:
+    out = io.StringIO()
+    stats = pstats.Stats(timings.profiler, stream=out)
+    for profiler in timings.thread_profiles:
+        stats.add(profiler)
+    out.write(f"{request.method} {request.url.path} -> {response.status_code}\n")
+    out.write(orjson.dumps(timings.as_dict(total_ms)).decode() + "\n\n")
+    stats.strip_dirs().sort_stats("cumulative").print_stats(PROFILE_LIMIT)
+    return PlainTextResponse(out.getvalue(), headers={"Server-Timing": timings.server_timing(total_ms)})
+
+
+_handler_checked = False
+
+
+def _ensure_handler() -> None:
+    """Print the log lines to stderr unless logging was configured (uvicorn
+    only configures its own loggers)."""
+    global _handler_checked
+    if not _handler_checked:
+        _handler_checked = True
+        if not logger.handlers and not logging.getLogger().handlers:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+
+
+def _log(request, status: int, timings: RequestTimings, total_ms: float) -> None:
+    if not settings.request_log or total_ms < settings.request_log_min_ms or request.url.path in _QUIET_PATHS:
+        return
+    _ensure_handler()
+    route = request.scope.get("route")
+    logger.info(orjson.dumps({
+        "event": "request",
+        "method": request.method,
+        "path": request.url.path,
+        "route": getattr(route, "path", None),
+        "status": status,
+        **timings.as_dict(total_ms),
+    }).decode())
+
+
+async def request_timing_middleware(request, call_next):
+    """Time the request; Server-Timing header, log line, ?profile=1 report."""
+    timings = RequestTimings()
+    token = _current.set(timings)
+    profile = _wants_profile(request)
+    metrics.http_requests_in_flight.inc()
+    start = time.perf_counter()
+    try:
+        if profile:
+            timings.profiler = cProfile.Profile()
+            timings.profiler_thread = threading.get_ident()
+            timings.profiler.enable()
+            try:
+                response = await call_next(request)
+            finally:
+                timings.profiler.disable()
+        else:
+            response = await call_next(request)
+        total_ms = (time.perf_counter() - start) * 1000.0
+    finally:
+        _current.reset(token)
+        metrics.http_requests_in_flight.dec()
+
+    route = getattr(request.scope.get("route"), "path", None)
+    metrics.observe_request(request.method, route, response.status_code, total_ms / 1000.0)
+    _log(request, response.status_code, timings, total_ms)
+    if profile:
+        return _profile_report(request, response, timings, total_ms)
+    response.headers["Server-Timing"] = timings.server_timing(total_ms)
+    response.headers["Timing-Allow-Origin"] = "*"
+    return response
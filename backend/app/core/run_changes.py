@@ -0,0 +1,77 @@
+"""Notify derived-data stores when runs change.
+
+Derived tables (training load, per-year stats cache) register a callback
+with on_runs_changed(). Any ORM flush that adds or deletes a run, or edits
+a field those stores depend on (date, distance, duration, type, or the
+run's HR/elevation metrics), calls every callback with the affected dates,
+inside the same transaction, so a derived row can never outlive the data
+it was computed from.
+
+Core INSERT/DELETE statements bypass the flush; callers using them (bulk
+create, purge) call notify_runs_changed() themselves.
+"""
+from datetime import date
+from typing import Callable, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.models.run import Run
+from app.models.run_metrics import RunMetrics
+
+# callback(db, days): days are the affected dates, or None for "everything"
+RunsChangedCallback = Callable[[Session, Optional[list[date]]], None]
+
+_callbacks: list[RunsChangedCallback] = []
+
+_RUN_ATTRS = ("date", "distance_mi", "duration_seconds", "run_type")
+_METRICS_ATTRS = ("avg_hr", "hr_zones", "elev_gain_ft")
+
+
+def on_runs_changed(callback: RunsChangedCallback) -> RunsChangedCallback:
+    """Register a callback (usable as a decorator)."""
+    _callbacks.append(callback)
+    return callback
+
+
+def notify_runs_changed(db: Session, days: Optional[list[date]] = None) -> None:
+    for callback in _callbacks:
+        callback(db, days)
+
+
+def _as_date(value):
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _attrs_changed(obj, attrs) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[attr].history.has_changes() for attr in attrs)
+
+
+@event.listens_for(Session, "before_flush")
+def _notify_on_flush(session: Session, flush_context, instances) -> None:
+    days: list = []
+    metrics: list[RunMetrics] = []
+
+    with session.no_autoflush:
+        for obj in list(session.new) + list(session.deleted):
+            if isinstance(obj, Run):
+                days.append(obj.date)
+            elif isinstance(obj, RunMetrics):
+                metrics.append(obj)
+        for obj in session.dirty:
+            if isinstance(obj, Run):
+                if _attrs_changed(obj, _RUN_ATTRS):
+                    # A moved run affects both its old and its new date
+                    days += [obj.date] + list(inspect(obj).attrs.date.history.deleted)
+            elif isinstance(obj, RunMetrics) and _attrs_changed(obj, _METRICS_ATTRS):
+                metrics.append(obj)
+
+        for m in metrics:
+            run = session.get(Run, m.run_id) if m.run_id is not None else None
+            if run is not None:
+                days.append(run.date)
+
+    days = [_as_date(d) for d in days if d is not None]
+    if days:
+        notify_runs_changed(session, days)
@@ -0,0 +1,214 @@
+"""Turn a Strava activity's streams into track, splits and metrics rows.
+
+build_stream_outputs() is pure CPU work on the streams JSON (safe to run
+in a worker thread); store_stream_outputs() writes the result for a run.
+Shared by every Strava sync path.
+
+The raw streams are also kept (compressed, content-addressed, see
+app/core/blob_store.py) and linked from a RunFile with source
+"strava_streams", so POST /runs/{id}/reprocess can rebuild a Strava run
+after a processing change without calling Strava again.
+"""
+import time
+
+import orjson
+from sqlalchemy.orm import Session
+
+from app.core.blob_store import BlobRef, get_json, put_json
+from app.core.config import settings
+from app.core.constants import HR_ZONE_BOUNDS, MILE_M, SAMPLE_STEP_M, MOVING_SPEED_MPS
+from app.core.geo import haversine as _haversine
+from app.core.metrics import import_stage, record_import_points
+from app.models.run_file import RunFile
+from app.models.run_metrics import RunMetrics
+from app.models.run_split import RunSplit
+from app.models.run_track import RunTrack
+
+# Streams requested per activity
+STREAM_KEYS = ["time", "latlng", "altitude", "heartrate", "velocity_smooth"]
+# RunFile.source of a cached raw streams payload
+STREAMS_FILE_SOURCE = "strava_streams"
+
+
+def build_stream_outputs(streams: dict) -> dict:
+    """Compute track, mile splits and metrics from `key_by_type` streams."""
+    time_s = streams.get("time", {}).get("data") or []
+    latlng = streams.get("latlng", {}).get("data") or []
+    altitude = streams.get("altitude", {}).get("data") or []
+    heartrate = streams.get("heartrate", {}).get("data") or []
+    vel = streams.get("velocity_smooth", {}).get("data") or []
+
+    # Build points and geojson
+    points = []
+    total_m = 0.0
+    elev_gain = 0.0
+    elev_loss = 0.0
+    prev = None
+    for i, ll in enumerate(latlng):
+        lat, lon = ll
+        ele = float(altitude[i]) if i < len(altitude) else None
+        t = int(time_s[i]) if i < len(time_s) else None
+        points.append({"lat": lat, "lon": lon, "ele": ele, "t": t, "time": None})
+        if prev is not None:
+            total_m += _haversine(prev[0], prev[1], lat, lon)
+            if ele is not None and prev[2] is not None:
+                de = ele - prev[2]
+                if de > 0: elev_gain += de
+                else: elev_loss += -de
+        prev = (lat, lon, ele)
+
+    if points:
+        lats = [p["lat"] for p in points]
+        lons = [p["lon"] for p in points]
+        bounds = {"minLat": min(lats), "minLon": min(lons), "maxLat": max(lats), "maxLon": max(lons)}
+        coords = [[p["lon"], p["lat"]] for p in points]
+        geojson = {"type": "LineString", "coordinates": coords}
+    else:
+        bounds = None; geojson = None
+
+    # Splits by distance using moving time
+    target_m = MILE_M
+    acc_m = 0.0
+    seg_elapsed = 0.0
+    splits = []
+    sample_step_m = SAMPLE_STEP_M
+    next_sample_m = sample_step_m
+
+    hr_dist_series = []
+    pace_dist_series = []
+    elev_dist_series = []
+    cumulative_m = 0.0
+
+    for i in range(1, len(points)):
+        a, b = points[i-1], points[i]
+        d = _haversine(a["lat"], a["lon"], b["lat"], b["lon"]) if a and b else 0.0
+        dt = 0.0
+        if a.get("t") is not None and b.get("t") is not None:
+            dt = float(b["t"] - a["t"]) if b["t"] >= a["t"] else 0.0
+        moving_dt = dt
+        if vel and i < len(vel) and vel[i] is not None and vel[i] < MOVING_SPEED_MPS:
+            moving_dt = 0.0
+
+        acc_before = acc_m
+        acc_m += d
+        cumulative_m += d
+        while cumulative_m >= next_sample_m:
+            d_mi = next_sample_m / 1609.34
+            if dt > 0 and d > 0:
+                pace = int(1609.34 * (dt / d))
+                pace_dist_series.append({"d": round(d_mi,3), "pace_s_per_mi": pace})
+            if b.get("ele") is not None:
+                elev_dist_series.append({"d": round(d_mi,3), "elev_ft": int(float(b["ele"]) * 3.28084)})
+            if heartrate and i < len(heartrate) and heartrate[i] is not None:
+                hr_dist_series.append({"d": round(d_mi,3), "hr": int(heartrate[i])})
+            next_sample_m += sample_step_m
+
+        rem_d = d
+        rem_moving_dt = moving_dt
+        while acc_before + rem_d >= target_m:
+            needed = target_m - acc_before
+            frac = (needed / rem_d) if rem_d > 0 else 0.0
+            seg_elapsed += rem_moving_dt * frac
+            splits.append({"idx": len(splits)+1, "distance_mi": 1.0, "duration_sec": int(seg_elapsed) if seg_elapsed>0 else 0})
+            rem_d -= needed
+            rem_moving_dt = rem_moving_dt * (1 - frac)
+            acc_before = 0.0
+            acc_m -= target_m
+            seg_elapsed = 0.0
+        seg_elapsed += rem_moving_dt
+
+    metrics = {
+        "elev_gain_ft": float(elev_gain) * 3.28084 if elev_gain else None,
+        "elev_loss_ft": float(elev_loss) * 3.28084 if elev_loss else None,
+        "moving_time_sec": int(sum(s["duration_sec"] for s in splits)) if splits else None,
+        "hr_dist_series": hr_dist_series,
+        "pace_dist_series": pace_dist_series,
+        "elev_dist_series": elev_dist_series,
+    }
+
+    # HR zones from streams when available
+    if heartrate and time_s and len(heartrate) == len(time_s):
+        hr_max = settings.hr_max or (220 - settings.age)
+        zone_bounds = HR_ZONE_BOUNDS
+        zones = [0, 0, 0, 0, 0]
+        max_hr = 0
+        sum_hr = 0
+        count_hr = 0
+        for i in range(1, len(time_s)):
+            dt = max(1, int(time_s[i]) - int(time_s[i-1]))
+            hr_val = int(heartrate[i-1]) if heartrate[i-1] is not None else None
+            if hr_val is not None:
+                sum_hr += hr_val
+                count_hr += 1
+                if hr_val > max_hr:
+                    max_hr = hr_val
+                frac = (hr_val / hr_max) if hr_max else 0
+                for z in range(5):
+                    if zone_bounds[z] <= frac < zone_bounds[z+1]:
+                        zones[z] += dt
+                        break
+        if count_hr > 0:
+            metrics["avg_hr"] = int(sum_hr / count_hr)
+            metrics["max_hr"] = int(max_hr)
+            metrics["hr_zones"] = {"z1": zones[0], "z2": zones[1], "z3": zones[2], "z4": zones[3], "z5": zones[4], "hr_max": hr_max}
+
+    return {
+        "track": {"geojson": geojson, "bounds": bounds, "points_count": len(points)},
+        "splits": splits,
+        "metrics": metrics,
+    }
+
+
+def store_stream_outputs(db: Session, run_id: int, outputs: dict) -> None:
+    """Upsert the run's track/metrics and replace its splits (no commit)."""
+    track = db.query(RunTrack).filter(RunTrack.run_id == run_id).first() or RunTrack(run_id=run_id)
+    for key, value in outputs["track"].items():
+        setattr(track, key, value)
+    db.add(track)
+
+    db.query(RunSplit).filter(RunSplit.run_id == run_id).delete()
+    for s in outputs["splits"]:
+        db.add(RunSplit(run_id=run_id, idx=s["idx"], distance_mi=s["distance_mi"], duration_sec=s["duration_sec"]))
+
+    m = db.query(RunMetrics).filter(RunMetrics.run_id == run_id).first() or RunMetrics(run_id=run_id)
+    for key, value in outputs["metrics"].items():
+        setattr(m, key, value)
+    db.add(m)
+
+
+def process_streams(streams: bytes | dict) -> tuple[dict, BlobRef]:
+    """Outputs plus the cached raw payload; no DB, so fine in a worker thread.
+
+    Pass the response body as bytes so decoding it counts as the "parse"
+    stage of the import metrics (and runs off the event loop)."""
+    start = time.perf_counter()
+    if isinstance(streams, (bytes, bytearray)):
+        with import_stage("parse", "strava"):
+            streams = orjson.loads(streams)
+    with import_stage("analyze", "strava"):
+        outputs = build_stream_outputs(streams)
+    with import_stage("upload_write", "strava"):
+        blob = put_json(streams)
+    record_import_points("strava", outputs["track"]["points_count"], time.perf_counter() - start)
+    return outputs, blob
+
+
+def link_raw_streams(db: Session, run_id: int, activity_id, blob: BlobRef) -> None:
+    """Point the run's strava_streams RunFile at `blob` (no commit)."""
+    rf = (
+        db.query(RunFile)
+        .filter(RunFile.run_id == run_id, RunFile.source == STREAMS_FILE_SOURCE)
+        .first()
+    ) or RunFile(run_id=run_id, source=STREAMS_FILE_SOURCE)
+    rf.filename = f"strava-{activity_id}-streams.json.gz"
+    rf.content_type = "application/gzip"
+    rf.size_bytes = blob.size_bytes
+    rf.storage_path = blob.path
+    rf.processed = True
+    db.add(rf)
+
+
+def reprocess_raw_streams(db: Session, run_id: int, path: str) -> None:
+    """Rebuild a run's track/splits/metrics from its cached streams."""
+    store_stream_outputs(db, run_id, build_stream_outputs(get_json(path)))
+    db.commit()
@@ -0,0 +1,498 @@
+"""Async Strava sync engine.
+
+Lists activities page by page and fetches their streams concurrently on
+one httpx.AsyncClient, while a single consumer turns finished streams
+into track/splits/metrics:
+
+    list pages ──> new Run rows ──> stream fetchers (N concurrent) ──> queue
+                                                                        │
+                       store_stream_outputs <── build (worker threads)
+
+The queue holds at most `concurrency` parsed payloads, so memory stays
+flat however many activities one call covers.
+
+Every request first takes a token from a RateLimitBucket, which is
+refilled from Strava's X-RateLimit-Limit / X-RateLimit-Usage headers, so
+concurrency never pushes usage past the short-term limit. When the bucket
+runs dry the sync stops early (like the sequential version) and reports
+it; calling it again continues.
+
+Progress is kept in a StravaSyncState row: the start time of the newest
+activity handled (the next listing asks only for activities after it) and
+the runs whose streams were not stored yet. Both are committed together
+with the runs they describe, so a call that stops anywhere (rate limit,
+cap, crash) is resumed exactly by the next one, which first fetches the
+pending streams and then lists only newer activities.
+
+The Session is blocking, so DB work never runs on the event loop: each
+step (loading known runs, saving a page, storing one run's streams) runs
+in a worker thread, one at a time since a Session is not thread-safe,
+and the loop keeps serving other requests meanwhile. The CPU-heavy stream
+processing (and caching the raw streams to disk) runs in a worker thread
+too. Pass any httpx.AsyncClient, e.g. one with a MockTransport or pointed
+at a local mock server, to exercise it without Strava.
+"""
+import asyncio
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import NamedTuple
+
+import httpx
+from sqlalchemy import or_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import import_stage, record_rate_limits
+from app.core.run_changes import notify_runs_changed
+from app.core.strava_streams import STREAM_KEYS, link_raw_streams, process_streams, store_stream_outputs
+from app.core.time_utils import hhmm_to_time
+from app.models.run import Run
+from app.models.strava_sync_state import StravaSyncState
+
+# Run.external_source of imported activities
+EXTERNAL_SOURCE = "strava"
+DEFAULT_CONCURRENCY = 8
+# Headroom kept below the short-term limit (the sequential sync used 5 too)
+RATE_LIMIT_RESERVE = 5
+
+
+class StravaError(Exception):
+    """Strava answered with an unexpected status."""
+
+
+class RateLimited(Exception):
+    """No request budget left in the current rate-limit window."""
+
+
+def parse_rate_limits(headers) -> tuple[int, int, int, int]:
+    """(short_limit, short_used, day_limit, day_used) from rate-limit headers.
+
+    Strava sends "X-RateLimit-Limit: 100,1000" and "X-RateLimit-Usage: 12,340"
+    (15-minute window, day). Missing or malformed headers read as an unused
+    default budget.
+    """
+    ml = headers.get("X-RateLimit-Limit")
+    mu = headers.get("X-RateLimit-Usage")
+    try:
+        minute_limit, day_limit = [int(x) for x in ml.split(",")] if ml else (100, 1000)
+        minute_used, day_used = [int(x) for x in mu.split(",")] if mu else (0, 0)
+    except Exception:
+        minute_limit, day_limit, minute_used, day_used = 100, 1000, 0, 0
+    return minute_limit, minute_used, day_limit, day_used
+
+
+def observe_rate_limits(headers) -> tuple[int, int, int, int]:
+    """parse_rate_limits(), also published as the rate-limit gauges."""
+    limits = parse_rate_limits(headers)
+    record_rate_limits(*limits)
+    return limits
+
+
+class RateLimitBucket:
+    """Request budget shared by all concurrent Strava calls of one sync.
+
+    Tokens = what the last response says is left in both windows, minus a
+    reserve, minus requests already in flight (their usage is not in the
+    headers yet). Strava's counters are authoritative, so each response
+    resets the level instead of the bucket refilling on a timer.
+    """
+
+    def __init__(self, reserve: int = RATE_LIMIT_RESERVE):
+        self.reserve = reserve
+        self._tokens = 100 - reserve  # until the first response tells us
+        self._in_flight = 0
+
+    @property
+    def tokens(self) -> int:
+        return self._tokens
+
+    def acquire(self) -> None:
+        if self._tokens <= 0:
+            raise RateLimited()
+        self._tokens -= 1
+        self._in_flight += 1
+
+    def update(self, response: httpx.Response) -> None:
+        self._in_flight = max(0, self._in_flight - 1)
+        if response.status_code == 429:
+            self._tokens = 0
+            return
+        short_limit, short_used, day_limit, day_used = observe_rate_limits(response.headers)
+        left = min(short_limit - short_used, day_limit - day_used)
+        self._tokens = left - self.reserve - self._in_flight
+
+
+@dataclass
+class SyncResult:
+    imported: int = 0
+    skipped: int = 0           # already in the database
+    streams_fetched: int = 0
+    rate_limited: bool = False
+    run_ids: list[int] = field(default_factory=list)
+
+    def as_response(self) -> dict:
+        out = {"imported": self.imported, "skipped": self.skipped, "streams_fetched": self.streams_fetched}
+        if self.rate_limited:
+            out["note"] = "rate limit reached; run sync again to continue"
+        return out
+
+
+def strava_client(access_token: str, base_url: str | None = None, **kwargs) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=base_url or settings.strava_base_url,
+        headers={"Authorization": f"Bearer {access_token}"},
+        timeout=60,
+        **kwargs,
+    )
+
+
+def activity_start(a: dict) -> int | None:
+    """Epoch seconds of the activity start (UTC), the unit of `after`."""
+    start = a.get("start_date") or a.get("start_date_local")
+    if not start:
+        return None
+    dt = datetime.fromisoformat(start.replace("Z", "+00:00"))
+    return int(dt.timestamp())
+
+
+def get_sync_state(db: Session, key: str, after: int, reset: bool = False) -> StravaSyncState:
+    """Load (or create) the sync state for `key`.
+
+    `after` only seeds the cursor of a new state, or replaces it when
+    `reset` is set; pending streams are kept either way.
+    """
+    state = db.get(StravaSyncState, key)
+    if state is None:
+        db.add(StravaSyncState(key=key, after_cursor=after, pending=[]))
+        try:
+            db.commit()
+        except IntegrityError:
+            # A concurrent sync created it first
+            db.rollback()
+        state = db.get(StravaSyncState, key)
+    elif reset or state.after_cursor is None:
+        state.after_cursor = after
+        state.last_page = None
+        db.commit()
+    return state
+
+
+def run_values(a: dict, run_type: str) -> dict:
+    """Column values for a new run from a Strava activity summary."""
+    start_local = a.get("start_date_local")
+    start_dt = datetime.fromisoformat(start_local.replace("Z", "+00:00")) if start_local else None
+    miles = float(a.get("distance") or 0.0) / 1609.34
+    return {
+        "date": start_dt.date() if start_dt else datetime.utcnow().date(),
+        "title": a.get("name") or "Strava Run",
+        "notes": None,
+        "distance_mi": round(miles, 2),
+        "duration_seconds": int(a.get("moving_time") or 0),
+        "run_type": run_type or "easy",
+        "start_time": hhmm_to_time(start_dt.strftime("%H:%M")) if start_dt else None,
+        "source": "strava",
+        "external_source": EXTERNAL_SOURCE,
+        "external_id": str(a["id"]) if a.get("id") is not None else None,
+    }
+
+
+class KnownRun(NamedTuple):
+    id: int
+    external_id: str | None
+    date: date
+    duration_seconds: int
+    distance_mi: float
+    run_type: str | None
+    source: str | None
+
+
+def _fingerprint(date_, duration_seconds, distance_mi) -> tuple:
+    return date_, int(duration_seconds), round(float(distance_mi), 2)
+
+
+class KnownRuns:
+    """Runs a sync can collide with, loaded in one query for its window.
+
+    Matches an activity by its Strava id; runs imported before external
+    ids existed (external_id NULL) are matched once on date + duration +
+    distance, the old dedupe rule, and then claim the activity's id, so two
+    identical activities never both map to the same run.
+    """
+
+    def __init__(self, db: Session, after: int, before: int | None = None):
+        # start_date_local can be a day either side of the UTC bounds
+        q = db.query(*(getattr(Run, f) for f in KnownRun._fields))
+        q = q.filter(Run.date >= datetime.utcfromtimestamp(after).date() - timedelta(days=1))
+        if before:
+            q = q.filter(Run.date <= datetime.utcfromtimestamp(before).date() + timedelta(days=1))
+        q = q.filter(or_(Run.external_source == EXTERNAL_SOURCE, Run.external_id.is_(None)))
+
+        self.by_id: dict[str, KnownRun] = {}
+        self.unclaimed: dict[tuple, list[KnownRun]] = {}
+        for row in map(KnownRun._make, q):
+            if row.external_id is not None:
+                self.by_id[row.external_id] = row
+            else:
+                key = _fingerprint(row.date, row.duration_seconds, row.distance_mi)
+                self.unclaimed.setdefault(key, []).append(row)
+
+    def match(self, values: dict) -> tuple[KnownRun | None, bool]:
+        """(run, claimed) for a known run, else (None, False)."""
+        row = self.by_id.get(values["external_id"])
+        if row is not None:
+            return row, False
+        key = _fingerprint(values["date"], values["duration_seconds"], values["distance_mi"])
+        candidates = self.unclaimed.get(key)
+        if candidates:
+            row = candidates.pop()
+            if values["external_id"] is not None:
+                self.by_id[values["external_id"]] = row
+            return row, True
+        return None, False
+
+    def add(self, run_id: int, values: dict) -> None:
+        self.by_id[values["external_id"]] = KnownRun(
+            run_id, values["external_id"], values["date"],
+            values["duration_seconds"], values["distance_mi"], values["run_type"], values["source"],
+        )
+
+
+def insert_runs(db: Session, rows: list[dict]) -> dict[str, int]:
+    """INSERT ... ON CONFLICT DO NOTHING; {external_id: run_id} of new rows.
+
+    Activities another sync inserted first are simply absent from the
+    result, which is what makes concurrent syncs idempotent.
+    """
+    if not rows:
+        return {}
+    dialect = db.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    stmt = (
+        insert(Run)
+        .on_conflict_do_nothing(index_elements=[Run.external_source, Run.external_id])
+        .returning(Run.id, Run.external_id)
+    )
+    created = {external_id: run_id for run_id, external_id in db.execute(stmt, rows)}
+    # Core INSERT skips the ORM flush hook that normally does this
+    notify_runs_changed(db, sorted({r["date"] for r in rows}))
+    return created
+
+
+async def sync_activities(
+    db: Session,
+    client: httpx.AsyncClient,
+    *,
+    after: int = 0,
+    before: int | None = None,
+    state: StravaSyncState | None = None,
+    allowed_types: set[str] | None = None,
+    max_activities: int | None = None,
+    start_page: int = 1,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    infer_run_type=None,
+) -> SyncResult:
+    """Import activities in [after, before) with their streams.
+
+    With a `state`, its cursor replaces `after`, its pending streams are
+    fetched first, and it is kept up to date as the sync goes.
+    """
+    db_lock = asyncio.Lock()
+
+    async def in_db(fn, *args):
+        # Off the event loop, and never two threads in the Session at once
+        async with db_lock:
+            return await asyncio.to_thread(fn, *args)
+
+    def current_cursor() -> int | None:
+        # Attributes expire on commit: reading one can query
+        return state.after_cursor if state is not None else None
+
+    after = await in_db(current_cursor) or after
+    bucket = RateLimitBucket()
+    result = SyncResult()
+    # Bounded: when processing falls behind, fetchers wait (holding their
+    # slot) instead of piling parsed streams up in memory
+    done: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    fetch_slots = asyncio.Semaphore(concurrency)
+    fetchers: list[asyncio.Task] = []
+
+    per_page = 200
+    if max_activities and max_activities < per_page:
+        per_page = max(1, max_activities)
+
+    def unpend(run_id: int) -> None:
+        # Reassign (not mutate) so the JSON column is flagged dirty
+        if state is not None:
+            state.pending = [p for p in state.pending if p[1] != run_id]
+
+    async def fetch_streams(run_id: int, activity_id) -> None:
+        async with fetch_slots:
+            try:
+                bucket.acquire()
+            except RateLimited:
+                result.rate_limited = True
+                return
+            r = await client.get(
+                f"/api/v3/activities/{activity_id}/streams",
+                params={"keys": ",".join(STREAM_KEYS), "key_by_type": True},
+            )
+            bucket.update(r)
+            if r.status_code == 429:
+                # Stays pending for the next call
+                result.rate_limited = True
+            elif r.status_code == 200:
+                await done.put((run_id, activity_id, r.content))
+            else:
+                # No streams to get (manual activity, deleted, private)
+                await done.put((run_id, activity_id, None))
+
+    async def consume() -> None:
+        while True:
+            item = await done.get()
+            if item is None:
+                return
+            run_id, activity_id, streams = item
+            if streams is not None:
+                outputs, blob = await asyncio.to_thread(process_streams, streams)
+                await in_db(store_streams, run_id, activity_id, outputs, blob)
+            else:
+                await in_db(store_no_streams, run_id)
+
+    def store_streams(run_id: int, activity_id, outputs: dict, blob) -> None:
+        with import_stage("persist", "strava"):
+            store_stream_outputs(db, run_id, outputs)
+            link_raw_streams(db, run_id, activity_id, blob)
+            result.streams_fetched += 1
+            unpend(run_id)
+            db.commit()
+
+    def store_no_streams(run_id: int) -> None:
+        unpend(run_id)
+        db.commit()
+
+    def alive_pending() -> list:
+        if state is None or not state.pending:
+            return []
+        # Runs deleted since the last call have nothing left to fill in
+        alive = {
+            run_id for (run_id,) in
+            db.query(Run.id).filter(Run.id.in_([p[1] for p in state.pending]))
+        }
+        if len(alive) < len(state.pending):
+            state.pending = [p for p in state.pending if p[1] in alive]
+            db.commit()
+        return list(state.pending)
+
+    def save_page(rows: list[dict], activity_ids: dict, changes: list[dict], retyped_days: list,
+                  cursor: int | None, page: int) -> list[tuple[int, object]]:
+        """One commit for the page's new runs (and the state that points
+        past them); (run_id, activity_id) of the runs created."""
+        if changes:
+            # ORM bulk UPDATE by primary key: one executemany
+            db.execute(update(Run), changes)
+            if retyped_days:
+                notify_runs_changed(db, retyped_days)
+        new_ids = insert_runs(db, rows)
+        result.skipped += len(rows) - len(new_ids)
+        created = []
+        for values in rows:
+            run_id = new_ids.get(values["external_id"])
+            if run_id is not None:
+                known.add(run_id, values)
+                created.append((run_id, activity_ids[values["external_id"]]))
+        if state is not None:
+            state.after_cursor = cursor
+            state.last_page = page
+            state.pending = state.pending + [[a_id, r_id] for r_id, a_id in created]
+        db.commit()
+        return created
+
+    consumer = asyncio.create_task(consume())
+    try:
+        for activity_id, run_id in await in_db(alive_pending):
+            fetchers.append(asyncio.create_task(fetch_streams(run_id, activity_id)))
+        known = await in_db(KnownRuns, db, after, before)
+        page = start_page
+        while not result.rate_limited:
+            if max_activities and result.imported >= max_activities:
+                break
+            params = {"after": after, "per_page": per_page, "page": page}
+            if before:
+                params["before"] = before
+            try:
+                bucket.acquire()
+            except RateLimited:
+                result.rate_limited = True
+                break
+            r = await client.get("/api/v3/athlete/activities", params=params)
+            bucket.update(r)
+            if r.status_code == 429:
+                result.rate_limited = True
+                break
+            if r.status_code != 200:
+                raise StravaError(f"Strava list activities failed: {r.text}")
+            activities = r.json()
+            if not activities:
+                break
+
+            # Save the page's new runs, then fan out their streams
+            rows: list[dict] = []
+            activity_ids: dict[str, object] = {}
+            changes: list[dict] = []
+            retyped_days: list = []
+            cursor = await in_db(current_cursor)
+            for a in activities:
+                if max_activities and result.imported + len(rows) >= max_activities:
+                    break
+                # Every activity looked at moves the cursor, imported or not
+                started = activity_start(a)
+                if started is not None and (cursor is None or started > cursor):
+                    cursor = started
+                if allowed_types and a.get("type") not in allowed_types:
+                    continue
+                inferred = infer_run_type(a) if infer_run_type else "easy"
+                values = run_values(a, inferred)
+                existing, claimed = known.match(values)
+                if existing is not None:
+                    change = {}
+                    if claimed:
+                        change.update(external_source=EXTERNAL_SOURCE, external_id=values["external_id"])
+                    # Upgrade a generic type when Strava knows better
+                    if (
+                        existing.source in ("strava", "manual", None)
+                        and existing.run_type in (None, "easy", "other")
+                        and inferred != existing.run_type
+                    ):
+                        change["run_type"] = inferred
+                        retyped_days.append(existing.date)
+                    if change:
+                        changes.append({"id": existing.id, **change})
+                    result.skipped += 1
+                    continue
+                if values["external_id"] in activity_ids:
+                    continue  # listed twice (pages shifted under us)
+                rows.append(values)
+                activity_ids[values["external_id"]] = a.get("id")
+
+            created = await in_db(save_page, rows, activity_ids, changes, retyped_days, cursor, page)
+            for run_id, activity_id in created:
+                result.imported += 1
+                result.run_ids.append(run_id)
+                fetchers.append(asyncio.create_task(fetch_streams(run_id, activity_id)))
+            page += 1
+
+        fetching = asyncio.gather(*fetchers)
+        # A consumer that died would leave fetchers blocked on the full queue
+        await asyncio.wait({fetching, consumer}, return_when=asyncio.FIRST_COMPLETED)
+        if consumer.done():
+            fetching.cancel()
+        await fetching
+    finally:
+        for task in fetchers:
+            task.cancel()
+        if not consumer.done():
+            await done.put(None)
+        await consumer
+    return result
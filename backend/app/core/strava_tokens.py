@@ -0,0 +1,173 @@
+"""Strava OAuth tokens: cached in memory, refreshed once, saved atomically.
+
+tokens.json is parsed once and then served from memory for as long as
+the file stays the same (a stat per call). fresh() refreshes proactively
+(REFRESH_MARGIN_S before expiry) under a lock, re-checking once it holds
+it, so overlapping syncs wait for a single refresh POST instead of each
+spending the refresh token. Saves go to a temp file that is renamed over
+tokens.json, so a crash never leaves a truncated file.
+
+Several workers and pods share the file. A refresh rotates the refresh
+token, so before refreshing a process re-reads the file if another one
+replaced it, and when Strava rejects the refresh token (400/401) it
+re-reads it once more and uses what the other process stored.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Optional
+
+import httpx
+
+from app.core.config import settings
+
+# Refresh when the access token has less than this left
+REFRESH_MARGIN_S = 300
+
+
+def _post_refresh(refresh_token: str) -> dict:
+    data = {
+        "client_id": settings.strava_client_id,
+        "client_secret": settings.strava_client_secret,
+        "grant_type": "refresh_token",
+        "refresh_token": refresh_token,
+    }
+    with httpx.Client(timeout=30) as client:
+        r = client.post(f"{settings.strava_base_url}/oauth/token", data=data)
+        r.raise_for_status()
+        return r.json()
+
+
+class TokenManager:
+    def __init__(
+        self,
+        path: str,
+        refresh: Callable[[str], dict] = _post_refresh,
+        margin_s: int = REFRESH_MARGIN_S,
+    ):
+        self.path = path
+        self._refresh = refresh
+        self._margin_s = margin_s
+        self._lock = threading.Lock()
+        self._tokens: Optional[dict] = None
+        self._loaded = False
+        # (mtime, inode, size) of the file last read; the atomic rename of a
+        # save always changes the inode
+        self._stamp: Optional[tuple] = None
+
+    def _file_stamp(self) -> Optional[tuple]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_ino, st.st_size
+
+    def _load(self) -> None:
+        self._stamp = self._file_stamp()
+        try:
+            with open(self.path, "r") as f:
+                self._tokens = json.load(f)
+        except (OSError, ValueError):
+            self._tokens = None
+        self._loaded = True
+
+    def _load_if_changed(self) -> None:
+        if not self._loaded or self._file_stamp() != self._stamp:
+            self._load()
+
+    def _save(self, tokens: dict) -> None:
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        # mkstemp creates the file 0600: tokens are credentials
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tokens-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(tokens, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self._stamp = self._file_stamp()
+
+    def get(self) -> Optional[dict]:
+        """Current tokens (possibly expired), or None when not linked."""
+        if not self._loaded or self._file_stamp() != self._stamp:
+            with self._lock:
+                self._load_if_changed()
+        return self._tokens
+
+    def set(self, tokens: dict) -> None:
+        """Store tokens from the OAuth code exchange."""
+        with self._lock:
+            self._save(tokens)
+            self._tokens = tokens
+            self._loaded = True
+
+    def clear(self) -> None:
+        """Forget the tokens (athlete deauthorized the app)."""
+        with self._lock:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            self._tokens = None
+            self._loaded = True
+            self._stamp = None
+
+    def _expiring(self, tokens: dict) -> bool:
+        return tokens.get("expires_at", 0) - time.time() <= self._margin_s
+
+    def fresh(self) -> Optional[dict]:
+        """Tokens valid for at least the margin, refreshing if needed.
+
+        Blocking (it may POST to Strava); call it from a worker thread in
+        async code. Concurrent callers share one refresh.
+        """
+        tokens = self.get()
+        if tokens is None or not self._expiring(tokens):
+            return tokens
+        with self._lock:
+            # Another thread, or another process, may have refreshed while
+            # we waited
+            self._load_if_changed()
+            tokens = self._tokens
+            if tokens is None or not self._expiring(tokens):
+                return tokens
+            try:
+                refreshed = self._refresh(tokens.get("refresh_token"))
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in (400, 401):
+                    raise
+                # Revoked: another process rotated it in the same instant
+                # (the stamp can miss that); take the file's tokens, if newer
+                self._load()
+                current = self._tokens
+                if current is None or current.get("refresh_token") == tokens.get("refresh_token"):
+                    raise
+                if not self._expiring(current):
+                    return current
+                tokens = current
+                refreshed = self._refresh(tokens.get("refresh_token"))
+            # The refresh response has no athlete; keep what we had
+            tokens = {**tokens, **refreshed}
+            self._save(tokens)
+            self._tokens = tokens
+            return tokens
+
+
+_managers: dict[str, TokenManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_token_manager() -> TokenManager:
+    """The manager for the configured tokens file (one per path)."""
+    path = settings.strava_tokens_path
+    manager = _managers.get(path)
+    if manager is None:
+        with _managers_lock:
+            manager = _managers.setdefault(path, TokenManager(path))
+    return manager
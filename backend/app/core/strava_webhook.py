@@ -0,0 +1,278 @@
+"""Strava webhook events: queued on receipt, applied in the background.
+
+Strava POSTs one small event per change and wants a 200 within two
+seconds, so the receiver only stores it (StravaEvent). process_events()
+then applies the queue, doing work proportional to what changed instead
+of re-listing activities:
+
+- activity create: fetch that one activity and its streams, import it
+- activity update: Strava only reports title/type/privacy changes, and
+  the new values are in the event, so a title is applied without any API
+  call; a type we no longer import deletes the run, one we now import
+  fetches it like a create
+- activity delete: delete the run, with a tombstone like DELETE /runs/{id}
+
+Queued events for the same activity are coalesced, so e.g. create +
+delete arriving together cost nothing. When the rate limit runs out the
+remaining events stay queued for the next drain.
+
+Every received event queues a drain, so several can run at once (and on
+several pods). Each first claims its events with one conditional UPDATE
+(claim_events), which skips events already claimed and activities with
+events another drain holds, so an event is applied once and an
+activity's events never by two drains at a time. A claim left by a drain
+that died expires after CLAIM_TIMEOUT.
+"""
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session, aliased
+
+from app.core.metrics import import_stage
+from app.core.strava_streams import STREAM_KEYS, link_raw_streams, process_streams, store_stream_outputs
+from app.core.strava_sync import (
+    EXTERNAL_SOURCE,
+    KnownRuns,
+    RateLimitBucket,
+    RateLimited,
+    StravaError,
+    activity_start,
+    insert_runs,
+    run_values,
+)
+from app.models.run import Run
+from app.models.run_deletion import RunDeletion
+from app.models.run_track import RunTrack
+from app.models.strava_event import StravaEvent
+
+EVENT_OBJECT_TYPES = ("activity", "athlete")
+EVENT_ASPECT_TYPES = ("create", "update", "delete")
+# Events applied per drain; the rest wait for the next one
+PROCESS_BATCH_SIZE = 200
+# A claim older than this belongs to a drain that died; its events are free
+CLAIM_TIMEOUT = timedelta(minutes=15)
+
+
+def event_from_payload(payload: dict) -> StravaEvent:
+    """Validate a webhook body; ValueError when it is not a Strava event."""
+    object_type = payload.get("object_type")
+    aspect_type = payload.get("aspect_type")
+    if object_type not in EVENT_OBJECT_TYPES:
+        raise ValueError(f"object_type must be one of {', '.join(EVENT_OBJECT_TYPES)}")
+    if aspect_type not in EVENT_ASPECT_TYPES:
+        raise ValueError(f"aspect_type must be one of {', '.join(EVENT_ASPECT_TYPES)}")
+    try:
+        object_id = int(payload["object_id"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("object_id must be an integer")
+    updates = payload.get("updates")
+    return StravaEvent(
+        object_type=object_type,
+        object_id=object_id,
+        aspect_type=aspect_type,
+        updates=updates if isinstance(updates, dict) and updates else None,
+        owner_id=payload.get("owner_id"),
+        event_time=payload.get("event_time"),
+    )
+
+
+async def _get(client: httpx.AsyncClient, bucket: RateLimitBucket, path: str, raw: bool = False, **params):
+    """GET JSON from Strava (the undecoded body with raw=True); None when
+    the object is gone or not visible."""
+    bucket.acquire()
+    r = await client.get(path, params=params or None)
+    bucket.update(r)
+    if r.status_code == 429:
+        raise RateLimited()
+    if r.status_code in (403, 404):
+        return None
+    if r.status_code != 200:
+        raise StravaError(f"Strava GET {path} failed: {r.text}")
+    return r.content if raw else r.json()
+
+
+async def _store_streams(db: Session, client, bucket, run_id: int, activity_id: int) -> None:
+    streams = await _get(
+        client, bucket, f"/api/v3/activities/{activity_id}/streams", raw=True,
+        keys=",".join(STREAM_KEYS), key_by_type=True,
+    )
+    if streams is None:
+        db.commit()
+        return
+    outputs, blob = await asyncio.to_thread(process_streams, streams)
+    with import_stage("persist", "strava"):
+        store_stream_outputs(db, run_id, outputs)
+        link_raw_streams(db, run_id, activity_id, blob)
+        db.commit()
+
+
+async def _import_activity(db: Session, client, bucket, activity_id: int, allowed_types, infer_run_type) -> str:
+    a = await _get(client, bucket, f"/api/v3/activities/{activity_id}")
+    if a is None:
+        return "gone"
+    if allowed_types and a.get("type") not in allowed_types:
+        return "ignored"
+    values = run_values(a, infer_run_type(a) if infer_run_type else "easy")
+    started = activity_start(a) or 0
+    existing, claimed = KnownRuns(db, started - 86400, started + 86400).match(values)
+    if existing is not None:
+        if claimed:
+            db.execute(update(Run), [{
+                "id": existing.id,
+                "external_source": EXTERNAL_SOURCE,
+                "external_id": values["external_id"],
+            }])
+            db.commit()
+        return "ignored"
+    run_id = insert_runs(db, [values]).get(values["external_id"])
+    if run_id is None:
+        return "ignored"  # imported by a concurrent sync
+    # The run is kept even if the streams have to wait for the next drain
+    db.commit()
+    await _store_streams(db, client, bucket, run_id, activity_id)
+    return "imported"
+
+
+def _delete_run(db: Session, run: Run) -> None:
+    db.delete(run)
+    db.add(RunDeletion(run_id=run.id))
+    db.commit()
+
+
+async def _apply_activity(db: Session, client, bucket, activity_id: int, events, allowed_types, infer_run_type) -> str:
+    run = (
+        db.query(Run)
+        .filter(Run.external_source == EXTERNAL_SOURCE, Run.external_id == str(activity_id))
+        .first()
+    )
+    if events[-1].aspect_type == "delete":
+        if run is None:
+            return "ignored"
+        _delete_run(db, run)
+        return "deleted"
+
+    # Fold create/update events into the activity's latest known fields
+    created = any(e.aspect_type == "create" for e in events)
+    changes: dict = {}
+    for e in events:
+        changes.update(e.updates or {})
+    activity_type = changes.get("type")
+
+    if run is None:
+        if activity_type and allowed_types and activity_type not in allowed_types:
+            return "ignored"
+        if created or activity_type:
+            return await _import_activity(db, client, bucket, activity_id, allowed_types, infer_run_type)
+        return "ignored"  # an edit to an activity that was never imported
+
+    if activity_type and allowed_types and activity_type not in allowed_types:
+        _delete_run(db, run)
+        return "deleted"
+    if created and db.query(RunTrack.run_id).filter(RunTrack.run_id == run.id).first() is None:
+        # A previous drain imported the run but ran out of budget for streams
+        await _store_streams(db, client, bucket, run.id, activity_id)
+        return "imported"
+    if changes.get("title") and changes["title"] != run.title:
+        run.title = changes["title"]
+        db.commit()
+        return "updated"
+    return "ignored"
+
+
+def _unclaimed(event, now: datetime):
+    return or_(event.claimed_at.is_(None), event.claimed_at < now - CLAIM_TIMEOUT)
+
+
+def claim_events(db: Session, limit: int = PROCESS_BATCH_SIZE) -> list[StravaEvent]:
+    """Claim up to `limit` queued events (oldest first) for this drain.
+
+    One UPDATE ... RETURNING, whose WHERE is re-checked against rows a
+    concurrent drain claimed meanwhile, so two drains never get the same
+    event. Objects with events under another drain's claim are left alone.
+    """
+    now = datetime.now(timezone.utc)
+    held = aliased(StravaEvent)
+    busy = select(held.object_id).where(held.processed_at.is_(None), ~_unclaimed(held, now))
+    candidates = (
+        select(StravaEvent.id)
+        .where(StravaEvent.processed_at.is_(None), _unclaimed(StravaEvent, now), StravaEvent.object_id.not_in(busy))
+        .order_by(StravaEvent.id)
+        .limit(limit)
+    )
+    ids = db.execute(
+        update(StravaEvent)
+        .where(StravaEvent.id.in_(candidates), StravaEvent.processed_at.is_(None), _unclaimed(StravaEvent, now))
+        .values(claimed_at=now)
+        .returning(StravaEvent.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    db.commit()
+    if not ids:
+        return []
+    return db.query(StravaEvent).filter(StravaEvent.id.in_(ids)).order_by(StravaEvent.id).all()
+
+
+def release_events(db: Session, ids: list[int]) -> None:
+    """Give back claimed events that were not applied, for the next drain."""
+    if ids:
+        db.execute(
+            update(StravaEvent)
+            .where(StravaEvent.id.in_(ids), StravaEvent.processed_at.is_(None))
+            .values(claimed_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+
+async def process_events(
+    db: Session,
+    client: httpx.AsyncClient,
+    *,
+    allowed_types: set[str] | None = None,
+    infer_run_type=None,
+    limit: int = PROCESS_BATCH_SIZE,
+) -> dict[str, int]:
+    """Claim and apply queued events (oldest first); counts per outcome."""
+    events = claim_events(db, limit)
+    ids = [e.id for e in events]
+    try:
+        return await _apply_events(db, client, events, allowed_types, infer_run_type)
+    finally:
+        # Whatever is left (rate limit, error) goes back to the queue now
+        # rather than when the claim expires
+        db.rollback()
+        release_events(db, ids)
+
+
+async def _apply_events(db: Session, client, events: list[StravaEvent], allowed_types, infer_run_type) -> dict[str, int]:
+    by_object: dict[tuple, list[StravaEvent]] = {}
+    for e in events:
+        by_object.setdefault((e.object_type, e.object_id), []).append(e)
+
+    bucket = RateLimitBucket()
+    counts: Counter = Counter()
+    for (object_type, object_id), group in by_object.items():
+        try:
+            if object_type == "activity":
+                outcome = await _apply_activity(
+                    db, client, bucket, object_id, group, allowed_types, infer_run_type
+                )
+            else:
+                outcome = "ignored"  # deauthorization is handled on receipt
+        except RateLimited:
+            db.rollback()
+            counts["queued"] += len(events) - sum(counts.values())
+            break
+        except StravaError:
+            db.rollback()
+            outcome = "failed"
+        now = datetime.now(timezone.utc)
+        for e in group:
+            e.processed_at = now
+            e.outcome = outcome
+        db.commit()
+        counts[outcome] += len(group)
+    return dict(counts)
@@ -37,6 +37,24 @@ def compute_pace(duration_seconds: int, distance_mi: float) -> str:
     return f"{minutes}:{seconds:02d}/mi"
 
 
+def pace_to_seconds(pace: str) -> int:
+    """
+    Convert pace 'M:SS' or 'M:SS/mi' -> seconds per mile (int).
+    Example: '7:30/mi' -> 450
+    """
+    s = pace.strip()
+    if s.endswith("/mi"):
+        s = s[:-3]
+    parts = s.split(":")
+    if len(parts) != 2:
+        raise ValueError("Pace must be in M:SS format")
+
+    minutes, seconds = map(int, parts)
+    if minutes < 0 or not 0 <= seconds < 60:
+        raise ValueError("Pace must be in M:SS format")
+    return minutes * 60 + seconds
+
+
 def hhmm_to_time(hhmm: str):
     """Parse time strings into datetime.time.
 
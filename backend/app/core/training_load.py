@@ -0,0 +1,189 @@
+"""Training load: TRIMP per run and the ATL/CTL/TSB daily series.
+
+The series lives in training_load_days and is maintained incrementally:
+
+- Any change to a run or its HR metrics deletes the stored days from that
+  run's date onward (via app/core/run_changes.py). Nothing is recomputed
+  on the write path.
+- ensure_training_load() extends the series from the last stored day using
+  the exponential-decay recurrence, seeded from that day's ATL/CTL, so a
+  read only pays for the days that were invalidated or never computed. If
+  a write invalidated days meanwhile, it stores nothing (cache_versions).
+- Only days up to today, or the last run if that is later, are stored.
+  training_load_series() computes anything after the last stored day in
+  memory, so a far-future `end` cannot grow the table.
+"""
+import math
+from datetime import date, timedelta
+
+from sqlalchemy import delete, func, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.cache_versions import bump_version, current_version, unchanged_since
+from app.core.config import settings
+from app.core.constants import (
+    ATL_DAYS,
+    CTL_DAYS,
+    HR_ZONE_BOUNDS,
+    RUN_TYPE_TRIMP_ZONE,
+    TRAINING_LOAD_FUTURE_DAYS,
+)
+from app.core.run_changes import on_runs_changed
+from app.models.run import Run
+from app.models.run_metrics import RunMetrics
+from app.models.training_load_day import TrainingLoadDay
+
+CACHE_NAME = "training_load"
+ATL_DECAY = 1 - math.exp(-1 / ATL_DAYS)
+CTL_DECAY = 1 - math.exp(-1 / CTL_DAYS)
+
+
+def _hr_zone(avg_hr: float) -> int:
+    hr_max = settings.hr_max or (220 - settings.age)
+    frac = avg_hr / hr_max if hr_max else 0
+    for z in range(5):
+        if HR_ZONE_BOUNDS[z] <= frac < HR_ZONE_BOUNDS[z + 1]:
+            return z + 1
+    return 5 if frac >= HR_ZONE_BOUNDS[-1] else 1
+
+
+def run_trimp(duration_seconds: int, run_type: str | None, avg_hr=None, hr_zones=None) -> float:
+    """Edwards TRIMP: minutes in each HR zone weighted by the zone number.
+
+    Uses the time-in-zone breakdown when the run has one, otherwise puts
+    the whole run in the zone of its average HR, otherwise in a zone
+    implied by the run type (manual entries without HR).
+    """
+    if hr_zones:
+        trimp = sum(
+            (hr_zones.get(f"z{z}") or 0) / 60 * z
+            for z in range(1, 6)
+        )
+        if trimp > 0:
+            return trimp
+    minutes = (duration_seconds or 0) / 60
+    if avg_hr:
+        return minutes * _hr_zone(avg_hr)
+    return minutes * RUN_TYPE_TRIMP_ZONE.get(run_type or "", 2)
+
+
+def _daily_loads(db: Session, start: date, end: date) -> dict[date, float]:
+    rows = (
+        db.query(Run.date, Run.duration_seconds, Run.run_type, RunMetrics.avg_hr, RunMetrics.hr_zones)
+        .outerjoin(RunMetrics, RunMetrics.run_id == Run.id)
+        .filter(Run.date >= start, Run.date <= end)
+        .all()
+    )
+    loads: dict[date, float] = {}
+    for day, duration_seconds, run_type, avg_hr, hr_zones in rows:
+        loads[day] = loads.get(day, 0.0) + run_trimp(duration_seconds, run_type, avg_hr, hr_zones)
+    return loads
+
+
+def _series(start: date, through: date, loads: dict[date, float], atl: float, ctl: float) -> list[dict]:
+    """Run the ATL/CTL recurrence from `start` through `through`."""
+    rows = []
+    day = start
+    while day <= through:
+        load = loads.get(day, 0.0)
+        tsb = ctl - atl
+        atl += (load - atl) * ATL_DECAY
+        ctl += (load - ctl) * CTL_DECAY
+        rows.append({"day": day, "load": load, "atl": atl, "ctl": ctl, "tsb": tsb})
+        day += timedelta(days=1)
+    return rows
+
+
+def _store_limit(last_run: date) -> date:
+    return max(date.today(), last_run)
+
+
+def ensure_training_load(db: Session, through: date) -> None:
+    """Materialize training_load_days up to `through`, or the store limit
+    (today, or the last run if later) when that comes first."""
+    version = current_version(db, CACHE_NAME)
+    last_run = db.query(func.max(Run.date)).scalar()
+    if last_run is None:
+        return
+    through = min(through, _store_limit(last_run))
+    last = db.query(func.max(TrainingLoadDay.day)).scalar()
+    if last is not None and last >= through:
+        return
+
+    if last is None:
+        start = db.query(func.min(Run.date)).scalar()
+        atl = ctl = 0.0
+    else:
+        start = last + timedelta(days=1)
+        prev = db.get(TrainingLoadDay, last)
+        atl, ctl = prev.atl, prev.ctl
+    if start > through:
+        return
+
+    rows = _series(start, through, _daily_loads(db, start, through), atl, ctl)
+    try:
+        if not unchanged_since(db, CACHE_NAME, version):
+            # A run changed while we read: these rows may be stale
+            db.rollback()
+            return
+        db.execute(insert(TrainingLoadDay), rows)
+        db.commit()
+    except IntegrityError:
+        # A concurrent request materialized the same days first
+        db.rollback()
+
+
+def training_load_series(db: Session, start: date, end: date) -> list[dict]:
+    """Days `start`..`end` of the series, from the stored days plus an
+    in-memory extension past the last one.
+
+    `end` is clamped to TRAINING_LOAD_FUTURE_DAYS past the store limit.
+    """
+    last_run = db.query(func.max(Run.date)).scalar()
+    if last_run is None:
+        return []
+    end = min(end, _store_limit(last_run) + timedelta(days=TRAINING_LOAD_FUTURE_DAYS))
+    if start > end:
+        return []
+
+    ensure_training_load(db, end)
+    stored = (
+        db.query(TrainingLoadDay)
+        .filter(TrainingLoadDay.day >= start, TrainingLoadDay.day <= end)
+        .order_by(TrainingLoadDay.day)
+        .all()
+    )
+    points = [
+        {"day": r.day, "load": r.load, "atl": r.atl, "ctl": r.ctl, "tsb": r.tsb}
+        for r in stored
+    ]
+
+    prev = (
+        db.query(TrainingLoadDay)
+        .filter(TrainingLoadDay.day <= end)
+        .order_by(TrainingLoadDay.day.desc())
+        .first()
+    )
+    if prev is not None and prev.day < end:
+        # Past the store limit (or a fill that was skipped): loads are read
+        # as usual, just not kept
+        first = prev.day + timedelta(days=1)
+        extra = _series(first, end, _daily_loads(db, first, end), prev.atl, prev.ctl)
+        points.extend(p for p in extra if p["day"] >= start)
+    return points
+
+
+def invalidate_training_load(db: Session, since: date | None = None) -> None:
+    """Drop stored days from `since` onward (all of them when None)."""
+    bump_version(db, CACHE_NAME)
+    stmt = delete(TrainingLoadDay.__table__)
+    if since is not None:
+        stmt = stmt.where(TrainingLoadDay.day >= since)
+    # Plain connection execute: safe from inside a flush event
+    db.connection().execute(stmt)
+
+
+@on_runs_changed
+def _invalidate_changed_days(db: Session, days) -> None:
+    invalidate_training_load(db, min(days) if days else None)
@@ -0,0 +1,121 @@
+"""Calendar heatmap and year-in-review aggregates, cached per year.
+
+One GROUP BY-day query over the year's runs (joined to their metrics for
+elevation) feeds everything: the gap-filled daily calendar, the monthly
+rollups and the year totals are built from those <= 366 rows in one pass.
+The result is stored in year_stats_cache and served from there until a
+run in that year changes (app/core/run_changes.py drops the row). A result
+computed while a run changed is returned but not stored (cache_versions).
+"""
+from datetime import date, timedelta
+
+from sqlalchemy import delete, func, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.cache_versions import bump_version, current_version, unchanged_since
+from app.core.run_changes import on_runs_changed
+from app.models.run import Run
+from app.models.run_metrics import RunMetrics
+from app.models.year_stats_cache import YearStatsCache
+
+CACHE_NAME = "year_stats"
+
+
+def _totals() -> dict:
+    return {"distance_mi": 0.0, "duration_s": 0, "elev_gain_ft": 0.0, "runs": 0}
+
+
+def _add(totals: dict, day: dict) -> None:
+    for key in ("distance_mi", "duration_s", "elev_gain_ft", "runs"):
+        totals[key] += day[key]
+
+
+def _rounded(totals: dict) -> dict:
+    totals["distance_mi"] = round(totals["distance_mi"], 2)
+    totals["elev_gain_ft"] = round(totals["elev_gain_ft"], 1)
+    return totals
+
+
+def compute_year_stats(db: Session, year: int) -> dict:
+    start, end = date(year, 1, 1), date(year, 12, 31)
+    rows = (
+        db.query(
+            Run.date,
+            func.sum(Run.distance_mi),
+            func.sum(Run.duration_seconds),
+            func.sum(RunMetrics.elev_gain_ft),
+            func.count(Run.id),
+            func.max(Run.distance_mi),
+        )
+        .outerjoin(RunMetrics, RunMetrics.run_id == Run.id)
+        .filter(Run.date >= start, Run.date <= end)
+        .group_by(Run.date)
+        .all()
+    )
+    by_day = {r[0]: r for r in rows}
+
+    calendar = []
+    months = [{"month": m, **_totals(), "longest_run_mi": 0.0} for m in range(1, 13)]
+    total = {**_totals(), "active_days": 0}
+    longest = None
+    day = start
+    while day <= end:
+        row = by_day.get(day)
+        entry = {"date": day.isoformat(), **_totals()}
+        if row is not None:
+            _, distance, duration, elev, count, longest_mi = row
+            entry.update(
+                distance_mi=round(float(distance or 0), 2),
+                duration_s=int(duration or 0),
+                elev_gain_ft=round(float(elev or 0), 1),
+                runs=count,
+            )
+            month = months[day.month - 1]
+            _add(month, entry)
+            _add(total, entry)
+            total["active_days"] += 1
+            longest_mi = float(longest_mi or 0)
+            month["longest_run_mi"] = max(month["longest_run_mi"], longest_mi)
+            if longest is None or longest_mi > longest["distance_mi"]:
+                longest = {"date": day.isoformat(), "distance_mi": longest_mi}
+        calendar.append(entry)
+        day += timedelta(days=1)
+
+    summary = {
+        "year": year,
+        **_rounded(total),
+        "longest_run": longest,
+        "months": [_rounded(m) for m in months],
+    }
+    return {"year": year, "calendar": calendar, "summary": summary}
+
+
+def get_year_stats(db: Session, year: int) -> dict:
+    version = current_version(db, CACHE_NAME)
+    cached = db.get(YearStatsCache, year)
+    if cached is not None:
+        return cached.payload
+
+    payload = compute_year_stats(db, year)
+    try:
+        if not unchanged_since(db, CACHE_NAME, version):
+            # A run changed while we read: fine to answer with, not to keep
+            db.rollback()
+            return payload
+        db.execute(insert(YearStatsCache).values(year=year, payload=payload))
+        db.commit()
+    except IntegrityError:
+        # A concurrent request cached it first; ours is equally fresh
+        db.rollback()
+    return payload
+
+
+@on_runs_changed
+def _invalidate_changed_years(db: Session, days) -> None:
+    bump_version(db, CACHE_NAME)
+    stmt = delete(YearStatsCache.__table__)
+    if days:
+        stmt = stmt.where(YearStatsCache.year.in_(sorted({d.year for d in days})))
+    # Plain connection execute: safe from inside a flush event
+    db.connection().execute(stmt)
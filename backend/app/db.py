@@ -1,23 +1,170 @@
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import JSON, create_engine, event
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
+from app.core.pool_stats import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+from app.core.read_routing import wants_primary
+from app.core.request_timing import instrument_engine
 
 # SQLAlchemy Base class for models to inherit
 Base = declarative_base()
 
+# JSONB on Postgres, plain JSON elsewhere (SQLite for tests / local replicas)
+JSONB = JSON().with_variant(postgresql.JSONB(), "postgresql")
+
+
+def _pool_kwargs(url: str, poolclass) -> dict:
+    """Pool settings from config; in-memory SQLite keeps its default pool."""
+    u = make_url(url)
+    if u.get_backend_name() == "sqlite" and u.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,  # helps avoid stale connections
+    }
+
+
 # Create SQLAlchemy engine (connects to Postgres)
 engine = create_engine(
     settings.database_url,
-    pool_pre_ping=True,   # helps avoid stale connections
+    **_pool_kwargs(settings.database_url, InstrumentedQueuePool),
 )
 
+
+def _sqlite_foreign_keys(engine_) -> None:
+    """SQLite ignores FKs unless asked per connection; the models rely on
+    ON DELETE CASCADE (passive_deletes) to remove a run's derived rows."""
+    if engine_.dialect.name == "sqlite":
+        event.listen(
+            engine_, "connect",
+            lambda dbapi_conn, _record: dbapi_conn.execute("PRAGMA foreign_keys=ON"),
+        )
+
+
+_sqlite_foreign_keys(engine)
+instrument_engine(engine)
+
 # Factory that creates DB sessions
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Read replica engine; the primary itself when no replica is configured
+read_engine = (
+    create_engine(
+        settings.database_read_url,
+        **_pool_kwargs(settings.database_read_url, InstrumentedQueuePool),
+    )
+    if settings.database_read_url
+    else engine
+)
+if read_engine is not engine:
+    _sqlite_foreign_keys(read_engine)
+    instrument_engine(read_engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+
+def import_models() -> None:
+    """Import every module under app/models so Base.metadata knows all tables."""
+    import importlib
+    import pkgutil
+
+    import app.models
+
+    for module in pkgutil.iter_modules(app.models.__path__):
+        importlib.import_module(f"app.models.{module.name}")
+
+
+def create_tables(bind=None) -> None:
+    """Create the models' missing tables (throwaway databases: tests,
+    benchmarks). Real databases are migrated with `alembic upgrade head`
+    (entrypoint.sh); the app itself never creates tables."""
+    import_models()
+    Base.metadata.create_all(bind=bind or engine)
+
 # Dependency we will use in FastAPI routes
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def get_read_db(request: Request):
+    """Session for read-only routes: the replica, unless this client wrote
+    recently and must read its own writes from the primary."""
+    db = SessionLocal() if wants_primary(request) else ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# --------- Async engine (optional, settings.db_async) --------- #
+
+# Sync driver -> async driver for the same database
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def async_url(url: str) -> str:
+    """Map a sync database URL to its async-driver equivalent."""
+    scheme, sep, rest = url.partition("://")
+    scheme = _ASYNC_DRIVERS.get(scheme, scheme)
+    if scheme == "postgresql+asyncpg":
+        # asyncpg spells libpq's sslmode as ssl (e.g. ?sslmode=disable in Helm)
+        rest = rest.replace("sslmode=", "ssl=")
+    return f"{scheme}{sep}{rest}"
+
+
+# Keyed by "primary" / "replica"
+_async_engines: dict = {}
+_async_sessionmakers: dict = {}
+
+
+def _async_role(replica: bool) -> str:
+    return "replica" if replica and settings.database_read_url else "primary"
+
+
+def get_async_engine(replica: bool = False):
+    """Create an async engine on first use so asyncpg/aiosqlite are only
+    imported when async mode is actually enabled."""
+    key = _async_role(replica)
+    if key not in _async_engines:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        if key == "replica":
+            url = async_url(settings.database_read_url)
+        else:
+            url = settings.async_database_url or async_url(settings.database_url)
+        _async_engines[key] = create_async_engine(
+            url,
+            **_pool_kwargs(url, InstrumentedAsyncQueuePool),
+        )
+        instrument_engine(_async_engines[key].sync_engine)
+        _async_sessionmakers[key] = async_sessionmaker(
+            _async_engines[key], autoflush=False, expire_on_commit=False
+        )
+    return _async_engines[key]
+
+
+def started_async_engines() -> dict:
+    """Async engines created so far, by role."""
+    return dict(_async_engines)
+
+
+async def get_async_db(request: Request):
+    """Async counterpart of get_read_db for the read-only async routes."""
+    replica = not wants_primary(request)
+    get_async_engine(replica)
+    async with _async_sessionmakers[_async_role(replica)]() as db:
+        yield db
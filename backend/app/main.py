@@ -1,12 +1,25 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
 from app.api.runs import router as runs_router
 from app.api.goals import router as goals_router
 from app.api.strava import router as strava_router
-from app.db import Base, engine
-from app.models.run import Run  # noqa: F401  (import ensures table is registered)
+from app.api.diagnostics import router as diagnostics_router
+from app.api.stats import router as stats_router
+from app.api.metrics import router as metrics_router
+from app.db import engine
+from app.models.run import Run  # noqa: F401  (import ensures the model is mapped)
 from app.models.weekly_goal import WeeklyGoal  # noqa: F401
+from app.models.run_deletion import RunDeletion  # noqa: F401
+from app.models.training_load_day import TrainingLoadDay  # noqa: F401
+from app.models.year_stats_cache import YearStatsCache  # noqa: F401
+from app.models.strava_sync_state import StravaSyncState  # noqa: F401
+from app.models.strava_event import StravaEvent  # noqa: F401
 from app.core.config import settings
+from app.core.read_routing import PRIMARY_UNTIL_HEADER, read_your_writes_middleware
+from app.core.request_timing import request_timing_middleware
 import os
 
 
@@ -21,21 +34,52 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Read-your-writes deadline for the frontend (app/core/read_routing.py)
+    expose_headers=[PRIMARY_UNTIL_HEADER],
 )
 
+# Pin a client's reads to the primary right after it writes (replica lag)
+app.middleware("http")(read_your_writes_middleware)
+# Outermost, so its total covers the other middleware too
+app.middleware("http")(request_timing_middleware)
+
+
+# Liveness: the process answers. No dependencies, so a database outage
+# does not get every pod restarted
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
-# Create DB tables (runs, etc.) on startup
-Base.metadata.create_all(bind=engine)
+
+# Readiness: can serve traffic, i.e. the database answers. The schema is
+# created and migrated by `alembic upgrade head` (entrypoint.sh), not here
+@app.get("/health/ready")
+def ready():
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except SQLAlchemyError:
+        return JSONResponse({"status": "unavailable", "database": "down"}, status_code=503)
+    return {"status": "ok", "database": "ok"}
+
 
 # Ensure uploads directory exists
 os.makedirs(settings.uploads_dir, exist_ok=True)
 
+if settings.db_async:
+    # Registered first so they shadow the sync GET handlers on the same paths
+    from app.api.runs_async import router as runs_async_router
+    from app.api.goals_async import router as goals_async_router
+
+    app.include_router(runs_async_router)
+    app.include_router(goals_async_router)
+
 app.include_router(runs_router)
 app.include_router(goals_router)
 app.include_router(strava_router)
+app.include_router(stats_router)
+app.include_router(diagnostics_router)
+app.include_router(metrics_router)
 
 
 @app.get("/")
@@ -0,0 +1,12 @@
+from sqlalchemy import BigInteger, Column, String
+from app.db import Base
+
+
+class CacheVersion(Base):
+    """Invalidation counter of one derived-data cache (see
+    app/core/cache_versions.py)."""
+
+    __tablename__ = "cache_versions"
+
+    name = Column(String(40), primary_key=True)   # training_load, year_stats
+    version = Column(BigInteger, nullable=False, server_default="0")
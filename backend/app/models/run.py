@@ -1,22 +1,44 @@
-from sqlalchemy import Column, Integer, String, Date, DateTime, Numeric, Time
+from sqlalchemy import Column, Integer, String, Date, DateTime, Numeric, Time, Index, DDL, event, literal_column
+from sqlalchemy.orm import relationship, column_property
 from sqlalchemy.sql import func
 from app.db import Base
 
+
+def pace_expression(duration_seconds, distance_mi):
+    """SQL for seconds per mile; NULL for zero-distance runs.
+
+    The literal 0 (not a bound parameter) keeps the rendered expression
+    identical to ix_runs_pace_s_per_mi so filters and ORDER BY can use it.
+    """
+    return duration_seconds / func.nullif(distance_mi, literal_column("0"))
+
+
+def search_document(title, notes):
+    """Postgres tsvector over title + notes for GET /runs/search.
+
+    Must stay identical to the ix_runs_search_document expression; literals
+    (not bound parameters) so the planner matches it.
+    """
+    text = func.coalesce(title, literal_column("''")).op("||")(literal_column("' '")).op("||")(
+        func.coalesce(notes, literal_column("''"))
+    )
+    return func.to_tsvector(literal_column("'english'"), text)
+
 class Run(Base):
     __tablename__ = "runs"
 
     id = Column(Integer, primary_key=True, index=True)
 
-    date = Column(Date, nullable=False)
+    date = Column(Date, nullable=False, index=True)
 
     title = Column(String, nullable=False)
     notes = Column(String, nullable=True)
 
-    distance_mi = Column(Numeric(5, 2), nullable=False)  # e.g. 7.35 miles
+    distance_mi = Column(Numeric(5, 2), nullable=False, index=True)  # e.g. 7.35 miles
 
     # Duration stored as **total seconds** (int)
     # Frontend will convert HH:MM:SS ↔ seconds
-    duration_seconds = Column(Integer, nullable=False)
+    duration_seconds = Column(Integer, nullable=False, index=True)
 
     # Optional start time (local day time only)
     start_time = Column(Time, nullable=True)
@@ -35,6 +57,11 @@ class Run(Base):
         server_default="manual",  # manual entry, imported, api
     )
 
+    # Identity in the system it was imported from (e.g. "strava" + activity
+    # id); NULL for manual entries. Unique, so re-imports are no-ops.
+    external_source = Column(String(20), nullable=True)
+    external_id = Column(String(64), nullable=True)
+
     # Timestamps
     created_at = Column(
         DateTime(timezone=True),
@@ -47,7 +74,74 @@ class Run(Base):
         nullable=False,
         server_default=func.now(),
         onupdate=func.now(),
+        index=True,  # delta sync: GET /runs/changes?since=
+    )
+
+    # Derived data (populated by file/Strava processing). Rows are removed by
+    # the FK ON DELETE CASCADE, so the ORM never loads them just to delete.
+    metrics = relationship(
+        "RunMetrics", uselist=False, cascade="all, delete-orphan", passive_deletes=True
+    )
+    splits = relationship(
+        "RunSplit", order_by="RunSplit.idx", cascade="all, delete-orphan", passive_deletes=True
+    )
+    track = relationship(
+        "RunTrack", uselist=False, cascade="all, delete-orphan", passive_deletes=True
+    )
+
+    # Pace is NOT stored — it’s computed by the database (filter/sort in
+    # list_runs) and formatted as "M:SS/mi" in the schema layer
+    pace_s_per_mi = column_property(
+        pace_expression(duration_seconds, distance_mi), deferred=True
     )
 
-    # Pace is NOT stored — it’s computed on the fly
-    # pace = duration_seconds / distance_mi  (we will compute this in schema)
+    __table_args__ = (
+        Index("ix_runs_pace_s_per_mi", pace_expression(duration_seconds, distance_mi)),
+        Index("ux_runs_external", external_source, external_id, unique=True),
+        # Search (Postgres): full-text GIN plus trigram indexes for the fuzzy
+        # fallback. SQLite uses the runs_fts FTS5 table below instead.
+        Index(
+            "ix_runs_search_document",
+            search_document(title, notes),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_runs_title_trgm",
+            title,
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_runs_notes_trgm",
+            notes,
+            postgresql_using="gin",
+            postgresql_ops={"notes": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+# SQLite search index: an external-content FTS5 table over runs(title, notes)
+# kept in sync by triggers, so no application code has to maintain it.
+SQLITE_FTS_DDL = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS runs_fts USING fts5(
+        title, notes, content='runs', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS runs_fts_ai AFTER INSERT ON runs BEGIN
+        INSERT INTO runs_fts(rowid, title, notes) VALUES (new.id, new.title, new.notes);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS runs_fts_ad AFTER DELETE ON runs BEGIN
+        INSERT INTO runs_fts(runs_fts, rowid, title, notes) VALUES ('delete', old.id, old.title, old.notes);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS runs_fts_au AFTER UPDATE OF title, notes ON runs BEGIN
+        INSERT INTO runs_fts(runs_fts, rowid, title, notes) VALUES ('delete', old.id, old.title, old.notes);
+        INSERT INTO runs_fts(rowid, title, notes) VALUES (new.id, new.title, new.notes);
+    END""",
+)
+
+event.listen(
+    Run.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+for _stmt in SQLITE_FTS_DDL:
+    event.listen(Run.__table__, "after_create", DDL(_stmt).execute_if(dialect="sqlite"))
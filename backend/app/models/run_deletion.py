@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, DateTime
+from sqlalchemy.sql import func
+from app.db import Base
+
+
+class RunDeletion(Base):
+    """Tombstone for a deleted run so sync clients can drop it locally."""
+
+    __tablename__ = "run_deletions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Not a FK: the run row is gone by the time anyone reads this
+    run_id = Column(Integer, nullable=False, index=True)
+    deleted_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        index=True,
+    )
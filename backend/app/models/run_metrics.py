@@ -1,6 +1,5 @@
 from sqlalchemy import Column, Integer, String, ForeignKey, Numeric
-from sqlalchemy.dialects.postgresql import JSONB
-from app.db import Base
+from app.db import Base, JSONB
 
 
 class RunMetrics(Base):
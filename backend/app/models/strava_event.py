@@ -0,0 +1,36 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+from app.db import Base, JSONB
+
+
+class StravaEvent(Base):
+    """A Strava webhook event, queued until it has been applied.
+
+    Stored before the webhook answers, so an event survives a restart
+    between being received and being processed.
+    """
+
+    __tablename__ = "strava_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    object_type = Column(String(20), nullable=False)   # activity, athlete
+    object_id = Column(BigInteger, nullable=False, index=True)
+    aspect_type = Column(String(20), nullable=False)   # create, update, delete
+    # e.g. {"title": "Morning Run"}, {"type": "Ride"}, {"authorized": "false"}
+    updates = Column(JSONB, nullable=True)
+    owner_id = Column(BigInteger, nullable=True)
+    event_time = Column(BigInteger, nullable=True)     # epoch seconds, from Strava
+
+    received_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+    # Set by the drain applying it (strava_webhook.claim_events), so two
+    # drains never apply the same event; NULL or stale = free to claim
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    # NULL = still queued
+    processed_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    # imported, updated, deleted, ignored, gone
+    outcome = Column(String(20), nullable=True)
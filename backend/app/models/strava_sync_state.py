@@ -0,0 +1,31 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+from app.db import Base, JSONB
+
+
+class StravaSyncState(Base):
+    """Where a Strava sync stopped, so the next call resumes from there.
+
+    One row per sync scope: "recent" for the rolling /strava/sync, or
+    "window:<after>:<before>" for an explicit start_date/end_date backfill.
+    """
+
+    __tablename__ = "strava_sync_state"
+
+    key = Column(String(64), primary_key=True)
+
+    # Start time (epoch seconds, UTC) of the newest activity handled; the
+    # next listing asks Strava for activities after it
+    after_cursor = Column(BigInteger, nullable=True)
+    # Last activity-list page fetched by the previous call
+    last_page = Column(Integer, nullable=True)
+    # [[activity_id, run_id], ...]: runs created whose streams are not
+    # stored yet (rate limit hit, crash); fetched first on the next call
+    pending = Column(JSONB, nullable=False, default=list)
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Date, Float
+from app.db import Base
+
+
+class TrainingLoadDay(Base):
+    """Materialized daily training load (see app/core/training_load.py).
+
+    Rows are contiguous from the first run's date; a write to any run
+    deletes the rows from its date onward and they are recomputed on the
+    next read.
+    """
+
+    __tablename__ = "training_load_days"
+
+    day = Column(Date, primary_key=True)
+
+    load = Column(Float, nullable=False)  # TRIMP summed over the day's runs
+    atl = Column(Float, nullable=False)   # acute load (fatigue), end of day
+    ctl = Column(Float, nullable=False)   # chronic load (fitness), end of day
+    tsb = Column(Float, nullable=False)   # form going into the day: CTL - ATL of the day before
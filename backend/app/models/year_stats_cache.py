@@ -0,0 +1,17 @@
+from sqlalchemy import Column, DateTime, Integer
+from sqlalchemy.sql import func
+from app.db import Base, JSONB
+
+
+class YearStatsCache(Base):
+    """Cached calendar + year summary payload (see app/core/year_stats.py).
+
+    A row is deleted whenever a run in that year changes, in the same
+    transaction, and rebuilt on the next read.
+    """
+
+    __tablename__ = "year_stats_cache"
+
+    year = Column(Integer, primary_key=True, autoincrement=False)
+    payload = Column(JSONB, nullable=False)
+    computed_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -24,3 +24,16 @@ class WeeklyGoalRead(WeeklyGoalBase):
 class WeeklyGoalUpsert(BaseModel):
     goal_miles: float
     notes: Optional[str] = None
+
+
+class WeeklyGoalBulkItem(WeeklyGoalUpsert):
+    week_start: date  # any day of the week; normalized to its Monday
+
+
+class WeeklyGoalProgress(BaseModel):
+    week_start: date
+    goal_miles: Optional[float] = None  # None when no goal is set
+    notes: Optional[str] = None
+    actual_miles: float
+    run_count: int
+    completion_pct: Optional[float] = None  # actual / goal * 100
@@ -1,5 +1,5 @@
-from datetime import date
-from typing import Optional
+from datetime import date, datetime
+from typing import Literal, Optional
 from enum import Enum
 
 from pydantic import BaseModel
@@ -72,3 +72,32 @@ class RunRead(RunBase):
 class WeeklyMileagePoint(BaseModel):
     week_start: date
     total_mileage: float
+
+
+class RunBulkError(BaseModel):
+    index: int   # position in the submitted array
+    detail: str
+
+
+class RunBulkResult(BaseModel):
+    created: int
+    ids: list[int]  # new run ids, in the order the valid items were submitted
+    errors: list[RunBulkError] = []
+
+
+class RunTombstone(BaseModel):
+    id: int  # id of the deleted run
+    deleted_at: datetime
+
+
+class RunChanges(BaseModel):
+    # Pass back as `since` on the next call (a little behind the newest
+    # change, see list_run_changes)
+    cursor: Optional[datetime] = None
+    runs: list[RunRead]           # created or updated at/after `since`
+    deleted: list[RunTombstone]   # deleted at/after `since`
+
+
+class RunSearchResult(RunRead):
+    rank: float   # higher is a better match; only comparable within one response
+    match: Literal["fulltext", "fuzzy"]  # fuzzy = trigram/substring fallback
@@ -0,0 +1,62 @@
+from datetime import date
+from typing import Optional
+from pydantic import BaseModel
+
+
+class TrainingLoadPoint(BaseModel):
+    date: date
+    load: float  # TRIMP
+    atl: float   # acute training load (fatigue)
+    ctl: float   # chronic training load (fitness)
+    tsb: float   # training stress balance (form)
+
+
+class CalendarDay(BaseModel):
+    date: date
+    distance_mi: float
+    duration_s: int
+    elev_gain_ft: float
+    runs: int
+
+
+class CalendarYear(BaseModel):
+    year: int
+    days: list[CalendarDay]  # every day of the year, zeros on rest days
+
+
+class LongestRun(BaseModel):
+    date: date
+    distance_mi: float
+
+
+class MonthSummary(BaseModel):
+    month: int  # 1-12
+    distance_mi: float
+    duration_s: int
+    elev_gain_ft: float
+    runs: int
+    longest_run_mi: float
+
+
+class YearSummary(BaseModel):
+    year: int
+    distance_mi: float
+    duration_s: int
+    elev_gain_ft: float
+    runs: int
+    active_days: int
+    longest_run: Optional[LongestRun] = None
+    months: list[MonthSummary]
+
+
+class CumulativeSeries(BaseModel):
+    year: int
+    total_mi: float
+    # Aligned with CumulativeMileage.day_of_year; None for days that have not
+    # happened yet (current year) or do not exist (day 366 of a common year)
+    cumulative_mi: list[Optional[float]]
+
+
+class CumulativeMileage(BaseModel):
+    day_of_year: list[int]  # 1..366
+    series: list[CumulativeSeries]
@@ -0,0 +1,280 @@
+"""
+Synthetic activity files (FIT, GPX, TCX) for benchmarks and load tests.
+
+A track is a list of Point (1 Hz samples, or sparser). It comes either
+from a random walk of any length (synthetic_track, e.g. a 24 h ultra) or
+from a real FIT file (points_from_fit), optionally repeated end to end to
+make it longer (tile). The writers emit what the importers in
+app/api/runs.py read: FIT record/lap/session messages with a valid CRC,
+GPX trkpts with elevation and time, TCX trackpoints with HR plus a lap
+distance; to_streams gives the Strava streams the sync consumes.
+
+Not a full FIT SDK: single-sport running activities only.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import math
+import random
+import struct
+from typing import NamedTuple
+
+from app.core.constants import MILE_M
+from app.core.geo import haversine
+
+
+class Point(NamedTuple):
+    time: dt.datetime  # UTC, tz-aware
+    lat: float
+    lon: float
+    ele: float
+    hr: int
+    speed: float  # m/s
+
+
+def synthetic_track(
+    seconds: int,
+    seed: int = 1,
+    start: dt.datetime | None = None,
+    pace_s_per_mi: float = 540.0,
+    step: int = 1,
+) -> list[Point]:
+    """A run of `seconds` around `pace_s_per_mi`, with pace drift, short
+    stops, rolling elevation and heart rate that follows effort. One point
+    every `step` seconds (1 = the 1 Hz a watch records)."""
+    rng = random.Random(seed)
+    start = start or dt.datetime(2025, 6, 1, 6, 0, tzinfo=dt.timezone.utc)
+    base_speed = MILE_M / pace_s_per_mi
+    lat, lon = 40.0 + rng.uniform(-1, 1), -75.0 + rng.uniform(-1, 1)
+    heading = rng.uniform(0, 2 * math.pi)
+    ele = rng.uniform(0, 500)
+    hr = 100.0
+    hr_follow = min(1.0, 0.02 * step)
+    stopped_until = -1
+    points = []
+    for t in range(0, seconds, step):
+        if t > stopped_until and rng.random() < step / 1800:
+            stopped_until = t + rng.randint(10, 90)  # traffic light, aid station
+        if t <= stopped_until:
+            speed = 0.0
+        else:
+            # Slower as the hours go by, with a gentle surge/fade cycle
+            fatigue = 1.0 - min(0.35, t / 86400 * 0.35)
+            speed = max(0.8, base_speed * fatigue * (1 + 0.06 * math.sin(t / 240)) + rng.gauss(0, 0.08))
+        heading += rng.gauss(0, 0.03)
+        lat += speed * step * math.cos(heading) / 111_320
+        lon += speed * step * math.sin(heading) / (111_320 * math.cos(math.radians(lat)))
+        ele += (0.4 * math.sin(t / 300) + rng.gauss(0, 0.05)) * step
+        target_hr = 95 + 70 * speed / base_speed if speed else 100
+        hr += (target_hr - hr) * hr_follow + rng.gauss(0, 0.4)
+        points.append(Point(start + dt.timedelta(seconds=t), lat, lon, round(ele, 1), int(hr), round(speed, 3)))
+    return points
+
+
+def points_from_fit(path: str) -> list[Point]:
+    """The GPS records of a real FIT file."""
+    from fitparse import FitFile
+
+    semicircle = 180 / 2**31
+    points = []
+    for record in FitFile(path).get_messages("record"):
+        f = {field.name: field.value for field in record}
+        if f.get("position_lat") is None or f.get("position_long") is None or f.get("timestamp") is None:
+            continue
+        ele = f.get("enhanced_altitude", f.get("altitude"))
+        speed = f.get("enhanced_speed", f.get("speed"))
+        points.append(Point(
+            f["timestamp"].replace(tzinfo=dt.timezone.utc),
+            f["position_lat"] * semicircle,
+            f["position_long"] * semicircle,
+            float(ele) if ele is not None else 0.0,
+            int(f.get("heart_rate") or 0),
+            float(speed) if speed is not None else 0.0,
+        ))
+    return points
+
+
+def tile(points: list[Point], factor: int) -> list[Point]:
+    """Repeat the track `factor` times; each copy starts where and when
+    the previous one ended, so distance and duration scale too."""
+    if factor <= 1 or not points:
+        return list(points)
+    first, last = points[0], points[-1]
+    span = last.time - first.time + dt.timedelta(seconds=1)
+    dlat, dlon = last.lat - first.lat, last.lon - first.lon
+    out = []
+    for k in range(factor):
+        shift = span * k
+        out.extend(
+            p._replace(time=p.time + shift, lat=p.lat + dlat * k, lon=p.lon + dlon * k)
+            for p in points
+        )
+    return out
+
+
+def to_streams(points: list[Point]) -> dict:
+    """The track as Strava `key_by_type` streams (what build_stream_outputs
+    and the Strava sync consume)."""
+    t0 = points[0].time if points else None
+    return {
+        "time": {"data": [int((p.time - t0).total_seconds()) for p in points]},
+        "latlng": {"data": [[p.lat, p.lon] for p in points]},
+        "altitude": {"data": [p.ele for p in points]},
+        "heartrate": {"data": [p.hr for p in points]},
+        "velocity_smooth": {"data": [p.speed for p in points]},
+    }
+
+
+def _iso(t: dt.datetime) -> str:
+    return t.astimezone(dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _distances(points: list[Point]) -> list[float]:
+    """Cumulative metres at each point."""
+    total = 0.0
+    out = []
+    prev = None
+    for p in points:
+        if prev is not None:
+            total += haversine(prev.lat, prev.lon, p.lat, p.lon)
+        out.append(total)
+        prev = p
+    return out
+
+
+def distance_m(points: list[Point]) -> float:
+    """Length of the track in metres."""
+    return _distances(points)[-1] if points else 0.0
+
+
+def to_gpx(points: list[Point], name: str = "Synthetic run") -> bytes:
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<gpx creator="runner synthetic" version="1.1" xmlns="http://www.topografix.com/GPX/1/1"'
+        ' xmlns:ns3="http://www.garmin.com/xmlschemas/TrackPointExtension/v1">',
+        f"  <metadata><time>{_iso(points[0].time) if points else ''}</time></metadata>",
+        f"  <trk><name>{name}</name><type>running</type><trkseg>",
+    ]
+    for p in points:
+        lines.append(
+            f'    <trkpt lat="{p.lat:.7f}" lon="{p.lon:.7f}"><ele>{p.ele:.1f}</ele><time>{_iso(p.time)}</time>'
+            f"<extensions><ns3:TrackPointExtension><ns3:hr>{p.hr}</ns3:hr></ns3:TrackPointExtension></extensions>"
+            "</trkpt>"
+        )
+    lines.append("  </trkseg></trk>")
+    lines.append("</gpx>")
+    return "\n".join(lines).encode("utf-8")
+
+
+def to_tcx(points: list[Point]) -> bytes:
+    distances = _distances(points)
+    start = _iso(points[0].time) if points else ""
+    total_s = (points[-1].time - points[0].time).total_seconds() if points else 0
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<TrainingCenterDatabase xmlns="http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2">',
+        '  <Activities><Activity Sport="Running">',
+        f"    <Id>{start}</Id>",
+        f'    <Lap StartTime="{start}">',
+        f"      <TotalTimeSeconds>{total_s:.0f}</TotalTimeSeconds>",
+        f"      <DistanceMeters>{distances[-1] if distances else 0:.1f}</DistanceMeters>",
+        "      <Track>",
+    ]
+    for p, d in zip(points, distances):
+        lines.append(
+            f"        <Trackpoint><Time>{_iso(p.time)}</Time>"
+            f"<Position><LatitudeDegrees>{p.lat:.7f}</LatitudeDegrees><LongitudeDegrees>{p.lon:.7f}</LongitudeDegrees></Position>"
+            f"<AltitudeMeters>{p.ele:.1f}</AltitudeMeters><DistanceMeters>{d:.1f}</DistanceMeters>"
+            f"<HeartRateBpm><Value>{p.hr}</Value></HeartRateBpm></Trackpoint>"
+        )
+    lines += ["      </Track>", "    </Lap>", "  </Activity></Activities>", "</TrainingCenterDatabase>"]
+    return "\n".join(lines).encode("utf-8")
+
+
+# --- FIT ----------------------------------------------------------------------
+# Little-endian definition + data messages, one local type per message kind.
+
+_FIT_EPOCH = 631065600  # 1989-12-31T00:00:00Z in Unix seconds
+_CRC_TABLE = (
+    0x0000, 0xCC01, 0xD801, 0x1400, 0xF001, 0x3C00, 0x2800, 0xE401,
+    0xA001, 0x6C00, 0x7800, 0xB401, 0x5000, 0x9C01, 0x8801, 0x4400,
+)
+# (field number, struct format, FIT base type)
+_ENUM, _UINT8, _UINT16, _SINT32, _UINT32 = ("B", 0x00), ("B", 0x02), ("H", 0x84), ("i", 0x85), ("I", 0x86)
+_MESSAGES = {
+    # global number: fields
+    0: [(0, _ENUM), (1, _UINT16), (4, _UINT32)],  # file_id: type, manufacturer, time_created
+    20: [(253, _UINT32), (0, _SINT32), (1, _SINT32), (78, _UINT32), (3, _UINT8), (5, _UINT32), (73, _UINT32)],
+    # lap/session: timestamp, start_time, total_elapsed_time, total_timer_time, total_distance, avg/max HR
+    19: [(253, _UINT32), (2, _UINT32), (7, _UINT32), (8, _UINT32), (9, _UINT32), (15, _UINT8), (16, _UINT8)],
+    18: [(253, _UINT32), (2, _UINT32), (7, _UINT32), (8, _UINT32), (9, _UINT32), (5, _ENUM)],
+}
+_LOCAL = {0: 0, 20: 1, 19: 2, 18: 3}
+
+
+def _crc(data: bytes, crc: int = 0) -> int:
+    table = _CRC_TABLE
+    for byte in data:
+        tmp = table[crc & 0xF]
+        crc = ((crc >> 4) & 0x0FFF) ^ tmp ^ table[byte & 0xF]
+        tmp = table[crc & 0xF]
+        crc = ((crc >> 4) & 0x0FFF) ^ tmp ^ table[(byte >> 4) & 0xF]
+    return crc
+
+
+def _fit_time(t: dt.datetime) -> int:
+    return int(t.timestamp()) - _FIT_EPOCH
+
+
+def to_fit(points: list[Point], laps: bool = True) -> bytes:
+    """A running activity: records, 1-mile auto laps (unless laps=False,
+    which makes the importer compute splits itself) and a session."""
+    structs = {num: struct.Struct("<B" + "".join(f[1][0] for f in fields)) for num, fields in _MESSAGES.items()}
+    body = bytearray()
+    for num, fields in _MESSAGES.items():
+        body += struct.pack("<BBBHB", 0x40 | _LOCAL[num], 0, 0, num, len(fields))
+        for field_num, (fmt, base_type) in fields:
+            body += struct.pack("<BBB", field_num, struct.calcsize(fmt), base_type)
+
+    def emit(num, *values):
+        body.extend(structs[num].pack(_LOCAL[num], *values))
+
+    start = points[0].time if points else dt.datetime.now(dt.timezone.utc)
+    emit(0, 4, 255, _fit_time(start))  # activity file, "development" manufacturer
+    distances = _distances(points)
+    semicircles = 2**31 / 180
+    lap_start, lap_start_m, lap_hr = 0, 0.0, []
+    moving_s = 0
+
+    def close_lap(i_end):
+        a, b = points[lap_start], points[i_end]
+        elapsed = (b.time - a.time).total_seconds() + 1
+        emit(19, _fit_time(b.time), _fit_time(a.time), int(elapsed * 1000), int(lap_moving * 1000),
+             int((distances[i_end] - lap_start_m) * 100),
+             int(sum(lap_hr) / len(lap_hr)) if lap_hr else 0xFF, max(lap_hr) if lap_hr else 0xFF)
+
+    lap_moving = 0
+    for i, (p, d) in enumerate(zip(points, distances)):
+        emit(
+            20, _fit_time(p.time), int(p.lat * semicircles), int(p.lon * semicircles),
+            int((p.ele + 500) * 5), min(p.hr, 254), int(d * 100), int(p.speed * 1000),
+        )
+        if p.speed > 0:
+            moving_s += 1
+            lap_moving += 1
+        lap_hr.append(min(p.hr, 254))
+        if laps and d - lap_start_m >= MILE_M:
+            close_lap(i)
+            lap_start, lap_start_m, lap_hr, lap_moving = i + 1, d, [], 0
+    if laps and points and lap_start < len(points):
+        close_lap(len(points) - 1)
+    if points:
+        elapsed = (points[-1].time - start).total_seconds() + 1
+        emit(18, _fit_time(points[-1].time), _fit_time(start), int(elapsed * 1000), moving_s * 1000,
+             int(distances[-1] * 100), 1)  # sport: running
+
+    header = struct.pack("<BBHI4s", 14, 0x20, 2132, len(body), b".FIT")
+    header += struct.pack("<H", _crc(header))
+    data = header + bytes(body)
+    return data + struct.pack("<H", _crc(data))
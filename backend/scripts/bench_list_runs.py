@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark GET /runs/ serialization: legacy ORM + RunRead path vs fast path.
+
+Seeds N runs into a throwaway SQLite database (or --database-url), then
+times full requests through the ASGI app for:
+  - legacy: ORM objects -> RunRead per row -> response_model re-validation
+            (what list_runs did before the fast path; reproduced here)
+  - fast:   column tuples -> one-pass dicts -> ORJSONResponse (current)
+
+Usage (from backend/):
+  python scripts/bench_list_runs.py --rows 10000 --repeat 20
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark GET /runs/ serialization")
+    ap.add_argument("--rows", type=int, default=10000)
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--database-url", help="Defaults to a temporary SQLite file")
+    args = ap.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url or (
+        f"sqlite+pysqlite:///{os.path.join(tempfile.mkdtemp(prefix='runner-bench-'), 'bench.db')}"
+    )
+
+    import datetime as dt
+    import random
+    from typing import Optional
+
+    from fastapi import Depends, Query
+    from fastapi.testclient import TestClient
+    from sqlalchemy import insert
+    from sqlalchemy.orm import Session
+
+    from app.core.time_utils import compute_pace, seconds_to_hhmmss, time_to_hhmm
+    from app.db import SessionLocal, create_tables, get_read_db
+    from app.main import app
+    from app.models.run import Run
+    from app.schemas.run import RunRead
+
+    @app.get("/bench/legacy_runs", response_model=list[RunRead])
+    def legacy_list_runs(
+        start_date: Optional[dt.date] = Query(None),
+        end_date: Optional[dt.date] = Query(None),
+        db: Session = Depends(get_read_db),
+    ):
+        query = db.query(Run)
+        if start_date is not None:
+            query = query.filter(Run.date >= start_date)
+        if end_date is not None:
+            query = query.filter(Run.date <= end_date)
+        results = []
+        for run in query.order_by(Run.date.desc()).all():
+            results.append(RunRead(
+                id=run.id,
+                date=run.date,
+                start_time=time_to_hhmm(run.start_time),
+                title=run.title,
+                notes=run.notes,
+                distance_mi=float(run.distance_mi),
+                duration=seconds_to_hhmmss(run.duration_seconds),
+                run_type=run.run_type,
+                source=run.source,
+                pace=compute_pace(run.duration_seconds, float(run.distance_mi)),
+            ))
+        return results
+
+    # Seed a dedicated date range so an existing database is left alone
+    base = dt.date(1990, 1, 1)
+    rng = random.Random(42)
+    rows = [
+        {
+            "date": base + dt.timedelta(days=i // 2),
+            "title": f"Bench run {i}",
+            "notes": "bench" if i % 3 else None,
+            "distance_mi": round(rng.uniform(3, 20), 2),
+            "duration_seconds": rng.randint(1200, 10000),
+            "run_type": rng.choice(["easy", "workout", "long", "race"]),
+            "start_time": dt.time(rng.randint(5, 19), rng.randint(0, 59)),
+        }
+        for i in range(args.rows)
+    ]
+    create_tables()
+    db = SessionLocal()
+    try:
+        db.query(Run).filter(Run.date < dt.date(2000, 1, 1)).delete()
+        db.execute(insert(Run), rows)
+        db.commit()
+    finally:
+        db.close()
+
+    params = {"start_date": base.isoformat(), "end_date": "1999-12-31"}
+    client = TestClient(app)
+
+    def timed(path):
+        client.get(path, params=params)  # warm-up
+        samples = []
+        size = 0
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            r = client.get(path, params=params)
+            samples.append((time.perf_counter() - t0) * 1000.0)
+            r.raise_for_status()
+            size = len(r.content)
+        return samples, size
+
+    legacy, legacy_size = timed("/bench/legacy_runs")
+    fast, fast_size = timed("/runs/")
+
+    print(f"GET /runs/ with {args.rows} rows, {args.repeat} requests each")
+    print(f"{'path':<8} {'median ms':>10} {'p95 ms':>10} {'min ms':>10} {'bytes':>10}")
+    for label, samples, size in (("legacy", legacy, legacy_size), ("fast", fast, fast_size)):
+        p95 = sorted(samples)[max(0, int(round(0.95 * (len(samples) - 1))))]
+        print(f"{label:<8} {statistics.median(samples):>10.1f} {p95:>10.1f} {min(samples):>10.1f} {size:>10d}")
+    print(f"\nspeedup (median): {statistics.median(legacy) / statistics.median(fast):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
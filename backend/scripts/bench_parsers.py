@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the activity parsers and the loops behind them.
+
+Times, per input file:
+  - _gpx_basic_stats / _fit_basic_stats / _tcx_basic_stats
+  - _process_gpx_file / _process_fit_file / _process_tcx_file (parse, the
+    per-mile split and distance-sample loops, and the DB writes, against
+    a throwaway SQLite database)
+and on their own:
+  - geo.haversine, the per-point distance call
+  - build_stream_outputs, the split/sample loops of a Strava import
+
+Inputs are the sample files under uploads/runs/ plus synthetic versions
+scaled up from the sample FIT track (--scales 1,4 = one and four laps of
+it, written as FIT, GPX and TCX by scripts/activity_files.py). Without the
+samples a synthetic 2 h track stands in.
+
+Each case runs once to warm up, then --repeat times; the median is what
+gets compared. Results can be saved as JSON and compared against a stored
+baseline, flagging cases slower than --threshold (exit status 1), so a
+change to a parser can be checked before it ships:
+
+Usage (from backend/):
+  python scripts/bench_parsers.py --save-baseline           # on main
+  python scripts/bench_parsers.py --compare                 # on your branch
+  python scripts/bench_parsers.py --output results.json --scales 1,4,12 --filter fit
+"""
+
+import argparse
+import datetime as dt
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+SAMPLE_DIR = os.path.join(BACKEND_DIR, "uploads", "runs")
+DEFAULT_BASELINE = os.path.join(BACKEND_DIR, "scripts", "bench_parsers_baseline.json")
+HAVERSINE_CALLS = 100_000
+
+
+def find_samples() -> dict[str, str]:
+    """First sample file per format under uploads/runs/."""
+    found: dict[str, str] = {}
+    if os.path.isdir(SAMPLE_DIR):
+        for root, _dirs, files in sorted(os.walk(SAMPLE_DIR)):
+            for name in sorted(files):
+                ext = name.rsplit(".", 1)[-1].lower()
+                if ext in ("gpx", "fit", "tcx") and ext not in found:
+                    found[ext] = os.path.join(root, name)
+    return found
+
+
+def count_xml_points(fmt: str, path: str) -> int:
+    with open(path, "rb") as f:
+        return f.read().count(b"<trkpt " if fmt == "gpx" else b"<Trackpoint>")
+
+
+def time_case(fn, repeat: int) -> dict:
+    fn()  # warm-up: imports, caches, first-touch of the file
+    timings = []
+    gc.collect()
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - t0) * 1000.0)
+    return {
+        "repeat": repeat,
+        "min_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+    }
+
+
+def build_cases(args, workdir: str) -> list[tuple[str, int, object]]:
+    """(name, points, callable) for every benchmark."""
+    from app.api import runs as runs_api
+    from app.core.geo import haversine
+    from app.core.strava_streams import build_stream_outputs
+    from app.db import SessionLocal
+    from app.models.run import Run
+    from scripts.activity_files import points_from_fit, synthetic_track, tile, to_fit, to_gpx, to_streams, to_tcx
+
+    samples = find_samples()
+    seed = points_from_fit(samples["fit"]) if "fit" in samples else synthetic_track(7200)
+
+    db = SessionLocal()
+    run = Run(date=dt.date(2025, 1, 1), title="bench", distance_mi=0.0, duration_seconds=0, run_type="easy")
+    db.add(run)
+    db.commit()
+    run_id = run.id
+
+    parsers = {
+        "gpx": (runs_api._gpx_basic_stats, runs_api._process_gpx_file),
+        "fit": (runs_api._fit_basic_stats, runs_api._process_fit_file),
+        "tcx": (runs_api._tcx_basic_stats, runs_api._process_tcx_file),
+    }
+    writers = {"gpx": to_gpx, "fit": to_fit, "tcx": to_tcx}
+
+    inputs: list[tuple[str, str, str, int]] = []  # (format, label, path, points)
+    for fmt, path in samples.items():
+        inputs.append((fmt, "sample", path, len(seed) if fmt == "fit" else count_xml_points(fmt, path)))
+    for scale in args.scales:
+        track = tile(seed, scale)
+        for fmt, write in writers.items():
+            path = os.path.join(workdir, f"x{scale}.{fmt}")
+            with open(path, "wb") as f:
+                f.write(write(track))
+            inputs.append((fmt, f"x{scale}", path, len(track)))
+
+    cases: list[tuple[str, int, object]] = []
+    pairs = [(a.lat, a.lon, b.lat, b.lon) for a, b in zip(seed, seed[1:])]
+    pairs = (pairs * (HAVERSINE_CALLS // max(1, len(pairs)) + 1))[:HAVERSINE_CALLS]
+
+    def haversine_loop():
+        for p in pairs:
+            haversine(*p)
+
+    cases.append(("haversine", len(pairs), haversine_loop))
+
+    for scale in args.scales:
+        track = tile(seed, scale)
+        streams = to_streams(track)
+        cases.append((f"stream_outputs[x{scale}]", len(track), lambda s=streams: build_stream_outputs(s)))
+
+    for fmt, label, path, points in inputs:
+        basic, process = parsers[fmt]
+        cases.append((f"{fmt}_basic_stats[{label}]", points, lambda b=basic, p=path: b(p)))
+        cases.append((f"process_{fmt}_file[{label}]", points, lambda pr=process, p=path: pr(db, run_id, p)))
+    return cases
+
+
+def run_benchmarks(args) -> dict:
+    workdir = tempfile.mkdtemp(prefix="runner-bench-parsers-")
+    os.environ["DATABASE_URL"] = f"sqlite+pysqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["UPLOADS_DIR"] = os.path.join(workdir, "uploads")
+    from app.db import create_tables
+
+    create_tables()
+
+    results = {}
+    for name, points, fn in build_cases(args, workdir):
+        if args.filter and args.filter not in name:
+            continue
+        res = time_case(fn, args.repeat)
+        res["points"] = points
+        if points:
+            res["points_per_s"] = round(points / (res["median_ms"] / 1000.0))
+        results[name] = res
+        if not args.json:
+            print(f"{name:<32} {res['median_ms']:>11.2f} {res['min_ms']:>11.2f} {points or 0:>9d}", flush=True)
+    return {"meta": run_meta(args), "results": results}
+
+
+def run_meta(args) -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "created": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}",
+        "repeat": args.repeat,
+        "scales": args.scales,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Print current vs baseline medians; names of cases that regressed."""
+    regressed = []
+    print(f"\n{'case':<32} {'base ms':>11} {'now ms':>11} {'change':>8}")
+    for name, res in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<32} {'-':>11} {res['median_ms']:>11.2f} {'new':>8}")
+            continue
+        change = res["median_ms"] / base["median_ms"] - 1 if base["median_ms"] else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressed.append(name)
+        print(f"{name:<32} {base['median_ms']:>11.2f} {res['median_ms']:>11.2f} {change:>+8.1%}{flag}")
+    return regressed
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark the activity parsers")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--scales", type=lambda v: [int(x) for x in v.split(",")], default=[1, 4],
+                    help="Synthetic inputs as multiples of the sample track (default: 1,4)")
+    ap.add_argument("--filter", help="Only run cases whose name contains this")
+    ap.add_argument("--output", help="Write results JSON here")
+    ap.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON (default: %(default)s)")
+    ap.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    ap.add_argument("--compare", action="store_true", help="Compare against the baseline; exit 1 on regressions")
+    ap.add_argument("--threshold", type=float, default=0.2, help="Slowdown flagged as a regression (default: 0.2 = 20%%)")
+    ap.add_argument("--json", action="store_true", help="Print results JSON instead of the table")
+    args = ap.parse_args()
+
+    if args.compare and not os.path.exists(args.baseline):
+        ap.error(f"no baseline at {args.baseline}; create one with --save-baseline")
+
+    if not args.json:
+        print(f"{'case':<32} {'median ms':>11} {'min ms':>11} {'points':>9}")
+    current = run_benchmarks(args)
+
+    if args.json:
+        print(json.dumps(current, indent=2))
+    for path in filter(None, [args.output, args.baseline if args.save_baseline else None]):
+        with open(path, "w") as f:
+            json.dump(current, f, indent=2)
+            f.write("\n")
+        if not args.json:
+            print(f"\nwrote {path}")
+
+    if args.compare:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\nbaseline: {baseline['meta'].get('commit')} ({baseline['meta'].get('created')}), "
+              f"threshold +{args.threshold:.0%}")
+        regressed = compare(current, baseline, args.threshold)
+        if regressed:
+            print(f"\n{len(regressed)} regression(s): {', '.join(regressed)}")
+            sys.exit(1)
+        print("\nno regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Benchmark POST /strava/sync against the local mock Strava.
+
+Starts scripts/mock_strava.py, then syncs the same N activities once per
+engine (legacy = the original sequential sync, async = the current one),
+each in a fresh subprocess with its own throwaway SQLite database, uploads
+dir and tokens file, so memory and query counts are not shared. Reports:
+  - activities/min   runs imported (with streams) per minute of wall time
+  - queries/activity SQL statements executed, per imported run
+  - peak RSS         max resident memory of the worker, and its growth
+                     over the app's import-time footprint
+  - Strava requests  as counted by the mock
+
+The mock's rate limit is lifted by default so the whole window syncs in
+one call; pass --limit 100,1000 to see how each engine stops early.
+
+Usage (from backend/):
+  python scripts/bench_strava_sync.py --activities 1000 --latency-ms 20
+  python scripts/bench_strava_sync.py --engines async --concurrency 16 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Mock activities end here; the sync window starts before the first one
+MOCK_END = "2025-01-01"
+
+
+def _rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_worker(args) -> dict:
+    """Sync once with one engine in this (fresh) process; returns the numbers."""
+    workdir = tempfile.mkdtemp(prefix="runner-bench-strava-")
+    tokens_path = os.path.join(workdir, "tokens.json")
+    with open(tokens_path, "w") as f:
+        json.dump({
+            "access_token": "bench",
+            "refresh_token": "bench",
+            "expires_at": int(time.time()) + 6 * 3600,
+            "athlete": {"id": 4242},
+        }, f)
+    os.environ.update({
+        "DATABASE_URL": f"sqlite+pysqlite:///{os.path.join(workdir, 'bench.db')}",
+        "UPLOADS_DIR": os.path.join(workdir, "uploads"),
+        "STRAVA_TOKENS_PATH": tokens_path,
+        "STRAVA_BASE_URL": args.base_url,
+    })
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+
+    from app.db import SessionLocal, create_tables, engine
+    from app.main import app
+    from app.models.run import Run
+    from app.models.run_track import RunTrack
+
+    queries = 0
+
+    def count(*_):
+        nonlocal queries
+        queries += 1
+
+    create_tables()
+    client = TestClient(app)
+    client.get("/health")
+    baseline_mb = _rss_mb()
+    event.listen(engine, "before_cursor_execute", count)
+
+    params = {"start_date": args.start_date, "end_date": MOCK_END, "engine": args.worker}
+    if args.worker == "async":
+        params["concurrency"] = args.concurrency
+    calls = 0
+    started = time.perf_counter()
+    # A rate-limited sync asks to be called again; keep going like the CronJob would
+    while True:
+        calls += 1
+        r = client.post("/strava/sync", params=params)
+        r.raise_for_status()
+        if "note" not in r.json() or calls >= args.max_calls:
+            break
+    elapsed = time.perf_counter() - started
+    event.remove(engine, "before_cursor_execute", count)
+
+    with SessionLocal() as db:
+        imported = db.query(Run).count()
+        with_streams = db.query(RunTrack).count()
+    return {
+        "engine": args.worker,
+        "imported": imported,
+        "with_streams": with_streams,
+        "sync_calls": calls,
+        "seconds": round(elapsed, 2),
+        "activities_per_min": round(imported / elapsed * 60, 1) if elapsed else 0.0,
+        "queries": queries,
+        "queries_per_activity": round(queries / imported, 1) if imported else 0.0,
+        "peak_rss_mb": round(_rss_mb(), 1),
+        "rss_growth_mb": round(_rss_mb() - baseline_mb, 1),
+    }
+
+
+def wait_ready(base_url: str, timeout_s: float = 30.0) -> None:
+    import httpx
+
+    deadline = time.time() + timeout_s
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{base_url}/_mock/stats", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.3)
+    raise RuntimeError(f"Mock Strava at {base_url} did not come up")
+
+
+def measure_engine(engine: str, base_url: str, args) -> dict:
+    import httpx
+
+    httpx.post(f"{base_url}/_mock/reset").raise_for_status()
+    cmd = [
+        sys.executable, os.path.abspath(__file__), "--worker", engine,
+        "--base-url", base_url, "--start-date", args.start_date,
+        "--concurrency", str(args.concurrency), "--max-calls", str(args.max_calls),
+    ]
+    out = subprocess.run(cmd, cwd=BACKEND_DIR, check=True, capture_output=True, text=True)
+    res = json.loads(out.stdout.strip().splitlines()[-1])
+    mock = httpx.get(f"{base_url}/_mock/stats").json()
+    res["strava_requests"] = mock["requests"]
+    res["throttled"] = mock["throttled"]
+    return res
+
+
+def print_row(res: dict) -> None:
+    print(
+        f"{res['engine']:<8} {res['imported']:>8d} {res['seconds']:>8.1f} {res['activities_per_min']:>10.1f} "
+        f"{res['queries_per_activity']:>9.1f} {res['peak_rss_mb']:>9.1f} {res['rss_growth_mb']:>9.1f} "
+        f"{res['strava_requests']:>8d}"
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark Strava sync engines against a local mock")
+    ap.add_argument("--activities", type=int, default=1000)
+    ap.add_argument("--engines", default="legacy,async", help="Comma-separated: legacy, async")
+    ap.add_argument("--concurrency", type=int, default=8, help="Stream downloads in flight (async engine)")
+    ap.add_argument("--latency-ms", type=float, default=20.0, help="Mock Strava response latency")
+    ap.add_argument("--limit", default="100000,1000000", help="Mock 15-minute,daily request limits")
+    ap.add_argument("--max-calls", type=int, default=50, help="Give up after this many rate-limited sync calls")
+    ap.add_argument("--port", type=int, default=8787)
+    ap.add_argument("--json", action="store_true", help="Print results as JSON instead of a table")
+    # Internal: run one engine in this process
+    ap.add_argument("--worker", choices=["legacy", "async"], help=argparse.SUPPRESS)
+    ap.add_argument("--base-url", help=argparse.SUPPRESS)
+    ap.add_argument("--start-date", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args)))
+        return
+
+    import datetime as dt
+
+    from scripts.mock_strava import SPACING_S
+
+    # A day of slack before the first activity (they start up to an hour late)
+    span = dt.timedelta(seconds=SPACING_S * args.activities) + dt.timedelta(days=1)
+    args.start_date = (dt.date.fromisoformat(MOCK_END) - span).isoformat()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    mock = subprocess.Popen(
+        [
+            sys.executable, os.path.join(BACKEND_DIR, "scripts", "mock_strava.py"),
+            "--port", str(args.port), "--activities", str(args.activities),
+            "--limit", args.limit, "--latency-ms", str(args.latency_ms),
+        ],
+        cwd=BACKEND_DIR,
+    )
+    results = []
+    try:
+        wait_ready(base_url)
+        if not args.json:
+            print(f"{'engine':<8} {'imported':>8} {'seconds':>8} {'act/min':>10} {'q/act':>9} "
+                  f"{'rss MB':>9} {'+rss MB':>9} {'requests':>8}")
+        for engine in [e.strip() for e in args.engines.split(",") if e.strip()]:
+            res = measure_engine(engine, base_url, args)
+            results.append(res)
+            if not args.json:
+                print_row(res)
+    finally:
+        mock.terminate()
+        mock.wait(timeout=10)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    by_engine = {r["engine"]: r for r in results}
+    if "legacy" in by_engine and "async" in by_engine and by_engine["legacy"]["activities_per_min"]:
+        legacy, current = by_engine["legacy"], by_engine["async"]
+        print(f"\nasync/legacy throughput: {current['activities_per_min'] / legacy['activities_per_min']:.2f}x")
+        if current["queries_per_activity"]:
+            print(f"legacy/async queries:    {legacy['queries_per_activity'] / current['queries_per_activity']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Generate a large, realistic training log for scale and load testing.
+
+Runs follow a weekly plan (easy days with doubles, a workout, a long run,
+a race every few months and a 24 h ultra once a year), going back from
+--end week by week until --runs exist. Weekly mileage cycles through
+build, peak and recovery blocks. Most runs carry GPS data like an import
+would: a synthetic track (scripts/activity_files.py) run through the same
+build_stream_outputs() as a Strava import, so track, splits and metrics
+(HR zones, distance series) have the real shapes and sizes. Weekly goals
+are set for every week.
+
+Rows go straight into DATABASE_URL (or --database-url) with multi-row
+INSERTs, in batches, with the derived-data caches invalidated as the bulk
+create endpoint does. Tracks are built in --workers processes. The
+database must already be migrated (`alembic upgrade head`); a throwaway
+SQLite file given with --database-url is created on the spot.
+
+Stored tracks keep one point every --track-step seconds (imports keep
+every point the device recorded, ~1 s), which keeps 100k runs to a few
+GB; --track-step 1 gives full-size rows.
+
+Independently, --files-dir writes FIT/GPX files of the given lengths for
+POST /runs/import (scripts/loadtest_flows.py uploads them).
+
+Usage (from backend/):
+  python scripts/generate_dataset.py --runs 100000
+  python scripts/generate_dataset.py --runs 5000 --database-url sqlite+pysqlite:///load.db
+  python scripts/generate_dataset.py --runs 0 --files-dir loadtest-files --file-hours 1,6,24
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import math
+import os
+import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from scripts.activity_files import distance_m, synthetic_track, to_fit, to_gpx, to_streams  # noqa: E402
+
+# (weekday, start hour, run_type, share of the weekly miles, easy-pace multiplier)
+WEEK_PLAN = [
+    (0, 6, "easy", 0.09, 1.0),
+    (1, 6, "easy", 0.10, 1.0),
+    (1, 18, "easy", 0.05, 1.04),  # double
+    (2, 6, "workout", 0.15, 0.85),
+    (3, 6, "easy", 0.10, 1.0),
+    (3, 18, "easy", 0.05, 1.04),
+    (4, 6, "easy", 0.08, 1.02),
+    (5, 7, "long", 0.26, 0.95),
+    (6, 8, "easy", 0.12, 1.03),
+]
+TITLES = {"easy": "Easy", "workout": "Tempo", "long": "Long Run", "race": "Race"}
+RACE_EVERY_WEEKS = 13
+ULTRA_EVERY_WEEKS = 52
+ULTRA_MILES = 100.0
+ULTRA_PACE_S = 830  # 100 mi in ~23 h
+BATCH = 500
+
+
+class RunSpec(NamedTuple):
+    date: dt.date
+    start_hour: int
+    run_type: str
+    title: str
+    miles: float
+    pace_s: float
+    gps: bool
+    seed: int
+
+
+def weekly_miles(week: int, rng: random.Random) -> float:
+    """Build 3 weeks, recover 1, on a 16-week cycle from 35 to 70 mi."""
+    cycle = week % 16
+    base = 35 + 35 * min(1.0, cycle / 12)
+    if cycle % 4 == 3:
+        base *= 0.75
+    return base * rng.uniform(0.92, 1.08)
+
+
+def plan_runs(count: int, end: dt.date, track_fraction: float, seed: int) -> list[RunSpec]:
+    rng = random.Random(seed)
+    easy_pace = 540.0
+    monday = end - dt.timedelta(days=end.weekday())
+    specs: list[RunSpec] = []
+    week = 0
+    while len(specs) < count:
+        week_start = monday - dt.timedelta(weeks=week)
+        total = weekly_miles(week, rng)
+        for dow, hour, run_type, share, pace_mult in WEEK_PLAN:
+            day = week_start + dt.timedelta(days=dow)
+            if day > end or len(specs) >= count:
+                continue
+            miles = max(1.0, total * share * rng.uniform(0.85, 1.15))
+            pace = easy_pace * pace_mult * rng.uniform(0.96, 1.04)
+            title = TITLES[run_type]
+            if run_type == "long" and week % ULTRA_EVERY_WEEKS == ULTRA_EVERY_WEEKS // 2:
+                run_type, title, miles, pace = "race", "100 Mile Ultra", ULTRA_MILES, ULTRA_PACE_S
+            elif run_type == "long" and week % RACE_EVERY_WEEKS == 0:
+                run_type, title, miles, pace = "race", "Half Marathon", 13.1, easy_pace * 0.8
+            specs.append(RunSpec(
+                date=day,
+                start_hour=hour,
+                run_type=run_type,
+                title=f"{title} {miles:.1f}mi",
+                miles=round(miles, 2),
+                pace_s=pace,
+                gps=rng.random() < track_fraction,
+                seed=rng.randrange(1 << 30),
+            ))
+        week += 1
+    return specs
+
+
+def build_run(spec: RunSpec, track_step: int) -> tuple[dict, dict | None]:
+    """(runs row, build_stream_outputs() result or None); runs in a worker."""
+    from app.core.strava_streams import build_stream_outputs
+
+    start = dt.datetime.combine(spec.date, dt.time(spec.start_hour), tzinfo=dt.timezone.utc)
+    seconds = int(spec.miles * spec.pace_s)
+    row = {
+        "date": spec.date,
+        "title": spec.title,
+        "notes": None,
+        "distance_mi": spec.miles,
+        "duration_seconds": seconds,
+        "run_type": spec.run_type,
+        "start_time": dt.time(spec.start_hour, 0),
+        "source": "manual",
+    }
+    if not spec.gps:
+        return row, None
+    points = synthetic_track(seconds, seed=spec.seed, start=start, pace_s_per_mi=spec.pace_s, step=track_step)
+    row["distance_mi"] = round(distance_m(points) / 1609.34, 2) if len(points) > 1 else spec.miles
+    row["source"] = "fit"
+    return row, build_stream_outputs(to_streams(points))
+
+
+def _build_batch(args: tuple[list[RunSpec], int]) -> list[tuple[dict, dict | None]]:
+    specs, track_step = args
+    return [build_run(spec, track_step) for spec in specs]
+
+
+def insert_batch(db, built: list[tuple[dict, dict | None]]) -> None:
+    from sqlalchemy import insert
+
+    from app.core.run_changes import notify_runs_changed
+    from app.models.run import Run
+    from app.models.run_metrics import RunMetrics
+    from app.models.run_split import RunSplit
+    from app.models.run_track import RunTrack
+
+    rows = [row for row, _ in built]
+    stmt = insert(Run).returning(Run.id, sort_by_parameter_order=True)
+    ids = db.execute(stmt, rows).scalars().all()
+
+    tracks, metrics, splits = [], [], []
+    for run_id, (_, outputs) in zip(ids, built):
+        if outputs is None:
+            continue
+        tracks.append({"run_id": run_id, **outputs["track"]})
+        metrics.append({"run_id": run_id, "avg_hr": None, "max_hr": None, "hr_zones": None, **outputs["metrics"]})
+        splits.extend(
+            {"run_id": run_id, "idx": s["idx"], "distance_mi": s["distance_mi"], "duration_sec": s["duration_sec"]}
+            for s in outputs["splits"]
+        )
+    for model, values in ((RunTrack, tracks), (RunMetrics, metrics), (RunSplit, splits)):
+        if values:
+            db.execute(insert(model), values)
+    # Core INSERT skips the ORM flush hook that normally does this
+    notify_runs_changed(db, sorted({r["date"] for r in rows}))
+    db.commit()
+
+
+def insert_goals(db, specs: list[RunSpec]) -> int:
+    from sqlalchemy import insert
+
+    from app.models.weekly_goal import WeeklyGoal
+
+    miles: dict[dt.date, float] = {}
+    for spec in specs:
+        monday = spec.date - dt.timedelta(days=spec.date.weekday())
+        miles[monday] = miles.get(monday, 0.0) + spec.miles
+    existing = {w for (w,) in db.query(WeeklyGoal.week_start)}
+    goals = [
+        {"week_start": week, "goal_miles": min(999.0, 5 * math.ceil(total / 5))}
+        for week, total in miles.items() if week not in existing
+    ]
+    for start in range(0, len(goals), BATCH):
+        db.execute(insert(WeeklyGoal), goals[start:start + BATCH])
+    db.commit()
+    return len(goals)
+
+
+def write_files(out_dir: str, hours: list[float], formats: list[str], seed: int) -> list[str]:
+    """One synthetic activity per (length, format); returns the paths."""
+    writers = {"fit": to_fit, "gpx": to_gpx}
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for i, h in enumerate(hours):
+        pace = 540.0 if h <= 3 else 720.0
+        points = synthetic_track(int(h * 3600), seed=seed + i, pace_s_per_mi=pace)
+        for fmt in formats:
+            path = os.path.join(out_dir, f"synthetic-{h:g}h.{fmt}")
+            with open(path, "wb") as f:
+                f.write(writers[fmt](points))
+            paths.append(path)
+            print(f"wrote {path} ({len(points)} points, {os.path.getsize(path) / 1e6:.1f} MB)", flush=True)
+    return paths
+
+
+def _insert_next(db, pending: deque) -> int:
+    built = pending.popleft().result()
+    insert_batch(db, built)
+    return len(built)
+
+
+def _progress(done: int, total: int, started: float) -> None:
+    print(f"  {done:>7d}/{total} runs  {done / (time.perf_counter() - started):7.0f} runs/s", flush=True)
+
+
+def generate_runs(args) -> None:
+    from app.db import SessionLocal, create_tables, engine
+
+    if engine.url.get_backend_name() == "sqlite":
+        create_tables()  # throwaway database; real ones come migrated
+    specs = plan_runs(args.runs, args.end, args.track_fraction, args.seed)
+    print(f"{len(specs)} runs from {specs[-1].date} to {specs[0].date}, "
+          f"{sum(s.gps for s in specs)} with tracks", flush=True)
+
+    chunks = [(specs[i:i + BATCH], args.track_step) for i in range(0, len(specs), BATCH)]
+    db = SessionLocal()
+    started = time.perf_counter()
+    done = 0
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            # A few batches ahead of the inserts, not all of them: built
+            # tracks are large and would pile up in memory
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(_build_batch, chunk))
+                if len(pending) > 2 * args.workers:
+                    done += _insert_next(db, pending)
+                    _progress(done, len(specs), started)
+            while pending:
+                done += _insert_next(db, pending)
+                _progress(done, len(specs), started)
+        if not args.no_goals:
+            print(f"{insert_goals(db, specs)} weekly goals", flush=True)
+    finally:
+        db.close()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Generate a large synthetic training log")
+    ap.add_argument("--runs", type=int, default=100_000)
+    ap.add_argument("--database-url", help="Defaults to DATABASE_URL")
+    ap.add_argument("--end", type=dt.date.fromisoformat, default=dt.date.today(), help="Last run date (default: today)")
+    ap.add_argument("--track-fraction", type=float, default=0.9, help="Share of runs with GPS data (default: 0.9)")
+    ap.add_argument("--track-step", type=int, default=5, help="Seconds between stored track points (default: 5)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--no-goals", action="store_true", help="Do not set weekly goals")
+    ap.add_argument("--files-dir", help="Also write synthetic FIT/GPX files here")
+    ap.add_argument("--file-hours", type=lambda v: [float(x) for x in v.split(",")], default=[1.0, 6.0, 24.0],
+                    help="Lengths of the files in hours (default: 1,6,24)")
+    ap.add_argument("--formats", type=lambda v: v.split(","), default=["fit", "gpx"])
+    args = ap.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    if args.files_dir:
+        write_files(args.files_dir, args.file_hours, args.formats, args.seed)
+    if args.runs > 0:
+        generate_runs(args)
+
+
+if __name__ == "__main__":
+    main()
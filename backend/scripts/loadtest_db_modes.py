@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Load test the read-heavy endpoints in sync vs async DB mode.
+
+Fires a mix of dashboard reads (run list, stats, weekly mileage, goals)
+with N concurrent clients and reports throughput and latency percentiles.
+
+Usage examples (from backend/):
+  - Against a running server:
+      python scripts/loadtest_db_modes.py --base-url http://localhost:8000 -c 200 -n 5000
+  - Compare both modes: starts uvicorn twice (DB_ASYNC=false, then true)
+    against the DATABASE_URL in your environment, seeding runs first:
+      python scripts/loadtest_db_modes.py --compare --seed 2000 -c 200 -n 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime as dt
+import os
+import random
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(sorted_vals: list[float], pct: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    k = min(len(sorted_vals) - 1, max(0, int(round(pct / 100.0 * (len(sorted_vals) - 1)))))
+    return sorted_vals[k]
+
+
+def request_mix() -> list[tuple[str, dict]]:
+    today = dt.date.today()
+    start = (today - dt.timedelta(weeks=12)).isoformat()
+    week = today - dt.timedelta(days=today.weekday())
+    return [
+        ("runs/", {"start_date": (week - dt.timedelta(days=7)).isoformat(), "end_date": today.isoformat()}),
+        ("runs/stats", {"start_date": start, "end_date": today.isoformat()}),
+        ("runs/weekly_mileage", {"weeks": 12}),
+        ("goals/weekly", {"start_date": start, "end_date": today.isoformat()}),
+    ]
+
+
+def seed(base_url: str, count: int) -> None:
+    today = dt.date.today()
+    runs = [
+        {
+            "date": (today - dt.timedelta(days=random.randint(0, 365))).isoformat(),
+            "title": f"Load test run {i}",
+            "notes": "loadtest",
+            "distance_mi": round(random.uniform(3, 14), 2),
+            "duration": f"{random.randint(0, 1):02d}:{random.randint(10, 59):02d}:00",
+            "run_type": random.choice(["easy", "easy", "workout", "long"]),
+        }
+        for i in range(count)
+    ]
+    with httpx.Client(base_url=base_url, timeout=120) as client:
+        for i in range(0, len(runs), 5000):
+            client.post("runs/bulk", json=runs[i:i + 5000]).raise_for_status()
+
+
+async def run_load(base_url: str, concurrency: int, total: int) -> dict:
+    mix = request_mix()
+    latencies: list[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+
+        async def worker() -> None:
+            nonlocal errors
+            for i in counter:
+                path, params = mix[i % len(mix)]
+                t0 = time.perf_counter()
+                try:
+                    r = await client.get(path, params=params)
+                    if r.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append((time.perf_counter() - t0) * 1000.0)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "rps": total / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+def wait_healthy(base_url: str, timeout_s: float = 30.0) -> None:
+    deadline = time.time() + timeout_s
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.3)
+    raise RuntimeError(f"Server at {base_url} did not become healthy")
+
+
+def measure_mode(db_async: bool, port: int, args) -> dict:
+    env = dict(os.environ, DB_ASYNC="true" if db_async else "false")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_healthy(base_url)
+        asyncio.run(run_load(base_url, args.concurrency, min(200, args.requests)))  # warm-up
+        return asyncio.run(run_load(base_url, args.concurrency, args.requests))
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def print_row(label: str, res: dict) -> None:
+    print(
+        f"{label:<8} {res['rps']:>9.1f} {res['p50_ms']:>9.1f} {res['p95_ms']:>9.1f} "
+        f"{res['p99_ms']:>9.1f} {res['errors']:>7d}"
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Load test read endpoints in sync vs async DB mode")
+    ap.add_argument("--base-url", help="Hit an already running server instead of spawning one")
+    ap.add_argument("--compare", action="store_true", help="Spawn uvicorn in sync then async mode and compare")
+    ap.add_argument("-c", "--concurrency", type=int, default=100)
+    ap.add_argument("-n", "--requests", type=int, default=2000)
+    ap.add_argument("--seed", type=int, default=0, help="Bulk-create N random runs before measuring")
+    ap.add_argument("--port", type=int, default=8765)
+    args = ap.parse_args()
+
+    if not args.base_url and not args.compare:
+        ap.error("pass --base-url or --compare")
+
+    print(f"{'mode':<8} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    if args.base_url:
+        base_url = args.base_url.rstrip("/")
+        if args.seed:
+            seed(base_url, args.seed)
+        print_row("server", asyncio.run(run_load(base_url, args.concurrency, args.requests)))
+        return
+
+    results = {}
+    for db_async in (False, True):
+        if args.seed and not db_async:
+            env_url = f"http://127.0.0.1:{args.port}"
+            proc = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+                cwd=BACKEND_DIR,
+            )
+            try:
+                wait_healthy(env_url)
+                seed(env_url, args.seed)
+            finally:
+                proc.terminate()
+                proc.wait(timeout=10)
+        label = "async" if db_async else "sync"
+        results[label] = measure_mode(db_async, args.port, args)
+        print_row(label, results[label])
+
+    sync_res, async_res = results["sync"], results["async"]
+    if sync_res["rps"]:
+        print(f"\nasync/sync throughput: {async_res['rps'] / sync_res['rps']:.2f}x")
+    if async_res["p99_ms"]:
+        print(f"sync/async p99:        {sync_res['p99_ms'] / async_res['p99_ms']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
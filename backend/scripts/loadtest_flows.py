@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Load test the API with the request sequences the frontend makes.
+
+N virtual users each loop over weighted user flows until --duration runs
+out, optionally pausing --think-ms between steps:
+
+  dashboard  GET /runs/weekly_mileage?weeks=52, this week's GET /runs/,
+             GET /goals/{monday}                 (the landing page)
+  log        a random week's GET /runs/ and goal, POST /runs/ (log a
+             manual run), then the week again    (the training log)
+  detail     GET /runs/{id}/detail for a run from the data set
+  import     POST /runs/import of a FIT/GPX file, then its detail
+
+Runs for the log and detail flows are picked from the whole date range
+of the database, so point it at a large one (scripts/generate_dataset.py)
+to see how the app behaves at that size. Import uploads the files in
+--files-dir (e.g. the 24 h ones from generate_dataset.py --files-dir),
+or a generated 1 h FIT and GPX; processing continues in the background
+after the response, so watch GET /metrics (runner_background_jobs) too.
+The log and import flows write: use a throwaway copy of the data.
+GET /runs/weekly_mileage needs Postgres (date_trunc); against SQLite it
+fails and uvicorn drops the connection, so leave out the dashboard flow.
+
+Reports throughput and latency percentiles per flow and per request
+(route template), plus the error count.
+
+Usage (from backend/):
+  python scripts/loadtest_flows.py --base-url http://localhost:8000 -c 20 --duration 60
+  python scripts/loadtest_flows.py --base-url http://localhost:8000 --weights dashboard=1,detail=1 --json
+  python scripts/loadtest_flows.py --base-url http://localhost:8000 --files-dir loadtest-files -c 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime as dt
+import glob
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from scripts.loadtest_db_modes import percentile  # noqa: E402
+
+DEFAULT_WEIGHTS = {"dashboard": 50, "log": 25, "detail": 20, "import": 5}
+# Weeks sampled up front to find run ids for the detail flow
+SAMPLE_WEEKS = 40
+
+
+def monday(d: dt.date) -> dt.date:
+    return d - dt.timedelta(days=d.weekday())
+
+
+class Stats:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        # "GET /runs/ (week): 500" -> count, for the report
+        self.error_kinds: dict[str, int] = defaultdict(int)
+
+    def add(self, name: str, ms: float, ok: bool, kind: str | None = None) -> None:
+        self.latencies[name].append(ms)
+        if not ok:
+            self.errors[name] += 1
+            if kind:
+                self.error_kinds[f"{name}: {kind}"] += 1
+
+    def summary(self, elapsed_s: float) -> dict:
+        out = {}
+        for name, vals in sorted(self.latencies.items()):
+            vals = sorted(vals)
+            out[name] = {
+                "count": len(vals),
+                "per_s": round(len(vals) / elapsed_s, 2) if elapsed_s else 0.0,
+                "p50_ms": round(percentile(vals, 50), 1),
+                "p95_ms": round(percentile(vals, 95), 1),
+                "p99_ms": round(percentile(vals, 99), 1),
+                "max_ms": round(vals[-1], 1),
+                "errors": self.errors.get(name, 0),
+            }
+        return out
+
+
+class Session:
+    """One virtual user: an HTTP client plus what it knows about the data."""
+
+    def __init__(self, client: httpx.AsyncClient, stats: Stats, dataset: dict, files: list[tuple[str, bytes]],
+                 think_s: float, rng: random.Random):
+        self.client = client
+        self.stats = stats
+        self.dataset = dataset
+        self.files = files
+        self.think_s = think_s
+        self.rng = rng
+
+    async def call(self, name: str, method: str, url: str, ok=(200,), **kwargs) -> httpx.Response | None:
+        t0 = time.perf_counter()
+        try:
+            r = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.stats.add(name, (time.perf_counter() - t0) * 1000.0, False, type(e).__name__)
+            return None
+        self.stats.add(name, (time.perf_counter() - t0) * 1000.0, r.status_code in ok, str(r.status_code))
+        if self.think_s:
+            await asyncio.sleep(self.rng.uniform(0.5, 1.5) * self.think_s)
+        return r
+
+    async def week(self, start: dt.date) -> None:
+        await self.call("GET /runs/ (week)", "GET", "/runs/", params={
+            "start_date": start.isoformat(), "end_date": (start + dt.timedelta(days=6)).isoformat(),
+        })
+
+    async def dashboard(self) -> bool:
+        this_week = monday(dt.date.today())
+        r = await self.call("GET /runs/weekly_mileage", "GET", "/runs/weekly_mileage", params={"weeks": 52})
+        await self.week(this_week)
+        await self.call("GET /goals/{week_start}", "GET", f"/goals/{this_week}", ok=(200, 404))
+        return r is not None and r.status_code == 200
+
+    async def log(self) -> bool:
+        first, last = self.dataset["first"], self.dataset["last"]
+        start = monday(first + dt.timedelta(days=self.rng.randint(0, max(0, (last - first).days))))
+        await self.week(start)
+        await self.call("GET /goals/{week_start}", "GET", f"/goals/{start}", ok=(200, 404))
+        miles = round(self.rng.uniform(3, 12), 2)
+        r = await self.call("POST /runs/", "POST", "/runs/", json={
+            "date": (start + dt.timedelta(days=self.rng.randint(0, 6))).isoformat(),
+            "title": f"Load test {miles}mi",
+            "distance_mi": miles,
+            "duration": str(dt.timedelta(seconds=int(miles * self.rng.uniform(420, 600)))).zfill(8),
+            "run_type": "easy",
+        })
+        await self.week(start)
+        return r is not None and r.status_code == 200
+
+    async def detail(self) -> bool:
+        if not self.dataset["run_ids"]:
+            return False
+        run_id = self.rng.choice(self.dataset["run_ids"])
+        r = await self.call("GET /runs/{run_id}/detail", "GET", f"/runs/{run_id}/detail")
+        return r is not None and r.status_code == 200
+
+    async def import_(self) -> bool:
+        name, data = self.rng.choice(self.files)
+        ext = os.path.splitext(name)[1]
+        r = await self.call("POST /runs/import", "POST", "/runs/import", files={
+            "file": (f"loadtest-{uuid.uuid4().hex[:12]}{ext}", data, "application/octet-stream"),
+        })
+        if r is None or r.status_code != 200:
+            return False
+        await self.call("GET /runs/{run_id}/detail", "GET", f"/runs/{r.json()['id']}/detail")
+        return True
+
+
+async def discover(client: httpx.AsyncClient, rng: random.Random) -> dict:
+    """Date range of the data and a sample of run ids across it."""
+    newest = (await client.get("/runs/", params={"limit": 1})).json()
+    oldest = (await client.get("/runs/", params={"limit": 1, "sort": "date"})).json()
+    today = dt.date.today()
+    first = dt.date.fromisoformat(oldest[0]["date"]) if oldest else today
+    last = dt.date.fromisoformat(newest[0]["date"]) if newest else today
+    run_ids: list[int] = []
+    span = max(0, (last - first).days)
+    for _ in range(SAMPLE_WEEKS if span else 1):
+        start = first + dt.timedelta(days=rng.randint(0, span))
+        r = await client.get("/runs/", params={
+            "start_date": start.isoformat(), "end_date": (start + dt.timedelta(days=6)).isoformat(),
+        })
+        run_ids.extend(run["id"] for run in r.json())
+    return {"first": first, "last": last, "run_ids": run_ids}
+
+
+def load_files(files_dir: str | None) -> list[tuple[str, bytes]]:
+    paths = sorted(glob.glob(os.path.join(files_dir, "*.fit")) + glob.glob(os.path.join(files_dir, "*.gpx"))) \
+        if files_dir else []
+    if paths:
+        files = []
+        for path in paths:
+            with open(path, "rb") as f:
+                files.append((os.path.basename(path), f.read()))
+        return files
+    from scripts.activity_files import synthetic_track, to_fit, to_gpx
+
+    points = synthetic_track(3600)
+    return [("synthetic-1h.fit", to_fit(points)), ("synthetic-1h.gpx", to_gpx(points))]
+
+
+async def run_load(args, weights: dict[str, int]) -> dict:
+    rng = random.Random(args.seed)
+    files = load_files(args.files_dir) if weights.get("import") else []
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        dataset = await discover(client, rng)
+        flow_stats, request_stats = Stats(), Stats()
+        names = list(weights)
+        deadline = time.perf_counter() + args.duration
+
+        async def user(seed: int) -> None:
+            session = Session(client, request_stats, dataset, files, args.think_ms / 1000.0, random.Random(seed))
+            flows = {"dashboard": session.dashboard, "log": session.log, "detail": session.detail,
+                     "import": session.import_}
+            while time.perf_counter() < deadline:
+                name = session.rng.choices(names, weights=[weights[n] for n in names])[0]
+                t0 = time.perf_counter()
+                ok = await flows[name]()
+                flow_stats.add(name, (time.perf_counter() - t0) * 1000.0, ok)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user(rng.randrange(1 << 30)) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    requests = request_stats.summary(elapsed)
+    total = sum(r["count"] for r in requests.values())
+    return {
+        "base_url": args.base_url,
+        "concurrency": args.concurrency,
+        "duration_s": round(elapsed, 1),
+        "dataset": {"first": dataset["first"].isoformat(), "last": dataset["last"].isoformat(),
+                    "sampled_runs": len(dataset["run_ids"])},
+        "requests_per_s": round(total / elapsed, 1) if elapsed else 0.0,
+        "errors": sum(r["errors"] for r in requests.values()),
+        "error_kinds": dict(sorted(request_stats.error_kinds.items())),
+        "flows": flow_stats.summary(elapsed),
+        "requests": requests,
+    }
+
+
+def print_table(title: str, rows: dict) -> None:
+    print(f"\n{title:<32} {'count':>7} {'/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>7}")
+    for name, r in rows.items():
+        print(f"{name:<32} {r['count']:>7d} {r['per_s']:>8.2f} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} "
+              f"{r['p99_ms']:>9.1f} {r['max_ms']:>9.1f} {r['errors']:>7d}")
+
+
+def parse_weights(value: str) -> dict[str, int]:
+    weights = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_WEIGHTS:
+            raise argparse.ArgumentTypeError(f"unknown flow {name!r} (flows: {', '.join(DEFAULT_WEIGHTS)})")
+        weights[name] = int(weight or 1)
+    return weights
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Load test realistic user flows")
+    ap.add_argument("--base-url", required=True, help="e.g. http://localhost:8000")
+    ap.add_argument("-c", "--concurrency", type=int, default=20, help="Virtual users (default: 20)")
+    ap.add_argument("--duration", type=float, default=60.0, help="Seconds (default: 60)")
+    ap.add_argument("--weights", type=parse_weights, default=DEFAULT_WEIGHTS,
+                    help="Flow mix, e.g. dashboard=50,log=25,detail=20,import=5 (the default)")
+    ap.add_argument("--think-ms", type=float, default=0.0, help="Average pause between requests")
+    ap.add_argument("--files-dir", help="FIT/GPX files for the import flow (default: a generated 1 h run)")
+    ap.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--json", action="store_true", help="Print results JSON instead of the tables")
+    args = ap.parse_args()
+    args.base_url = args.base_url.rstrip("/")
+
+    result = asyncio.run(run_load(args, args.weights))
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    ds = result["dataset"]
+    print(f"{args.concurrency} users for {result['duration_s']}s against {args.base_url} "
+          f"(runs {ds['first']} .. {ds['last']}, {ds['sampled_runs']} sampled for detail)")
+    print_table("flow", result["flows"])
+    print_table("request", result["requests"])
+    print(f"\n{result['requests_per_s']} requests/s, {result['errors']} errors")
+    for kind, count in result["error_kinds"].items():
+        print(f"  {count:>6d}  {kind}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Strava API, for syncing and benchmarking offline.
+
+Serves the endpoints the app calls, with synthetic but realistically
+sized data:
+  - GET  /api/v3/athlete/activities   paginated summaries (after/before/page/per_page)
+  - GET  /api/v3/activities/{id}      one activity
+  - GET  /api/v3/activities/{id}/streams
+                                      1 Hz time/latlng/altitude/heartrate/
+                                      velocity_smooth (a 1 h run is ~3,600
+                                      points, ~150 KB of JSON), generated
+                                      per request so the server stays small
+  - POST /oauth/token                 always hands out a fresh token
+  - GET  /_mock/stats, POST /_mock/reset
+                                      request counters for benchmarks
+
+Every response carries X-RateLimit-Limit / X-RateLimit-Usage for a
+15-minute and a daily window, and requests past either limit get a 429,
+like Strava. Data is deterministic for a given --seed. About one in ten
+activities is a Ride, so type filtering is exercised too.
+
+Point the app at it with STRAVA_BASE_URL:
+
+Usage (from backend/):
+  python scripts/mock_strava.py --port 8787 --activities 1000 --latency-ms 20
+  STRAVA_BASE_URL=http://127.0.0.1:8787 uvicorn app.main:app
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime as dt
+import math
+import random
+import time
+
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+# Strava's default read limits: per 15 minutes, per day
+DEFAULT_LIMITS = (100, 1000)
+SHORT_WINDOW_S = 15 * 60
+FIRST_ACTIVITY_ID = 9_000_000_000
+# Activities are spaced this far apart, ending at --end
+SPACING_S = 8 * 3600
+
+
+def make_activities(count: int, seed: int, end: dt.datetime) -> list[dict]:
+    """Activity summaries, oldest first, the last one starting before `end`."""
+    rng = random.Random(seed)
+    first = end - dt.timedelta(seconds=SPACING_S * count)
+    activities = []
+    for i in range(count):
+        start = first + dt.timedelta(seconds=SPACING_S * i + rng.randint(0, 3600))
+        ride = rng.random() < 0.1
+        moving_time = rng.randint(1500, 5400) if not ride else rng.randint(2400, 7200)
+        speed = rng.uniform(2.6, 4.2) if not ride else rng.uniform(6.0, 9.0)
+        activities.append({
+            "id": FIRST_ACTIVITY_ID + i,
+            "resource_state": 2,
+            "athlete": {"id": 4242, "resource_state": 1},
+            "name": ("Morning Ride" if ride else rng.choice(["Morning Run", "Easy run", "Tempo", "Long run"])),
+            "type": "Ride" if ride else "Run",
+            "sport_type": "Ride" if ride else "Run",
+            "workout_type": None if ride else rng.choice([0, 0, 0, 1, 2, 3]),
+            "start_date": start.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "start_date_local": start.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "timezone": "(GMT+00:00) Etc/UTC",
+            "distance": round(moving_time * speed, 1),
+            "moving_time": moving_time,
+            "elapsed_time": moving_time + rng.randint(0, 300),
+            "total_elevation_gain": round(rng.uniform(5, 250), 1),
+            "average_speed": round(speed, 3),
+            "max_speed": round(speed * 1.4, 3),
+            "has_heartrate": True,
+            "average_heartrate": round(rng.uniform(135, 165), 1),
+            "max_heartrate": float(rng.randint(170, 192)),
+            "map": {"id": f"a{FIRST_ACTIVITY_ID + i}", "summary_polyline": None, "resource_state": 2},
+            "manual": False,
+            "private": False,
+        })
+    return activities
+
+
+def make_streams(activity: dict) -> dict:
+    """1 Hz streams for the activity, the same for every call with its id."""
+    rng = random.Random(activity["id"])
+    n = activity["moving_time"]
+    speed = activity["average_speed"]
+    lat, lng = 40.0 + rng.uniform(-0.5, 0.5), -75.0 + rng.uniform(-0.5, 0.5)
+    heading = rng.uniform(0, 2 * math.pi)
+    alt = rng.uniform(0, 300)
+    hr = 110.0
+    latlng, altitude, heartrate, velocity = [], [], [], []
+    for t in range(n):
+        v = max(0.5, speed + math.sin(t / 90.0) * 0.3 + rng.gauss(0, 0.1))
+        heading += rng.gauss(0, 0.05)
+        lat += v * math.cos(heading) / 111_320
+        lng += v * math.sin(heading) / (111_320 * math.cos(math.radians(lat)))
+        alt += rng.gauss(0, 0.15)
+        hr += (activity["average_heartrate"] - hr) * 0.01 + rng.gauss(0, 0.5)
+        latlng.append([round(lat, 6), round(lng, 6)])
+        altitude.append(round(alt, 1))
+        heartrate.append(int(hr))
+        velocity.append(round(v, 3))
+
+    def stream(data):
+        return {"data": data, "series_type": "time", "original_size": n, "resolution": "high"}
+
+    return {
+        "time": stream(list(range(n))),
+        "latlng": stream(latlng),
+        "altitude": stream(altitude),
+        "heartrate": stream(heartrate),
+        "velocity_smooth": stream(velocity),
+    }
+
+
+class RateLimiter:
+    """Strava-style usage counters: a 15-minute window (aligned to the
+    quarter hour) and a daily one (reset at midnight UTC)."""
+
+    def __init__(self, short_limit: int, day_limit: int):
+        self.short_limit = short_limit
+        self.day_limit = day_limit
+        self.reset()
+
+    def reset(self) -> None:
+        self.short_used = 0
+        self.day_used = 0
+        self._short_window = self._day = None
+
+    def hit(self) -> tuple[bool, dict]:
+        """Count a request; (allowed, rate-limit headers)."""
+        now = time.time()
+        window, day = int(now // SHORT_WINDOW_S), int(now // 86400)
+        if window != self._short_window:
+            self._short_window, self.short_used = window, 0
+        if day != self._day:
+            self._day, self.day_used = day, 0
+        self.short_used += 1
+        self.day_used += 1
+        headers = {
+            "X-RateLimit-Limit": f"{self.short_limit},{self.day_limit}",
+            "X-RateLimit-Usage": f"{self.short_used},{self.day_used}",
+        }
+        return self.short_used <= self.short_limit and self.day_used <= self.day_limit, headers
+
+
+def create_app(
+    activities: int = 1000,
+    seed: int = 1,
+    limits: tuple[int, int] = DEFAULT_LIMITS,
+    latency_ms: float = 0.0,
+    end: dt.datetime | None = None,
+) -> FastAPI:
+    end = end or dt.datetime(2025, 1, 1, tzinfo=dt.timezone.utc)
+    summaries = make_activities(activities, seed, end)
+    by_id = {a["id"]: a for a in summaries}
+    starts = [int(dt.datetime.fromisoformat(a["start_date"].replace("Z", "+00:00")).timestamp()) for a in summaries]
+    limiter = RateLimiter(*limits)
+    stats = {"requests": 0, "throttled": 0, "listed": 0, "streams": 0, "bytes": 0}
+
+    app = FastAPI(title="Mock Strava")
+
+    @app.middleware("http")
+    async def rate_limit(request: Request, call_next):
+        if request.url.path.startswith("/_mock"):
+            return await call_next(request)
+        stats["requests"] += 1
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        allowed, headers = limiter.hit()
+        if not allowed:
+            stats["throttled"] += 1
+            return JSONResponse(
+                {"message": "Rate Limit Exceeded", "errors": [{"resource": "Application", "code": "exceeded"}]},
+                status_code=429,
+                headers=headers,
+            )
+        response = await call_next(request)
+        response.headers.update(headers)
+        stats["bytes"] += int(response.headers.get("content-length", 0))
+        return response
+
+    @app.get("/api/v3/athlete/activities")
+    def list_activities(
+        after: int = 0,
+        before: int | None = None,
+        page: int = Query(1, ge=1),
+        per_page: int = Query(30, ge=1, le=200),
+    ):
+        matching = [
+            a for a, started in zip(summaries, starts)
+            if started > after and (before is None or started < before)
+        ]
+        chunk = matching[(page - 1) * per_page:page * per_page]
+        stats["listed"] += len(chunk)
+        return ORJSONResponse(chunk)
+
+    def not_found():
+        return JSONResponse(
+            {"message": "Record Not Found", "errors": [{"resource": "Activity", "code": "not found"}]},
+            status_code=404,
+        )
+
+    @app.get("/api/v3/activities/{activity_id}")
+    def get_activity(activity_id: int):
+        a = by_id.get(activity_id)
+        return ORJSONResponse(a) if a else not_found()
+
+    @app.get("/api/v3/activities/{activity_id}/streams")
+    def get_streams(activity_id: int):
+        a = by_id.get(activity_id)
+        if a is None:
+            return not_found()
+        stats["streams"] += 1
+        return ORJSONResponse(make_streams(a))
+
+    @app.post("/oauth/token")
+    def token():
+        return {
+            "token_type": "Bearer",
+            "access_token": f"mock-{random.getrandbits(64):016x}",
+            "refresh_token": "mock-refresh",
+            "expires_at": int(time.time()) + 6 * 3600,
+            "expires_in": 6 * 3600,
+            "athlete": {"id": 4242},
+        }
+
+    @app.get("/_mock/stats")
+    def get_stats():
+        return {**stats, "activities": len(summaries), "short_used": limiter.short_used, "day_used": limiter.day_used}
+
+    @app.post("/_mock/reset")
+    def reset():
+        limiter.reset()
+        for k in stats:
+            stats[k] = 0
+        return {"ok": True}
+
+    return app
+
+
+def parse_limits(value: str) -> tuple[int, int]:
+    short, day = (int(x) for x in value.split(","))
+    return short, day
+
+
+def main() -> None:
+    import uvicorn
+
+    ap = argparse.ArgumentParser(description="Serve a mock Strava API")
+    ap.add_argument("--port", type=int, default=8787)
+    ap.add_argument("--activities", type=int, default=1000)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--limit", type=parse_limits, default=DEFAULT_LIMITS,
+                    help="15-minute,daily request limits (default: %(default)s)")
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="Added to every API response")
+    args = ap.parse_args()
+    app = create_app(args.activities, args.seed, args.limit, args.latency_ms)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,9 @@ import random
 
 from app.db import SessionLocal
 from app.models.run import Run
+from app.models.run_metrics import RunMetrics  # noqa: F401  (Run relationship targets)
+from app.models.run_split import RunSplit  # noqa: F401
+from app.models.run_track import RunTrack  # noqa: F401
 
 
 def hhmmss_to_seconds(hhmmss: str) -> int:
@@ -0,0 +1,17 @@
+"""Shared test setup.
+
+Points the app at a throwaway SQLite file; an in-memory database is not
+shared across the threadpool FastAPI runs sync routes on. The app does
+not create tables (Alembic does, in entrypoint.sh), so they are created
+here from the models.
+"""
+import os
+import tempfile
+
+_TMP_DIR = tempfile.mkdtemp(prefix="runner-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+pysqlite:///{os.path.join(_TMP_DIR, 'test.db')}")
+os.environ.setdefault("UPLOADS_DIR", os.path.join(_TMP_DIR, "uploads"))
+
+from app.db import create_tables  # noqa: E402  (after the env vars above)
+
+create_tables()
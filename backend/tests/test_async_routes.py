@@ -0,0 +1,54 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.db import async_url
+from test_api_smoke import get_client
+
+
+def _async_client():
+    from app.api.goals_async import router as goals_async_router
+    from app.api.runs_async import router as runs_async_router
+
+    app = FastAPI()
+    app.include_router(runs_async_router)
+    app.include_router(goals_async_router)
+    return TestClient(app)
+
+
+def test_async_url_mapping():
+    assert async_url("postgresql+psycopg2://u:p@h:5432/db") == "postgresql+asyncpg://u:p@h:5432/db"
+    assert async_url("postgresql://u:p@h/db?sslmode=disable") == "postgresql+asyncpg://u:p@h/db?ssl=disable"
+    assert async_url("sqlite+pysqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+
+
+def test_async_reads_match_sync():
+    client = get_client()
+    r = client.post("/runs/", json={
+        "date": "2025-05-05",
+        "title": "Async parity",
+        "distance_mi": 5.5,
+        "duration": "00:44:00",
+        "run_type": "workout",
+    })
+    assert r.status_code == 200, r.text
+    run_id = r.json()["id"]
+    assert client.put("/goals/2025-05-05", json={"goal_miles": 40}).status_code == 200
+
+    aclient = _async_client()
+    params = {"start_date": "2025-05-01", "end_date": "2025-05-31"}
+    for path, query in [
+        ("/runs/", params),
+        ("/runs/stats", params),
+        (f"/runs/{run_id}/detail", None),
+        (f"/runs/{run_id}/splits", None),
+        ("/goals/weekly", params),
+        ("/goals/progress", params),
+        ("/goals/2025-05-07", None),
+    ]:
+        sync_r = client.get(path, params=query)
+        async_r = aclient.get(path, params=query)
+        assert async_r.status_code == sync_r.status_code == 200, (path, async_r.text)
+        assert async_r.json() == sync_r.json(), path
+
+    assert aclient.get(f"/runs/{run_id}/metrics").status_code == 404
+    assert aclient.get("/goals/2001-01-01").status_code == 404
@@ -0,0 +1,23 @@
+from test_api_smoke import get_client
+
+
+def test_cumulative_mileage_gap_filled_columns():
+    client = get_client()
+    for day, dist in [("2019-01-01", 3), ("2019-01-01", 2), ("2019-01-04", 4), ("2020-02-29", 10), ("2020-12-31", 1)]:
+        client.post("/runs/", json={"date": day, "title": "Cumulative", "distance_mi": dist, "duration": "00:30:00"})
+
+    r = client.get("/stats/cumulative", params={"years": "2020,2019"})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["day_of_year"][:3] == [1, 2, 3] and len(body["day_of_year"]) == 366
+
+    y2019, y2020 = body["series"]
+    assert y2019["year"] == 2019 and y2019["total_mi"] == 9.0
+    assert y2019["cumulative_mi"][:5] == [5.0, 5.0, 5.0, 9.0, 9.0]
+    assert y2019["cumulative_mi"][364] == 9.0
+    assert y2019["cumulative_mi"][365] is None  # no day 366 in a common year
+
+    assert y2020["cumulative_mi"][58] == 0.0 and y2020["cumulative_mi"][59] == 10.0  # Feb 29
+    assert y2020["cumulative_mi"][365] == 11.0 == y2020["total_mi"]
+
+    assert client.get("/stats/cumulative", params={"years": "twenty"}).status_code == 422
@@ -0,0 +1,29 @@
+from test_api_smoke import get_client
+
+
+def test_bulk_upsert_then_progress():
+    client = get_client()
+    r = client.put("/goals/weekly", json=[
+        {"week_start": "2032-01-05", "goal_miles": 20, "notes": "base"},
+        {"week_start": "2032-01-14", "goal_miles": 25},   # Wednesday -> 2032-01-12
+        {"week_start": "2032-01-12", "goal_miles": 30},   # same week, later item wins
+    ])
+    assert r.status_code == 200, r.text
+    assert [(g["week_start"], g["goal_miles"]) for g in r.json()] == [("2032-01-05", 20), ("2032-01-12", 30)]
+
+    # Re-sending updates in place
+    client.put("/goals/weekly", json=[{"week_start": "2032-01-05", "goal_miles": 22, "notes": "base"}])
+
+    for day, dist in [("2032-01-05", 6), ("2032-01-11", 5), ("2032-01-13", 10)]:
+        client.post("/runs/", json={"date": day, "title": "Progress", "distance_mi": dist, "duration": "01:00:00"})
+
+    r = client.get("/goals/progress", params={"start_date": "2032-01-07", "end_date": "2032-01-20"})
+    assert r.status_code == 200
+    assert r.json() == [
+        {"week_start": "2032-01-05", "goal_miles": 22.0, "notes": "base", "actual_miles": 11.0, "run_count": 2, "completion_pct": 50.0},
+        {"week_start": "2032-01-12", "goal_miles": 30.0, "notes": None, "actual_miles": 10.0, "run_count": 1, "completion_pct": 33.3},
+        {"week_start": "2032-01-19", "goal_miles": None, "notes": None, "actual_miles": 0.0, "run_count": 0, "completion_pct": None},
+    ]
+
+    assert client.put("/goals/weekly", json=[{"week_start": "2032-02-02", "goal_miles": 0}]).status_code == 422
+    assert client.get("/goals/progress", params={"start_date": "2032-02-01", "end_date": "2032-01-01"}).status_code == 422
@@ -0,0 +1,70 @@
+from datetime import date, time
+from decimal import Decimal
+
+from app.api.runs import _run_read, _run_rows_payload
+from app.models.run import Run
+from test_api_smoke import get_client
+
+
+def test_rows_payload_matches_run_read():
+    run = Run(
+        id=7,
+        date=date(2025, 7, 1),
+        start_time=time(6, 5),
+        title="Tempo",
+        notes=None,
+        distance_mi=Decimal("6.21"),
+        duration_seconds=2405,
+        run_type="workout",
+        source="fit",
+    )
+    row = (run.id, run.date, run.start_time, run.title, run.notes,
+           run.distance_mi, run.duration_seconds, run.run_type, run.source)
+    assert _run_rows_payload([row]) == [_run_read(run).model_dump(mode="python")]
+
+
+def test_list_runs_fast_path_response():
+    client = get_client()
+    created = client.post("/runs/", json={
+        "date": "2025-07-02",
+        "title": "List fast path",
+        "distance_mi": 7.35,
+        "duration": "00:45:32",
+        "run_type": "long",
+    }).json()
+
+    r = client.get("/runs/", params={"start_date": "2025-07-02", "end_date": "2025-07-02", "run_type": "long"})
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/json"
+    listed = [x for x in r.json() if x["id"] == created["id"]]
+    assert listed == [created]
+
+
+def test_list_runs_range_filters_and_sort():
+    client = get_client()
+    day = {"start_date": "2025-08-04", "end_date": "2025-08-10"}
+    ids = {}
+    for title, dist, dur in [
+        ("Easy 5", 5.0, "00:45:00"),     # 9:00/mi
+        ("Tempo 6", 6.0, "00:42:00"),    # 7:00/mi
+        ("Long 12", 12.0, "01:36:00"),   # 8:00/mi
+    ]:
+        r = client.post("/runs/", json={
+            "date": "2025-08-05", "title": title, "distance_mi": dist, "duration": dur, "run_type": "easy",
+        })
+        ids[title] = r.json()["id"]
+
+    r = client.get("/runs/", params={**day, "sort": "pace"})
+    assert [x["id"] for x in r.json()] == [ids["Tempo 6"], ids["Long 12"], ids["Easy 5"]]
+
+    r = client.get("/runs/", params={**day, "min_pace": "7:30", "max_pace": "8:00"})
+    assert [x["id"] for x in r.json()] == [ids["Long 12"]]
+
+    r = client.get("/runs/", params={**day, "min_distance": 5.5, "max_duration": "01:00:00"})
+    assert [x["id"] for x in r.json()] == [ids["Tempo 6"]]
+
+    r = client.get("/runs/", params={**day, "sort": "-distance", "limit": 1})
+    assert [x["id"] for x in r.json()] == [ids["Long 12"]]
+
+    assert client.get("/runs/", params={"min_pace": "7 min"}).status_code == 422
+    assert client.get("/runs/", params={"sort": "title"}).status_code == 422
@@ -0,0 +1,46 @@
+from test_api_smoke import get_client
+
+GPX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<gpx version="1.1" xmlns="http://www.topografix.com/GPX/1/1"><trk><trkseg>
+<trkpt lat="40.0000" lon="-75.0000"><ele>10</ele><time>2031-04-01T06:00:00Z</time></trkpt>
+<trkpt lat="40.0010" lon="-75.0000"><ele>11</ele><time>2031-04-01T06:00:30Z</time></trkpt>
+<trkpt lat="40.0020" lon="-75.0000"><ele>12</ele><time>2031-04-01T06:01:00Z</time></trkpt>
+</trkseg></trk></gpx>
+"""
+
+
+def _samples(text):
+    """{'name{labels}': value} for every sample line."""
+    out = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            key, value = line.rsplit(" ", 1)
+            out[key] = float(value)
+    return out
+
+
+def test_metrics_exposes_request_and_import_stage_histograms():
+    client = get_client()
+    run_id = client.post("/runs/", json={
+        "date": "2031-04-01", "title": "Scraped", "distance_mi": 3.0, "duration": "00:27:00", "run_type": "easy",
+    }).json()["id"]
+    assert client.get(f"/runs/{run_id}/detail").status_code == 200
+    r = client.post("/runs/import", files={"file": ("metrics.gpx", GPX, "application/gpx+xml")})
+    assert r.status_code == 200
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = _samples(r.text)
+
+    # Labelled by route template, not by the raw path
+    assert samples['runner_http_request_duration_seconds_count{method="GET",route="/runs/{run_id}/detail",status="200"}'] >= 1
+    assert not any(f"/runs/{run_id}/" in key for key in samples)
+    assert "# TYPE runner_http_request_duration_seconds histogram" in r.text
+
+    for stage in ("upload_write", "parse", "analyze", "persist"):
+        assert samples[f'runner_import_stage_duration_seconds_count{{stage="{stage}",format="gpx"}}'] >= 1
+    assert samples['runner_import_points_total{format="gpx"}'] >= 3
+    assert samples['runner_background_jobs{kind="file_processing"}'] == 0
+    assert "runner_strava_webhook_queue_depth" in samples
+    assert "runner_http_requests_in_flight" in samples
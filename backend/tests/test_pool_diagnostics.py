@@ -0,0 +1,52 @@
+import pytest
+from sqlalchemy import exc
+
+from app.core.pool_stats import InstrumentedQueuePool, PoolStats
+from app.db import engine
+from test_api_smoke import get_client
+
+
+def test_pool_stats_snapshot():
+    stats = PoolStats()
+    assert stats.snapshot()["checkout_ms"]["avg"] is None
+    for ms in (1.0, 2.0, 3.0):
+        stats.record_wait(ms / 2)
+        stats.record_checkout(ms)
+    snap = stats.snapshot()
+    assert snap["checkouts"] == 3
+    assert snap["checkout_ms"]["avg"] == 2.0
+    assert snap["checkout_ms"]["max"] == 3.0
+    assert snap["wait_ms"]["p50"] == 1.0
+
+
+def test_only_pool_timeouts_count_as_timeouts():
+    def refuse():
+        raise ConnectionRefusedError("database is down")
+
+    pool = InstrumentedQueuePool(refuse, pool_size=1, max_overflow=0, timeout=0.01)
+    with pytest.raises(ConnectionRefusedError):
+        pool.connect()
+    assert pool.stats.timeouts == 0
+
+    pool = InstrumentedQueuePool(engine.pool._creator, pool_size=1, max_overflow=0, timeout=0.01)
+    held = pool.connect()
+    with pytest.raises(exc.TimeoutError):
+        pool.connect()
+    held.close()
+    assert pool.stats.timeouts == 1
+
+
+def test_pool_diagnostics_endpoint():
+    client = get_client()
+    assert isinstance(engine.pool, InstrumentedQueuePool)
+    client.get("/runs/")  # make sure at least one checkout happened
+
+    r = client.get("/diagnostics/pool")
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data["configured"]["pool_size"] >= 1
+    sync = data["sync"]
+    assert sync["class"] == "InstrumentedQueuePool"
+    assert sync["checkouts"] >= 1
+    assert sync["checked_out"] >= 0
+    assert sync["checkout_ms"]["p99"] is not None
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.db as db_module
+from app.core import read_routing
+from app.core.config import settings
+from test_api_smoke import get_client
+
+
+def _replica(monkeypatch):
+    """Point read routes at a second (empty) SQLite database."""
+    path = os.path.join(tempfile.mkdtemp(prefix="runner-replica-"), "replica.db")
+    url = f"sqlite+pysqlite:///{path}"
+    replica = create_engine(url)
+    db_module.Base.metadata.create_all(bind=replica)
+    monkeypatch.setattr(settings, "database_read_url", url)
+    monkeypatch.setattr(settings, "read_your_writes_s", 10)
+    monkeypatch.setattr(db_module, "ReadSessionLocal", sessionmaker(bind=replica))
+
+
+def _titles(client, **kw):
+    r = client.get("/runs/", params={"start_date": "2025-06-01", "end_date": "2025-06-30"}, **kw)
+    assert r.status_code == 200, r.text
+    return {run["title"] for run in r.json()}
+
+
+def test_reads_go_to_replica_except_after_writes(monkeypatch):
+    _replica(monkeypatch)
+    client = get_client()
+
+    r = client.post("/runs/", json={
+        "date": "2025-06-10",
+        "title": "Replica lag",
+        "distance_mi": 3.1,
+        "duration": "00:25:00",
+    }, headers={"Origin": "http://localhost:5173"})
+    assert r.status_code == 200, r.text
+    # Readable by the cross-origin frontend
+    assert read_routing.PRIMARY_UNTIL_HEADER in r.headers["access-control-expose-headers"]
+    assert read_routing.PRIMARY_COOKIE in r.cookies
+    assert int(r.headers[read_routing.PRIMARY_UNTIL_HEADER]) > time.time()
+
+    # Right after the write: read-your-writes pins this client to the primary
+    assert "Replica lag" in _titles(client)
+
+    # Any other client keeps reading the replica, writes or not
+    other = get_client()
+    assert "Replica lag" not in _titles(other)
+
+    # ...unless it asks for the primary (cookieless clients, until the deadline)
+    assert "Replica lag" in _titles(other, headers={read_routing.PRIMARY_HEADER: "1"})
+
+
+def test_no_replica_configured_reads_primary():
+    assert settings.database_read_url is None
+    client = get_client()
+    r = client.post("/runs/", json={
+        "date": "2025-06-11",
+        "title": "Primary only",
+        "distance_mi": 3.1,
+        "duration": "00:25:00",
+    })
+    assert read_routing.PRIMARY_COOKIE not in r.cookies
+    assert "Primary only" in _titles(client)
@@ -0,0 +1,50 @@
+import json
+import logging
+
+from app.core.config import settings
+from test_api_smoke import get_client
+
+
+def _server_timing(header):
+    """{"db": {"dur": 1.2, "desc": "3 queries"}, ...}"""
+    out = {}
+    for metric in header.split(","):
+        name, *params = [p.strip() for p in metric.split(";")]
+        out[name] = {k: v.strip('"') for k, v in (p.split("=", 1) for p in params)}
+    return out
+
+
+def test_server_timing_splits_db_handler_and_serialization(caplog):
+    client = get_client()
+    client.post("/runs/", json={
+        "date": "2031-03-01", "title": "Timed", "distance_mi": 5.0, "duration": "00:40:00", "run_type": "easy",
+    })
+    with caplog.at_level(logging.INFO, logger="runner.requests"):
+        r = client.get("/runs/", params={"start_date": "2031-03-01", "end_date": "2031-03-01"})
+    assert r.status_code == 200
+
+    timing = _server_timing(r.headers["Server-Timing"])
+    assert set(timing) == {"total", "db", "handler", "serialize"}
+    assert timing["db"]["desc"].endswith("queries") and int(timing["db"]["desc"].split()[0]) >= 1
+    assert float(timing["total"]["dur"]) >= float(timing["handler"]["dur"]) >= float(timing["db"]["dur"])
+
+    logged = [json.loads(rec.getMessage()) for rec in caplog.records if rec.name == "runner.requests"]
+    assert logged[-1]["route"] == "/runs/" and logged[-1]["status"] == 200
+    assert logged[-1]["db_queries"] >= 1
+
+
+def test_profile_needs_the_token(monkeypatch):
+    client = get_client()
+    # Disabled by default: the parameter is ignored
+    r = client.get("/runs/?profile=1", headers={"X-Profile-Token": ""})
+    assert r.headers["content-type"].startswith("application/json")
+
+    monkeypatch.setattr(settings, "profile_token", "s3cret")
+    assert client.get("/runs/?profile=1", headers={"X-Profile-Token": "nope"}).status_code == 200
+    r = client.get("/runs/?profile=1", headers={"X-Profile-Token": "s3cret"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    assert "GET /runs/ -> 200" in r.text
+    assert "cumulative" in r.text
+    # The sync endpoint ran in the threadpool; its profile is merged in
+    assert "list_runs" in r.text
@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta, timezone
+
+from app.db import SessionLocal
+from app.models.run import Run
+from test_api_smoke import get_client
+
+
+def _create(client, title):
+    r = client.post("/runs/", json={
+        "date": "2025-04-01",
+        "title": title,
+        "distance_mi": 6.0,
+        "duration": "00:48:00",
+    })
+    assert r.status_code == 200, r.text
+    return r.json()["id"]
+
+
+def test_full_sync_then_incremental_changes():
+    client = get_client()
+    kept = _create(client, "Sync keep")
+    gone = _create(client, "Sync gone")
+
+    full = client.get("/runs/changes")
+    assert full.status_code == 200, full.text
+    data = full.json()
+    ids = {r["id"] for r in data["runs"]}
+    assert {kept, gone} <= ids
+    assert data["deleted"] == []
+    assert data["cursor"] is not None
+
+    since = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+    assert client.put(f"/runs/{kept}", json={"title": "Sync kept (edited)"}).status_code == 200
+    assert client.delete(f"/runs/{gone}").status_code == 200
+
+    r = client.get("/runs/changes", params={"since": since})
+    assert r.status_code == 200, r.text
+    delta = r.json()
+    by_id = {r["id"]: r for r in delta["runs"]}
+    assert by_id[kept]["title"] == "Sync kept (edited)"
+    assert gone not in by_id
+    assert gone in {d["id"] for d in delta["deleted"]}
+    assert datetime.fromisoformat(delta["cursor"]) >= datetime.fromisoformat(since)
+
+
+def test_changes_since_future_is_empty():
+    client = get_client()
+    _create(client, "Sync old")
+    since = (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+    r = client.get("/runs/changes", params={"since": since})
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data["runs"] == [] and data["deleted"] == []
+    assert datetime.fromisoformat(data["cursor"]) == datetime.fromisoformat(since)
+
+
+def test_change_committed_after_the_cursor_is_not_lost():
+    client = get_client()
+    cursor = client.get("/runs/changes").json()["cursor"]
+
+    # A transaction that started before that call but commits after it:
+    # its rows carry the (earlier) transaction start time
+    with SessionLocal() as db:
+        late = Run(date=datetime(2025, 4, 2).date(), title="Slow commit", distance_mi=4.0, duration_seconds=2000,
+                   updated_at=datetime.now(timezone.utc) - timedelta(seconds=30))
+        db.add(late)
+        db.commit()
+        late_id = late.id
+
+    delta = client.get("/runs/changes", params={"since": cursor}).json()
+    assert late_id in {r["id"] for r in delta["runs"]}
+    assert delta["cursor"] >= cursor
@@ -0,0 +1,102 @@
+from app.db import SessionLocal
+from app.models.run_metrics import RunMetrics
+from app.models.run_split import RunSplit
+from app.models.run_track import RunTrack
+
+from test_api_smoke import get_client
+
+
+def _create_run(client, title="Detail Run"):
+    payload = {
+        "date": "2025-02-01",
+        "start_time": "06:30",
+        "title": title,
+        "distance_mi": 3.0,
+        "duration": "00:24:00",
+        "run_type": "easy",
+    }
+    r = client.post("/runs/", json=payload)
+    assert r.status_code == 200, r.text
+    return r.json()["id"]
+
+
+def _attach_derived(run_id: int):
+    db = SessionLocal()
+    try:
+        db.add(RunMetrics(
+            run_id=run_id,
+            avg_hr=150,
+            max_hr=170,
+            hr_series=[{"t": i, "hr": 140 + i % 10} for i in range(100)],
+            pace_series=[],
+            hr_dist_series=[],
+            pace_dist_series=[],
+            elev_dist_series=[],
+        ))
+        for i in range(1, 4):
+            db.add(RunSplit(run_id=run_id, idx=i, distance_mi=1.0, duration_sec=480))
+        coords = [[-73.0 + i * 1e-4, 40.0] for i in range(50)]
+        db.add(RunTrack(
+            run_id=run_id,
+            geojson={"type": "LineString", "coordinates": coords},
+            bounds={"minLat": 40.0, "minLon": -73.0, "maxLat": 40.0, "maxLon": -72.995},
+            points_count=len(coords),
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_detail_returns_all_sections():
+    client = get_client()
+    run_id = _create_run(client)
+    _attach_derived(run_id)
+
+    r = client.get(f"/runs/{run_id}/detail")
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data["run"]["id"] == run_id
+    assert data["metrics"]["avg_hr"] == 150
+    assert [s["idx"] for s in data["splits"]] == [1, 2, 3]
+    assert data["track"]["points_count"] == 50
+    assert len(data["series"]["hr_series"]) == 100
+
+    # Matches the individual endpoints it replaces
+    assert data["metrics"] == client.get(f"/runs/{run_id}/metrics").json()
+    assert data["splits"] == client.get(f"/runs/{run_id}/splits").json()
+    assert data["track"] == client.get(f"/runs/{run_id}/track").json()
+    assert data["series"] == client.get(f"/runs/{run_id}/series").json()
+
+
+def test_detail_include_and_resolution():
+    client = get_client()
+    run_id = _create_run(client)
+    _attach_derived(run_id)
+
+    r = client.get(
+        f"/runs/{run_id}/detail",
+        params={"include": "track,series", "track_points": 10, "series_points": 20},
+    )
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert "metrics" not in data and "splits" not in data
+    coords = data["track"]["geojson"]["coordinates"]
+    assert len(coords) <= 10
+    assert coords[0] == [-73.0, 40.0]
+    assert coords[-1] == [-73.0 + 49 * 1e-4, 40.0]
+    assert len(data["series"]["hr_series"]) <= 20
+
+
+def test_detail_manual_run_without_derived_data():
+    client = get_client()
+    run_id = _create_run(client, title="Manual only")
+    r = client.get(f"/runs/{run_id}/detail")
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data["metrics"] is None
+    assert data["series"] is None
+    assert data["track"] is None
+    assert data["splits"] == []
+
+    assert client.get(f"/runs/{run_id}/detail", params={"include": "laps"}).status_code == 422
+    assert client.get("/runs/999999/detail").status_code == 404
@@ -0,0 +1,48 @@
+from test_api_smoke import get_client
+
+
+def _create(client, **fields):
+    body = {"date": "2023-03-14", "distance_mi": 8.0, "duration": "01:04:00", "run_type": "workout"}
+    body.update(fields)
+    return client.post("/runs/", json=body).json()["id"]
+
+
+def test_search_ranks_fulltext_matches_and_filters():
+    client = get_client()
+    best = _create(client, title="Zanzibar marathon workout", notes="Marathon pace zanzibar repeats")
+    other = _create(client, title="Zanzibar easy", notes="recovery after the marathon", run_type="easy")
+    _create(client, title="Zanzibar hills", date="2024-01-10")
+
+    r = client.get("/runs/search", params={"q": "zanzibar marathon"})
+    assert r.status_code == 200
+    hits = r.json()
+    assert [h["id"] for h in hits] == [best, other]
+    assert all(h["match"] == "fulltext" for h in hits)
+    assert hits[0]["rank"] > hits[1]["rank"]
+    assert hits[0]["pace"] == "8:00/mi"
+
+    # Stemming + prefix: "workouts" and "zanzib" still match
+    r = client.get("/runs/search", params={"q": "zanzib workouts"})
+    assert [h["id"] for h in r.json()] == [best]
+
+    r = client.get("/runs/search", params={"q": "zanzibar", "run_type": "easy"})
+    assert [h["id"] for h in r.json()] == [other]
+    r = client.get("/runs/search", params={"q": "zanzibar", "start_date": "2024-01-01"})
+    assert [h["title"] for h in r.json()] == ["Zanzibar hills"]
+
+
+def test_search_falls_back_to_fuzzy_and_tracks_edits():
+    client = get_client()
+    run_id = _create(client, title="Quokkaville parkrun")
+
+    # Word fragment from the middle of a word: no full-text hit
+    r = client.get("/runs/search", params={"q": "kkavil"})
+    assert [(h["id"], h["match"]) for h in r.json()] == [(run_id, "fuzzy")]
+
+    client.put(f"/runs/{run_id}", json={"title": "Wombatford parkrun"})
+    assert client.get("/runs/search", params={"q": "quokkaville"}).json() == []
+    assert [h["id"] for h in client.get("/runs/search", params={"q": "wombatford"}).json()] == [run_id]
+
+    client.delete(f"/runs/{run_id}")
+    assert client.get("/runs/search", params={"q": "wombatford"}).json() == []
+    assert client.get("/runs/search", params={"q": "  "}).status_code == 422
@@ -0,0 +1,55 @@
+from test_api_smoke import get_client
+
+
+def _payload(i: int, **overrides):
+    item = {
+        "date": f"2024-03-{(i % 28) + 1:02d}",
+        "title": f"Bulk Run {i}",
+        "distance_mi": 4.0 + i * 0.1,
+        "duration": "00:36:00",
+        "run_type": "easy",
+    }
+    item.update(overrides)
+    return item
+
+
+def test_bulk_create_inserts_all_in_order():
+    client = get_client()
+    items = [_payload(i) for i in range(25)]
+    r = client.post("/runs/bulk", json=items)
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data["created"] == 25
+    assert data["errors"] == []
+    assert len(data["ids"]) == 25 and data["ids"] == sorted(data["ids"])
+
+    listed = client.get("/runs/", params={"start_date": "2024-03-01", "end_date": "2024-03-31"}).json()
+    by_id = {r["id"]: r for r in listed}
+    assert by_id[data["ids"][3]]["title"] == "Bulk Run 3"
+    assert by_id[data["ids"][3]]["pace"].endswith("/mi")
+
+
+def test_bulk_create_rejects_batch_with_invalid_items():
+    client = get_client()
+    items = [
+        _payload(0, title="Atomic ok"),
+        _payload(1, distance_mi=0),
+        _payload(2, duration="36 minutes"),
+    ]
+    r = client.post("/runs/bulk", json=items)
+    assert r.status_code == 422
+    errs = r.json()["detail"]
+    assert [e["index"] for e in errs] == [1, 2]
+
+    listed = client.get("/runs/", params={"start_date": "2024-03-01", "end_date": "2024-03-31"}).json()
+    assert not any(r["title"] == "Atomic ok" for r in listed)
+
+
+def test_bulk_create_partial():
+    client = get_client()
+    items = [_payload(0, title="Partial ok"), _payload(1, start_time="25:99")]
+    r = client.post("/runs/bulk", params={"partial": "true"}, json=items)
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data["created"] == 1
+    assert data["errors"][0]["index"] == 1
@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+from sqlalchemy import create_engine, inspect
+
+from app.db import Base, import_models
+from test_api_smoke import get_client
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_health_and_readiness_are_separate():
+    client = get_client()
+    assert client.get("/health").json() == {"status": "ok"}
+    r = client.get("/health/ready")
+    assert r.status_code == 200
+    assert r.json()["database"] == "ok"
+
+
+def test_import_does_not_load_the_parsers():
+    code = (
+        "import sys, app.main; "
+        "print(','.join(m for m in ('gpxpy', 'fitparse', 'xml.etree.ElementTree') if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=os.environ.copy(),
+        check=True, capture_output=True, text=True,
+    ).stdout
+    assert out.strip() == ""
+
+
+def test_migrations_create_every_model_table():
+    db_path = os.path.join(tempfile.mkdtemp(prefix="runner-migrate-"), "fresh.db")
+    env = dict(os.environ, DATABASE_URL=f"sqlite+pysqlite:///{db_path}")
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"], cwd=BACKEND_DIR, env=env,
+        check=True, capture_output=True,
+    )
+    import_models()
+    tables = set(inspect(create_engine(f"sqlite:///{db_path}")).get_table_names())
+    assert set(Base.metadata.tables) <= tables
@@ -0,0 +1,262 @@
+import asyncio
+import os
+import threading
+from datetime import date, datetime
+
+import httpx
+from sqlalchemy import event
+
+import app.main  # noqa: F401
+
+from app.core.strava_sync import RateLimitBucket, get_sync_state, insert_runs, sync_activities
+from app.db import SessionLocal, engine
+from app.models.run import Run
+from app.models.run_file import RunFile
+from app.models.run_metrics import RunMetrics
+from app.models.run_track import RunTrack
+from app.models.strava_sync_state import StravaSyncState
+from test_api_smoke import get_client
+
+
+def _activities(n, year=2036):
+    return [
+        {
+            "id": year * 10_000 + i,
+            "type": "Run",
+            "name": f"Mock run {i}",
+            "start_date": f"{year}-01-{1 + i // 60:02d}T07:{i % 60:02d}:00Z",
+            "start_date_local": f"{year}-01-{1 + i // 60:02d}T07:{i % 60:02d}:00Z",
+            "distance": 6600.0 + i,
+            "moving_time": 1800 + i,
+        }
+        for i in range(n)
+    ]
+
+
+def _streams(points=600):
+    return {
+        "time": {"data": list(range(points))},
+        "latlng": {"data": [[40.0 + i * 0.0001, -75.0] for i in range(points)]},
+        "altitude": {"data": [10.0 + (i % 50) * 0.5 for i in range(points)]},
+        "heartrate": {"data": [150] * points},
+        "velocity_smooth": {"data": [3.0] * points},
+    }
+
+
+def _epoch(iso):
+    return int(datetime.fromisoformat(iso.replace("Z", "+00:00")).timestamp())
+
+
+class MockStrava:
+    """In-process Strava: paginated activity list, activity details, streams,
+    rate-limit headers."""
+
+    def __init__(self, activities, limit=600, used=0):
+        self.activities = activities
+        self.limit = limit
+        self.used = used
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.stream_calls = 0
+        self.listed = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.used += 1
+        headers = {"X-RateLimit-Limit": f"{self.limit},30000", "X-RateLimit-Usage": f"{self.used},{self.used}"}
+        if self.used > self.limit:
+            return httpx.Response(429, headers=headers)
+        if request.url.path == "/api/v3/athlete/activities":
+            page = int(request.url.params["page"])
+            per_page = int(request.url.params["per_page"])
+            after = int(request.url.params["after"])
+            listed = [a for a in self.activities if _epoch(a["start_date"]) > after]
+            chunk = listed[(page - 1) * per_page:page * per_page]
+            self.listed += len(chunk)
+            return httpx.Response(200, json=chunk, headers=headers)
+        if not request.url.path.endswith("/streams"):
+            activity_id = int(request.url.path.rsplit("/", 1)[1])
+            found = [a for a in self.activities if a["id"] == activity_id]
+            return httpx.Response(200 if found else 404, json=found[0] if found else {}, headers=headers)
+        self.stream_calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return httpx.Response(200, json=_streams(), headers=headers)
+
+    def client(self):
+        return httpx.AsyncClient(base_url="https://strava.test", transport=httpx.MockTransport(self.handler))
+
+
+def _sync(mock, state_key=None, **kwargs):
+    async def go():
+        with SessionLocal() as db:
+            if state_key:
+                kwargs["state"] = get_sync_state(db, state_key, 0)
+            async with mock.client() as client:
+                return await sync_activities(db, client, after=0, allowed_types={"Run"}, **kwargs)
+    return asyncio.run(go())
+
+
+def test_rate_limit_bucket_follows_headers():
+    bucket = RateLimitBucket(reserve=5)
+    bucket.acquire()
+    bucket.acquire()
+    bucket.update(httpx.Response(200, headers={"X-RateLimit-Limit": "100,1000", "X-RateLimit-Usage": "90,500"}))
+    # 10 left - reserve 5 - 1 still in flight
+    assert bucket.tokens == 4
+    bucket.update(httpx.Response(429))
+    assert bucket.tokens == 0
+
+
+def test_async_sync_fetches_streams_concurrently_and_dedupes():
+    mock = MockStrava(_activities(30))
+    result = _sync(mock, concurrency=4, max_activities=None)
+    assert (result.imported, result.streams_fetched, result.rate_limited) == (30, 30, False)
+    assert 1 < mock.max_in_flight <= 4
+
+    with SessionLocal() as db:
+        metrics = db.query(RunMetrics).filter(RunMetrics.run_id.in_(result.run_ids)).all()
+        assert len(metrics) == 30
+        assert all(m.avg_hr == 150 and m.hr_zones for m in metrics)
+        assert db.get(Run, result.run_ids[0]).source == "strava"
+
+    again = _sync(MockStrava(_activities(30)))
+    assert (again.imported, again.skipped) == (0, 30)
+
+
+def test_async_sync_stops_at_rate_limit():
+    # 20 requests left in the window, 5 of them held back as reserve
+    mock = MockStrava(_activities(40, year=2037), limit=100, used=80)
+    result = _sync(mock, concurrency=8)
+    assert result.rate_limited
+    assert mock.used <= 100  # never ran into a 429
+    assert result.streams_fetched == mock.stream_calls < result.imported
+
+
+def test_sync_resumes_from_cursor_and_pending_streams():
+    activities = _activities(40, year=2038)
+    # Enough budget to list and import all 40, but not to fetch every stream
+    first = _sync(MockStrava(activities, limit=100, used=70), state_key="test-resume")
+    assert first.rate_limited and first.imported == 40
+    assert first.streams_fetched < 40
+
+    with SessionLocal() as db:
+        state = db.get(StravaSyncState, "test-resume")
+        assert state.after_cursor == _epoch(activities[-1]["start_date"])
+        assert len(state.pending) == 40 - first.streams_fetched
+
+    # Next call: only the missing streams, and nothing old gets listed again
+    mock = MockStrava(activities + _activities(45, year=2038)[40:])
+    second = _sync(mock, state_key="test-resume")
+    assert (second.imported, second.skipped, second.rate_limited) == (5, 0, False)
+    assert mock.listed == 5
+    assert second.streams_fetched == mock.stream_calls == 40 - first.streams_fetched + 5
+
+    with SessionLocal() as db:
+        state = db.get(StravaSyncState, "test-resume")
+        assert state.pending == []
+        assert state.after_cursor == _epoch(mock.activities[-1]["start_date"])
+        ids = first.run_ids + second.run_ids
+        assert db.query(RunMetrics).filter(RunMetrics.run_id.in_(ids)).count() == 45
+
+
+def test_sync_cap_moves_cursor_only_past_handled_activities():
+    activities = _activities(10, year=2039)
+    first = _sync(MockStrava(activities), state_key="test-cap", max_activities=4)
+    assert first.imported == 4
+
+    mock = MockStrava(activities)
+    rest = _sync(mock, state_key="test-cap")
+    assert (rest.imported, rest.skipped, mock.listed) == (6, 0, 6)
+
+
+def test_identical_activities_are_separate_runs_and_claim_legacy_rows():
+    # Same loop twice on one day: only the activity id tells them apart
+    twins = _activities(3, year=2040)
+    for a in twins:
+        a.update(start_date="2040-03-03T07:00:00Z", start_date_local="2040-03-03T07:00:00Z",
+                 distance=8046.7, moving_time=2400)
+    with SessionLocal() as db:
+        # Imported before external ids existed: no external_id
+        legacy = Run(date=date(2040, 3, 3), title="Old import", distance_mi=5.0,
+                     duration_seconds=2400, source="strava")
+        db.add(legacy)
+        db.commit()
+        legacy_id = legacy.id
+
+    result = _sync(MockStrava(twins))
+    assert (result.imported, result.skipped) == (2, 1)
+    with SessionLocal() as db:
+        runs = db.query(Run).filter(Run.date == date(2040, 3, 3)).all()
+        assert len(runs) == 3
+        assert sorted(r.external_id for r in runs) == sorted(str(a["id"]) for a in twins)
+        assert db.get(Run, legacy_id).external_id is not None
+
+    again = _sync(MockStrava(twins))
+    assert (again.imported, again.skipped) == (0, 3)
+
+
+def test_insert_runs_skips_conflicts():
+    row = {
+        "date": date(2041, 1, 1), "title": "Race", "distance_mi": 3.1, "duration_seconds": 1200,
+        "run_type": "race", "source": "strava", "external_source": "strava", "external_id": "2041",
+    }
+    with SessionLocal() as db:
+        first = insert_runs(db, [row])
+        # A second sync that loaded its known ids before the first committed
+        second = insert_runs(db, [row])
+        db.commit()
+        assert list(first) == ["2041"] and second == {}
+        assert db.query(Run).filter(Run.external_id == "2041").count() == 1
+
+
+def test_raw_streams_are_cached_and_reprocessed_offline():
+    mock = MockStrava(_activities(2, year=2043))
+    result = _sync(mock)
+    run_id = result.run_ids[0]
+    with SessionLocal() as db:
+        files = (
+            db.query(RunFile)
+            .filter(RunFile.run_id.in_(result.run_ids), RunFile.source == "strava_streams")
+            .all()
+        )
+        assert len(files) == 2
+        # Identical payloads share one content-addressed blob
+        assert files[0].storage_path == files[1].storage_path
+        assert files[0].storage_path.endswith(".json.gz") and os.path.exists(files[0].storage_path)
+        db.query(RunMetrics).filter(RunMetrics.run_id == run_id).delete()
+        db.query(RunTrack).filter(RunTrack.run_id == run_id).delete()
+        db.commit()
+
+    calls = mock.used
+    r = get_client().post(f"/runs/{run_id}/reprocess")
+    assert r.status_code == 200, r.text
+    assert r.json()["source"] == "strava_streams"
+    assert mock.used == calls
+    with SessionLocal() as db:
+        assert db.query(RunMetrics).filter(RunMetrics.run_id == run_id).one().avg_hr == 150
+        assert db.query(RunTrack).filter(RunTrack.run_id == run_id).one().points_count == 600
+
+
+def test_sync_keeps_db_work_off_the_event_loop():
+    mock = MockStrava(_activities(12, year=2045))
+    loop_threads, statements = set(), []
+
+    def on_execute(conn, cursor, statement, *args):
+        statements.append(threading.get_ident())
+
+    async def go():
+        loop_threads.add(threading.get_ident())
+        with SessionLocal() as db:
+            state = await asyncio.to_thread(get_sync_state, db, "off-loop", 0)
+            async with mock.client() as client:
+                return await sync_activities(db, client, state=state, allowed_types={"Run"}, concurrency=4)
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        result = asyncio.run(go())
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+    assert (result.imported, result.streams_fetched) == (12, 12)
+    assert statements and not loop_threads & set(statements)
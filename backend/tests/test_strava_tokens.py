@@ -0,0 +1,88 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from app.core.strava_tokens import TokenManager
+
+
+def _write(path, **tokens):
+    path.write_text(json.dumps(tokens))
+
+
+def test_concurrent_callers_share_one_refresh(tmp_path):
+    path = tmp_path / "tokens.json"
+    # Still valid for 2 minutes, but inside the refresh margin
+    _write(path, access_token="old", refresh_token="r1", expires_at=int(time.time()) + 120,
+           athlete={"id": 4242})
+    calls = []
+    gate = threading.Event()
+
+    def refresh(refresh_token):
+        calls.append(refresh_token)
+        gate.wait(1)  # keep the refresh in flight while the others arrive
+        return {"access_token": "new", "refresh_token": "r2", "expires_at": int(time.time()) + 21600}
+
+    manager = TokenManager(str(path), refresh=refresh)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(manager.fresh) for _ in range(8)]
+        time.sleep(0.05)
+        gate.set()
+        results = [f.result() for f in futures]
+
+    assert calls == ["r1"]
+    assert {r["access_token"] for r in results} == {"new"}
+    saved = json.loads(path.read_text())
+    assert saved["refresh_token"] == "r2"
+    assert saved["athlete"] == {"id": 4242}  # not in the refresh response
+    assert os.listdir(tmp_path) == ["tokens.json"]  # temp file renamed away
+
+
+def test_tokens_saved_by_another_process_are_picked_up(tmp_path):
+    path = tmp_path / "tokens.json"
+    _write(path, access_token="old", refresh_token="r1", expires_at=int(time.time()) + 60)
+    posts = []
+
+    def refresh(refresh_token):
+        posts.append(refresh_token)
+        return {"access_token": f"new-{len(posts)}", "refresh_token": f"r{len(posts) + 1}",
+                "expires_at": int(time.time()) + 21600}
+
+    # Two workers sharing the file, both with the expiring tokens cached
+    first, second = TokenManager(str(path), refresh=refresh), TokenManager(str(path), refresh=refresh)
+    assert first.get()["refresh_token"] == second.get()["refresh_token"] == "r1"
+
+    assert first.fresh()["access_token"] == "new-1"
+    # The second sees the rotated tokens instead of spending the revoked r1
+    assert second.fresh()["access_token"] == "new-1"
+    assert posts == ["r1"]
+
+    first.clear()
+    assert second.get() is None
+
+
+def test_revoked_refresh_token_falls_back_to_the_file(tmp_path):
+    path = tmp_path / "tokens.json"
+    _write(path, access_token="old", refresh_token="r1", expires_at=int(time.time()) + 60)
+
+    def revoked(refresh_token):
+        request = httpx.Request("POST", "https://strava.test/oauth/token")
+        raise httpx.HTTPStatusError("revoked", request=request, response=httpx.Response(400, request=request))
+
+    manager = TokenManager(str(path), refresh=revoked)
+    assert manager.get()["refresh_token"] == "r1"
+    # Another process refreshes, but its save goes unnoticed (as if the
+    # stat stamp had not changed): our cached r1 is revoked
+    _write(path, access_token="theirs", refresh_token="r2", expires_at=int(time.time()) + 21600)
+    manager._stamp = manager._file_stamp()
+
+    assert manager.fresh()["access_token"] == "theirs"
+
+    # Revoked with nothing newer on disk: the error surfaces
+    _write(path, access_token="old", refresh_token="r3", expires_at=int(time.time()) + 60)
+    with pytest.raises(httpx.HTTPStatusError):
+        manager.fresh()
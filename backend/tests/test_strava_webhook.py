@@ -0,0 +1,150 @@
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import app.api.strava as strava_api
+from app.core.config import settings
+from app.core.strava_webhook import CLAIM_TIMEOUT, claim_events, event_from_payload, process_events
+from app.db import SessionLocal
+from app.models.run import Run
+from app.models.run_deletion import RunDeletion
+from app.models.strava_event import StravaEvent
+from test_api_smoke import get_client
+from test_strava_sync import MockStrava, _activities
+
+# Recorded-style Strava webhook deliveries, replayed in order
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "strava_webhook_events.json")
+
+
+def _link(monkeypatch, tmp_path, activities):
+    """Store tokens for athlete 4242 and point the webhook drain at a mock Strava."""
+    tokens = tmp_path / "tokens.json"
+    tokens.write_text(json.dumps({
+        "access_token": "test",
+        "refresh_token": "test",
+        "expires_at": int(time.time()) + 3600,
+        "athlete": {"id": 4242},
+    }))
+    monkeypatch.setattr(settings, "strava_tokens_path", str(tokens))
+    mock = MockStrava(activities)
+    monkeypatch.setattr(strava_api, "strava_client", lambda access_token: mock.client())
+    return mock
+
+
+def test_webhook_validation_handshake(monkeypatch):
+    client = get_client()
+    monkeypatch.setattr(settings, "strava_webhook_verify_token", "s3cret")
+    params = {"hub.mode": "subscribe", "hub.verify_token": "s3cret", "hub.challenge": "15f7d1a91c1f40f8"}
+    r = client.get("/strava/webhook", params=params)
+    assert r.status_code == 200
+    assert r.json() == {"hub.challenge": "15f7d1a91c1f40f8"}
+
+    r = client.get("/strava/webhook", params={**params, "hub.verify_token": "nope"})
+    assert r.status_code == 403
+
+
+def test_webhook_replay_applies_only_the_changes(monkeypatch, tmp_path):
+    activities = _activities(3, year=2042)
+    for a, activity_id in zip(activities, (20420001, 20420002, 20420003)):
+        a["id"] = activity_id
+    activities[1]["type"] = "Ride"
+    mock = _link(monkeypatch, tmp_path, activities)
+    client = get_client()
+
+    with open(FIXTURE) as f:
+        events = json.load(f)
+    titles = []
+    for event in events:
+        r = client.post("/strava/webhook", json=event)
+        assert r.status_code == 200, r.text
+        # The event is applied by the background task before post() returns
+        with SessionLocal() as db:
+            run = db.query(Run).filter(Run.external_id == "20420001").first()
+            titles.append(run.title if run else None)
+
+    with SessionLocal() as db:
+        stored = (
+            db.query(StravaEvent)
+            .filter(StravaEvent.object_id.in_([e["object_id"] for e in events]))
+            .order_by(StravaEvent.id)
+            .all()
+        )
+        # 20420003 belongs to another athlete: acknowledged, not stored
+        assert [e.outcome for e in stored] == [
+            "imported", "ignored", "updated", "ignored", "deleted", "imported", "deleted", "ignored",
+        ]
+        assert all(e.processed_at is not None for e in stored)
+        assert db.query(Run).filter(Run.external_id.in_(["20420001", "20420002"])).count() == 0
+        assert db.query(RunDeletion).count() >= 2
+
+    assert titles[:3] == ["Mock run 0", "Mock run 0", "Hill repeats"]
+    assert titles[4] is None and titles[5] == "Mock run 0"
+    # Two imports (activity + streams each) and one look at the Ride; no listing
+    assert (mock.used, mock.listed) == (5, 0)
+
+
+def test_queued_events_for_one_activity_are_coalesced(monkeypatch, tmp_path):
+    mock = _link(monkeypatch, tmp_path, [])
+    with SessionLocal() as db:
+        for aspect in ("create", "update", "delete"):
+            db.add(event_from_payload({"object_type": "activity", "object_id": 20449001, "aspect_type": aspect}))
+        db.commit()
+
+        async def drain():
+            async with mock.client() as client:
+                return await process_events(db, client, allowed_types={"Run"})
+
+        assert asyncio.run(drain()) == {"ignored": 3}
+    assert mock.used == 0
+
+
+def test_webhook_deauthorization_forgets_tokens(monkeypatch, tmp_path):
+    _link(monkeypatch, tmp_path, [])
+    client = get_client()
+    r = client.post("/strava/webhook", json={
+        "aspect_type": "update", "object_id": 4242, "object_type": "athlete",
+        "owner_id": 4242, "updates": {"authorized": "false"},
+    })
+    assert r.status_code == 200
+    assert not os.path.exists(settings.strava_tokens_path)
+
+    r = client.post("/strava/webhook", json={"object_type": "club", "object_id": 1, "aspect_type": "create"})
+    assert r.status_code == 422
+
+
+def test_concurrent_drains_never_apply_the_same_event(monkeypatch, tmp_path):
+    mock = _link(monkeypatch, tmp_path, [])
+    with SessionLocal() as db:
+        run = Run(date=datetime(2046, 5, 1).date(), title="Deleted twice?", distance_mi=5.0,
+                  duration_seconds=2700, source="strava", external_source="strava", external_id="20469001")
+        db.add(run)
+        for object_id, aspect in ((20469001, "delete"), (20469002, "update"), (20469002, "delete")):
+            db.add(event_from_payload({"object_type": "activity", "object_id": object_id, "aspect_type": aspect}))
+        db.commit()
+        run_id = run.id
+        tombstones = db.query(RunDeletion).count()
+
+    with SessionLocal() as first, SessionLocal() as second:
+        # The first drain holds the delete (and one event of 20469002)...
+        claimed = claim_events(first, limit=2)
+        assert [e.object_id for e in claimed] == [20469001, 20469002]
+
+        async def drain(db):
+            async with mock.client() as client:
+                return await process_events(db, client, allowed_types={"Run"})
+
+        # ...so a second one gets neither it nor the rest of that activity
+        assert asyncio.run(drain(second)) == {}
+
+        # A claim that outlived its drain is taken over
+        for e in claimed:
+            e.claimed_at = datetime.now(timezone.utc) - CLAIM_TIMEOUT - timedelta(seconds=1)
+        first.commit()
+        assert asyncio.run(drain(second)) == {"deleted": 1, "ignored": 2}
+        assert asyncio.run(drain(second)) == {}
+
+    with SessionLocal() as db:
+        assert db.get(Run, run_id) is None
+        assert db.query(RunDeletion).count() == tombstones + 1
@@ -0,0 +1,114 @@
+from datetime import date, timedelta
+
+from sqlalchemy import func
+
+from app.core.training_load import invalidate_training_load, run_trimp
+from app.db import SessionLocal
+from app.models.run import Run
+from app.models.training_load_day import TrainingLoadDay
+from test_api_smoke import get_client
+
+
+def test_run_trimp_sources():
+    # 10 min in z2 + 20 min in z4 -> 10*2 + 20*4
+    assert run_trimp(1800, "easy", hr_zones={"z2": 600, "z4": 1200, "hr_max": 190}) == 100
+    # No zone breakdown: whole run in the avg HR's zone (150/193 -> z3)
+    assert run_trimp(3600, "easy", avg_hr=150) == 180
+    # No HR at all: zone implied by run type
+    assert run_trimp(3600, "workout") == 180
+    assert run_trimp(3600, "easy") == 120
+
+
+def _stored_days(start, end):
+    with SessionLocal() as db:
+        return [
+            r.day for r in db.query(TrainingLoadDay)
+            .filter(TrainingLoadDay.day >= start, TrainingLoadDay.day <= end)
+            .order_by(TrainingLoadDay.day)
+        ]
+
+
+def test_training_load_incremental_matches_full_recompute():
+    client = get_client()
+    window = {"start": "2031-03-01", "end": "2031-03-31"}
+    client.post("/runs/", json={
+        "date": "2031-03-02", "title": "TL easy", "distance_mi": 6, "duration": "01:00:00", "run_type": "easy",
+    })
+    before = client.get("/stats/training_load", params=window).json()
+    assert len(before) == 31
+    by_day = {p["date"]: p for p in before}
+    assert by_day["2031-03-02"]["load"] == 120.0
+    assert by_day["2031-03-03"]["atl"] < by_day["2031-03-02"]["atl"]  # decays on rest days
+
+    # A write only drops the stored days from its date onward
+    run_id = client.post("/runs/", json={
+        "date": "2031-03-15", "title": "TL workout", "distance_mi": 8, "duration": "01:00:00", "run_type": "workout",
+    }).json()["id"]
+    assert _stored_days(date(2031, 3, 1), date(2031, 3, 31)) == [date(2031, 3, d) for d in range(1, 15)]
+
+    after = client.get("/stats/training_load", params=window).json()
+    assert after[:14] == before[:14]
+    assert {p["date"]: p for p in after}["2031-03-15"]["load"] == 180.0
+
+    # Moving the run re-opens from the earlier of its old and new dates
+    client.put(f"/runs/{run_id}", json={"date": "2031-03-10"})
+    assert _stored_days(date(2031, 3, 1), date(2031, 3, 31))[-1] == date(2031, 3, 9)
+    incremental = client.get("/stats/training_load", params=window).json()
+
+    with SessionLocal() as db:
+        invalidate_training_load(db)
+        db.commit()
+    full = client.get("/stats/training_load", params=window).json()
+    assert incremental == full
+
+    assert client.get("/stats/training_load", params={"start": "2031-04-01", "end": "2031-03-01"}).status_code == 422
+
+
+def test_fill_that_raced_an_invalidation_stores_nothing(monkeypatch):
+    from app.core import training_load
+
+    client = get_client()
+    window = {"start": "2032-05-01", "end": "2032-05-10"}
+    client.get("/stats/training_load", params={"start": "2032-04-01", "end": "2032-04-30"})
+    stored = _stored_days(date(2032, 5, 1), date(2032, 5, 10))
+
+    daily_loads = training_load._daily_loads
+    written = []
+
+    def write_meanwhile(db, start, end):
+        loads = daily_loads(db, start, end)
+        if not written:
+            # Another request changes a run after this fill has read the runs
+            written.append(client.post("/runs/", json={
+                "date": "2032-05-03", "title": "TL race", "distance_mi": 5, "duration": "00:40:00",
+            }))
+        return loads
+
+    monkeypatch.setattr(training_load, "_daily_loads", write_meanwhile)
+    client.get("/stats/training_load", params=window)
+    assert _stored_days(date(2032, 5, 1), date(2032, 5, 10)) == stored
+
+    monkeypatch.setattr(training_load, "_daily_loads", daily_loads)
+    by_day = {p["date"]: p for p in client.get("/stats/training_load", params=window).json()}
+    assert by_day["2032-05-03"]["load"] == 80.0
+
+
+def test_far_future_end_is_not_stored():
+    client = get_client()
+    client.post("/runs/", json={
+        "date": "2031-06-01", "title": "TL anchor", "distance_mi": 3, "duration": "00:25:00",
+    })
+    with SessionLocal() as db:
+        last_run = db.query(func.max(Run.date)).scalar()
+    limit = max(date.today(), last_run)
+
+    assert client.get("/stats/training_load", params={"start": "2999-01-01", "end": "2999-01-05"}).json() == []
+    with SessionLocal() as db:
+        assert db.query(func.max(TrainingLoadDay.day)).scalar() <= limit
+
+    # Days past the store limit are served, decaying, but never kept
+    past = [limit + timedelta(days=d) for d in (1, 10)]
+    points = client.get("/stats/training_load", params={"start": past[0].isoformat(), "end": past[1].isoformat()}).json()
+    assert [p["date"] for p in points] == [(past[0] + timedelta(days=d)).isoformat() for d in range(10)]
+    assert all(p["load"] == 0.0 for p in points) and points[-1]["ctl"] < points[0]["ctl"]
+    assert _stored_days(past[0], past[1]) == []
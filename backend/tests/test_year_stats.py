@@ -0,0 +1,43 @@
+from app.db import SessionLocal
+from app.models.run_metrics import RunMetrics
+from app.models.year_stats_cache import YearStatsCache
+from test_api_smoke import get_client
+
+
+def _cached_years():
+    with SessionLocal() as db:
+        return {row.year for row in db.query(YearStatsCache)}
+
+
+def test_calendar_and_summary_cached_until_that_year_changes():
+    client = get_client()
+    for day, dist, dur in [("2033-01-03", 5, "00:40:00"), ("2033-01-03", 3, "00:25:00"), ("2033-03-20", 13.1, "01:45:00")]:
+        client.post("/runs/", json={"date": day, "title": "Year stats", "distance_mi": dist, "duration": dur})
+
+    cal = client.get("/stats/calendar", params={"year": 2033}).json()
+    assert len(cal["days"]) == 365
+    assert cal["days"][2] == {"date": "2033-01-03", "distance_mi": 8.0, "duration_s": 3900, "elev_gain_ft": 0.0, "runs": 2}
+    assert cal["days"][3]["runs"] == 0
+
+    summary = client.get("/stats/year_summary", params={"year": 2033}).json()
+    assert (summary["distance_mi"], summary["runs"], summary["active_days"]) == (21.1, 3, 2)
+    assert summary["longest_run"] == {"date": "2033-03-20", "distance_mi": 13.1}
+    assert summary["months"][0]["longest_run_mi"] == 5.0
+    assert summary["months"][1]["runs"] == 0
+    assert 2033 in _cached_years()
+
+    client.get("/stats/year_summary", params={"year": 2034})
+    run_id = client.post("/runs/", json={
+        "date": "2033-02-01", "title": "Year stats", "distance_mi": 4, "duration": "00:30:00",
+    }).json()["id"]
+    # Only the touched year is dropped
+    assert 2033 not in _cached_years() and 2034 in _cached_years()
+    assert client.get("/stats/year_summary", params={"year": 2033}).json()["runs"] == 4
+
+    # Metrics written outside the API (file processing) invalidate too
+    with SessionLocal() as db:
+        db.add(RunMetrics(run_id=run_id, elev_gain_ft=250))
+        db.commit()
+    summary = client.get("/stats/year_summary", params={"year": 2033}).json()
+    assert summary["elev_gain_ft"] == 250.0
+    assert summary["months"][1]["elev_gain_ft"] == 250.0
@@ -1,5 +1,5 @@
 import { useEffect, useState, useMemo, useCallback } from "react";
-import { getWeeklyMileage, getRunsInRange, createRun, updateRun, deleteRun, getWeeklyGoal, upsertWeeklyGoal, importRun, getRunMetrics, getRunSeries, getRunSplits, getRunTrack, reprocessRun, getStravaAuthUrl, syncStrava, getStravaStatus } from "./api";
+import { getWeeklyMileage, getRunsInRange, createRun, updateRun, deleteRun, getWeeklyGoal, upsertWeeklyGoal, importRun, getRunDetail, reprocessRun, getStravaAuthUrl, syncStrava, getStravaStatus } from "./api";
 import RunMap from "./components/RunMap";
 import type { WeeklyMileagePoint, Run, RunCreate, WeeklyGoal, RunMetrics, RunSeries, RunSplit, RunTrack } from "./api";
 import {
@@ -274,16 +274,11 @@ function App() {
     try {
       setIsLoadingDetails(true);
       setDetailsId(run.id);
-      const [m, s, sp, tr] = await Promise.all([
-        getRunMetrics(run.id),
-        getRunSeries(run.id),
-        getRunSplits(run.id),
-        getRunTrack(run.id),
-      ]);
-      setDetailsMetrics(m);
-      setDetailsSeries(s);
-      setDetailsSplits(sp);
-      setDetailsTrack(tr);
+      const detail = await getRunDetail(run.id);
+      setDetailsMetrics(detail.metrics ?? null);
+      setDetailsSeries(detail.series ?? null);
+      setDetailsSplits(detail.splits ?? null);
+      setDetailsTrack(detail.track ?? null);
       setDetailsTab("splits");
     } catch (e) {
       console.error(e);
@@ -1062,16 +1057,11 @@ function App() {
                                       try {
                                         setIsReprocessing(true);
                                         await reprocessRun(detailsId);
-                                        const [m, s, sp, tr] = await Promise.all([
-                                          getRunMetrics(detailsId),
-                                          getRunSeries(detailsId),
-                                          getRunSplits(detailsId),
-                                          getRunTrack(detailsId),
-                                        ]);
-                                        setDetailsMetrics(m);
-                                        setDetailsSeries(s);
-                                        setDetailsSplits(sp);
-                                        setDetailsTrack(tr);
+                                        const detail = await getRunDetail(detailsId);
+                                        setDetailsMetrics(detail.metrics ?? null);
+                                        setDetailsSeries(detail.series ?? null);
+                                        setDetailsSplits(detail.splits ?? null);
+                                        setDetailsTrack(detail.track ?? null);
                                       } catch (e) {
                                         console.error(e);
                                       } finally {
@@ -26,6 +26,21 @@ function buildUrl(path: string, params?: Record<string, string | number | undefi
   return url;
 }
 
+// Read-your-writes: after a write the API answers with the time until
+// which this client should read from the primary database (a read replica
+// may lag); until then every request asks for the primary
+const PRIMARY_UNTIL_HEADER = "X-Read-Primary-Until";
+let readPrimaryUntil = 0;
+
+async function apiFetch(url: URL, init?: RequestInit): Promise<Response> {
+  const headers = new Headers(init?.headers);
+  if (Date.now() / 1000 < readPrimaryUntil) headers.set("X-Read-Primary", "1");
+  const res = await fetch(url.toString(), { ...init, headers });
+  const until = Number(res.headers.get(PRIMARY_UNTIL_HEADER));
+  if (until > readPrimaryUntil) readPrimaryUntil = until;
+  return res;
+}
+
 // -------- Types -------- //
 export interface WeeklyMileagePoint {
   week_start: string;
@@ -38,6 +53,15 @@ export interface WeeklyGoal {
   notes?: string | null;
 }
 
+export interface WeeklyGoalProgress {
+  week_start: string;
+  goal_miles: number | null;
+  notes: string | null;
+  actual_miles: number;
+  run_count: number;
+  completion_pct: number | null;
+}
+
 export interface RunMetrics {
   avg_hr: number | null;
   max_hr: number | null;
@@ -71,6 +95,14 @@ export interface RunTrack {
   points_count: number | null;
 }
 
+export interface RunDetail {
+  run: Run;
+  metrics?: RunMetrics | null;
+  series?: RunSeries | null;
+  splits?: RunSplit[];
+  track?: RunTrack | null;
+}
+
 export interface Run {
   id: number;
   date: string;
@@ -100,7 +132,7 @@ export async function getWeeklyMileage(
   maxWeeks: number = 52
 ): Promise<WeeklyMileagePoint[]> {
   const url = buildUrl("runs/weekly_mileage", { weeks: maxWeeks });
-  const res = await fetch(url.toString());
+  const res = await apiFetch(url);
   if (!res.ok) {
     throw new Error("Failed to fetch weekly mileage");
   }
@@ -118,7 +150,7 @@ export async function getRunsInRange(
     run_type: opts?.run_type && opts.run_type !== "all" ? opts.run_type : undefined,
   });
 
-  const res = await fetch(url.toString());
+  const res = await apiFetch(url);
   if (!res.ok) {
     throw new Error("Failed to fetch runs");
   }
@@ -126,7 +158,7 @@ export async function getRunsInRange(
 }
 
 export async function createRun(payload: RunCreate): Promise<Run> {
-  const res = await fetch(buildUrl("runs/").toString(), {
+  const res = await apiFetch(buildUrl("runs/"), {
     method: "POST",
     headers: {
       "Content-Type": "application/json",
@@ -143,14 +175,14 @@ export async function createRun(payload: RunCreate): Promise<Run> {
 
 // ------- Goals API ------- //
 export async function getWeeklyGoal(weekStart: string): Promise<WeeklyGoal | null> {
-  const res = await fetch(buildUrl(`goals/${weekStart}`).toString());
+  const res = await apiFetch(buildUrl(`goals/${weekStart}`));
   if (res.status === 404) return null;
   if (!res.ok) throw new Error("Failed to fetch weekly goal");
   return res.json();
 }
 
 export async function upsertWeeklyGoal(weekStart: string, data: { goal_miles: number; notes?: string }): Promise<WeeklyGoal> {
-  const res = await fetch(buildUrl(`goals/${weekStart}`).toString(), {
+  const res = await apiFetch(buildUrl(`goals/${weekStart}`), {
     method: "PUT",
     headers: { "Content-Type": "application/json" },
     body: JSON.stringify(data),
@@ -159,8 +191,27 @@ export async function upsertWeeklyGoal(weekStart: string, data: { goal_miles: nu
   return res.json();
 }
 
+// Goal, actual mileage and run count per week in one request
+export async function getGoalProgress(startDate: string, endDate: string): Promise<WeeklyGoalProgress[]> {
+  const url = buildUrl("goals/progress", { start_date: startDate, end_date: endDate });
+  const res = await apiFetch(url);
+  if (!res.ok) throw new Error("Failed to fetch goal progress");
+  return res.json();
+}
+
+// Set many weeks at once (e.g. a training plan); returns the saved goals
+export async function upsertWeeklyGoals(goals: WeeklyGoal[]): Promise<WeeklyGoal[]> {
+  const res = await apiFetch(buildUrl("goals/weekly"), {
+    method: "PUT",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(goals),
+  });
+  if (!res.ok) throw new Error("Failed to save weekly goals");
+  return res.json();
+}
+
 export async function updateRun(id: number, data: Partial<Run>): Promise<Run> {
-  const res = await fetch(buildUrl(`runs/${id}`).toString(), {
+  const res = await apiFetch(buildUrl(`runs/${id}`), {
     method: "PUT",
     headers: { "Content-Type": "application/json" },
     body: JSON.stringify(data),
@@ -170,57 +221,68 @@ export async function updateRun(id: number, data: Partial<Run>): Promise<Run> {
 }
 
 export async function deleteRun(id: number): Promise<void> {
-  const res = await fetch(buildUrl(`runs/${id}`).toString(), { method: "DELETE" });
+  const res = await apiFetch(buildUrl(`runs/${id}`), { method: "DELETE" });
   if (!res.ok) throw new Error("Failed to delete run");
 }
 
 export async function importRun(file: File): Promise<Run> {
   const form = new FormData();
   form.append("file", file);
-  const res = await fetch(buildUrl("runs/import").toString(), { method: "POST", body: form });
+  const res = await apiFetch(buildUrl("runs/import"), { method: "POST", body: form });
   if (!res.ok) throw new Error("Failed to import GPX");
   return res.json();
 }
 
 export async function getRunMetrics(id: number): Promise<RunMetrics> {
-  const res = await fetch(buildUrl(`runs/${id}/metrics`).toString());
+  const res = await apiFetch(buildUrl(`runs/${id}/metrics`));
   if (!res.ok) throw new Error("Failed to fetch run metrics");
   return res.json();
 }
 
 export async function getRunSeries(id: number): Promise<RunSeries> {
-  const res = await fetch(buildUrl(`runs/${id}/series`).toString());
+  const res = await apiFetch(buildUrl(`runs/${id}/series`));
   if (!res.ok) throw new Error("Failed to fetch run series");
   return res.json();
 }
 
 export async function getRunSplits(id: number): Promise<RunSplit[]> {
-  const res = await fetch(buildUrl(`runs/${id}/splits`).toString());
+  const res = await apiFetch(buildUrl(`runs/${id}/splits`));
   if (!res.ok) throw new Error("Failed to fetch splits");
   return res.json();
 }
 
 export async function getRunTrack(id: number): Promise<RunTrack> {
-  const res = await fetch(buildUrl(`runs/${id}/track`).toString());
+  const res = await apiFetch(buildUrl(`runs/${id}/track`));
   if (!res.ok) throw new Error("Failed to fetch track");
   return res.json();
 }
 
+// Single round trip for the Details panel (metrics + series + splits + track)
+export async function getRunDetail(
+  id: number,
+  opts?: { include?: string; track_points?: number; series_points?: number }
+): Promise<RunDetail> {
+  const url = buildUrl(`runs/${id}/detail`, opts);
+  const res = await apiFetch(url);
+  if (!res.ok) throw new Error("Failed to fetch run detail");
+  return res.json();
+}
+
 export async function reprocessRun(id: number): Promise<{ message: string } & Record<string, any>> {
-  const res = await fetch(buildUrl(`runs/${id}/reprocess`).toString(), { method: "POST" });
+  const res = await apiFetch(buildUrl(`runs/${id}/reprocess`), { method: "POST" });
   if (!res.ok) throw new Error("Failed to reprocess run");
   return res.json();
 }
 
 // ------- Strava API helpers ------- //
 export async function getStravaAuthUrl(): Promise<{ url: string }> {
-  const res = await fetch(buildUrl("strava/auth_url").toString());
+  const res = await apiFetch(buildUrl("strava/auth_url"));
   if (!res.ok) throw new Error("Strava client not configured");
   return res.json();
 }
 
 export async function getStravaStatus(): Promise<{ linked: boolean; athlete?: { id?: number; firstname?: string; lastname?: string } }>{
-  const res = await fetch(buildUrl("strava/status").toString());
+  const res = await apiFetch(buildUrl("strava/status"));
   if (!res.ok) throw new Error("Failed to check Strava status");
   return res.json();
 }
@@ -241,7 +303,7 @@ export async function syncStrava(params: {
     end_date: params.end_date ?? undefined,
     start_page: params.start_page ?? undefined,
   });
-  const res = await fetch(url.toString(), { method: "POST" });
+  const res = await apiFetch(url, { method: "POST" });
   if (!res.ok) throw new Error("Strava sync failed");
   return res.json();
 }
@@ -77,14 +77,15 @@ def split_weekly_dist(total: float) -> Tuple[float, float, List[float]]:
     return long_run, workout, easies
 
 
-def post_json(base_url: str, path: str, payload: dict) -> None:
+def post_json(base_url: str, path: str, payload) -> None:
     url = f"{base_url.rstrip('/')}/{path.lstrip('/')}"
-    r = requests.request("PUT" if path.startswith("goals/") else "POST", url, json=payload, timeout=15)
+    r = requests.request("PUT" if path.startswith("goals/") else "POST", url, json=payload, timeout=60)
     if r.status_code >= 300:
         raise RuntimeError(f"{path} -> HTTP {r.status_code}: {r.text}")
 
 
-def seed_week(base_url: str, week_start: dt.date, target_mi: float) -> None:
+def seed_week(base_url: str, week_start: dt.date, target_mi: float) -> List[dict]:
+    """Set the week's goal and return its run payloads (posted later in bulk)."""
     # Goal
     post_json(base_url, f"goals/{week_start.isoformat()}", {"goal_miles": round1(target_mi)})
 
@@ -101,6 +102,7 @@ def seed_week(base_url: str, week_start: dt.date, target_mi: float) -> None:
         # 6=Sunday off
     }
 
+    runs: List[dict] = []
     for dow, (title, miles, pace, rtype) in days.items():
         run_date = week_start + dt.timedelta(days=dow)
         duration = pace_duration(miles, pace)
@@ -112,7 +114,8 @@ def seed_week(base_url: str, week_start: dt.date, target_mi: float) -> None:
             "duration": duration,
             "run_type": rtype,
         }
-        post_json(base_url, "runs/", payload)
+        runs.append(payload)
+    return runs
 
 
 def main() -> None:
@@ -129,8 +132,12 @@ def main() -> None:
     # Generate 16 week starts ending with current week
     week_starts = [this_monday - dt.timedelta(weeks=15 - i) for i in range(16)]
 
+    runs: List[dict] = []
     for ws, miles in zip(week_starts, WEEKLY_MILES):
-        seed_week(base_url, ws, float(miles))
+        runs.extend(seed_week(base_url, ws, float(miles)))
+
+    # One request/transaction for all runs instead of one per run
+    post_json(base_url, "runs/bulk", runs)
 
     print("Seed complete: 16 weeks created.")
 